@@ -0,0 +1,27 @@
+-- Punches delivered to Zoho People. One row per punch per device.
+CREATE TABLE IF NOT EXISTS attendance_logs (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  device_serial VARCHAR(64) NOT NULL DEFAULT '',
+  biometric_id INT NOT NULL,
+  timestamp DATETIME NOT NULL,
+  zoho_emp_id VARCHAR(50),
+  type VARCHAR(16),
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Installs where the table was created by hand: bring it up to date.
+ALTER TABLE attendance_logs ADD COLUMN IF NOT EXISTS device_serial VARCHAR(64) NOT NULL DEFAULT '' AFTER id;
+
+DELETE a FROM attendance_logs a
+  JOIN attendance_logs b
+    ON a.device_serial = b.device_serial
+   AND a.biometric_id = b.biometric_id
+   AND a.timestamp = b.timestamp
+   AND a.id > b.id;
+
+-- Idempotent inserts (INSERT IGNORE) rely on this key.
+ALTER TABLE attendance_logs ADD UNIQUE INDEX IF NOT EXISTS uq_attendance_punch (device_serial, biometric_id, timestamp);
+-- Duplicate check for punches older than the in-memory dedupe window.
+CREATE INDEX IF NOT EXISTS idx_attendance_bio_ts ON attendance_logs (biometric_id, timestamp);
+-- Dedupe index seeding (WHERE timestamp >= window start).
+CREATE INDEX IF NOT EXISTS idx_attendance_ts ON attendance_logs (timestamp);
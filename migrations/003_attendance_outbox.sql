@@ -0,0 +1,21 @@
+-- Punches captured from devices and waiting for (or done with) Zoho delivery.
+CREATE TABLE IF NOT EXISTS attendance_outbox (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  device_serial VARCHAR(64) NOT NULL DEFAULT '',
+  biometric_id INT NOT NULL,
+  timestamp DATETIME NOT NULL,
+  zoho_emp_id VARCHAR(50) NOT NULL,
+  type VARCHAR(16) NOT NULL,
+  status VARCHAR(16) NOT NULL DEFAULT 'pending',
+  attempts INT NOT NULL DEFAULT 0,
+  next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  lease_owner VARCHAR(128),
+  lease_until DATETIME,
+  last_error TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  sent_at DATETIME,
+  UNIQUE KEY uq_outbox_punch (device_serial, biometric_id, timestamp),
+  KEY idx_outbox_status (status, id),
+  KEY idx_outbox_bio_ts (biometric_id, timestamp),
+  KEY idx_outbox_ts (timestamp)
+);
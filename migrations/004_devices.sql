@@ -0,0 +1,14 @@
+-- Registry of ZKTeco terminals polled by final.py and sync_db.py.
+CREATE TABLE IF NOT EXISTS devices (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  name VARCHAR(64) NOT NULL,
+  ip VARCHAR(64) NOT NULL,
+  port INT NOT NULL DEFAULT 4370,
+  password INT,
+  force_udp TINYINT NOT NULL DEFAULT 1,
+  enabled TINYINT NOT NULL DEFAULT 1,
+  serial VARCHAR(64),
+  last_seen_at DATETIME,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_devices_endpoint (ip, port)
+);
@@ -0,0 +1,5 @@
+-- Lets final.py refresh the biometric -> Zoho mapping incrementally.
+ALTER TABLE employees
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_employees_updated_at ON employees (updated_at);
@@ -0,0 +1,12 @@
+-- Punches of biometric IDs without a Zoho employee yet; replayed into the outbox once resolved.
+CREATE TABLE IF NOT EXISTS attendance_parked (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  device_serial VARCHAR(64) NOT NULL DEFAULT '',
+  biometric_id INT NOT NULL,
+  timestamp DATETIME NOT NULL,
+  type VARCHAR(16) NOT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_parked_punch (device_serial, biometric_id, timestamp),
+  KEY idx_parked_bio_ts (biometric_id, timestamp),
+  KEY idx_parked_ts (timestamp)
+);
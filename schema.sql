@@ -1,8 +1,88 @@
+-- Full schema for a fresh install. Existing databases are upgraded with
+-- `python src/migrate.py`, which applies migrations/*.sql in order; keep
+-- this file in sync with the latest migration.
+
+CREATE TABLE schema_migrations (
+  version INT PRIMARY KEY,
+  name VARCHAR(255) NOT NULL,
+  applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE employees (
   id INT AUTO_INCREMENT PRIMARY KEY,
   zoho_emp_id VARCHAR(50) NOT NULL UNIQUE,
   biometric_id INT UNIQUE,
   name VARCHAR(255) NOT NULL,
   active TINYINT DEFAULT 1,
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  KEY idx_employees_updated_at (updated_at)
+);
+
+CREATE TABLE attendance_logs (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  device_serial VARCHAR(64) NOT NULL DEFAULT '',
+  biometric_id INT NOT NULL,
+  timestamp DATETIME NOT NULL,
+  zoho_emp_id VARCHAR(50),
+  type VARCHAR(16),
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_attendance_punch (device_serial, biometric_id, timestamp),
+  KEY idx_attendance_bio_ts (biometric_id, timestamp),
+  KEY idx_attendance_ts (timestamp)
+);
+
+CREATE TABLE attendance_outbox (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  device_serial VARCHAR(64) NOT NULL DEFAULT '',
+  biometric_id INT NOT NULL,
+  timestamp DATETIME NOT NULL,
+  zoho_emp_id VARCHAR(50) NOT NULL,
+  type VARCHAR(16) NOT NULL,
+  status VARCHAR(16) NOT NULL DEFAULT 'pending',
+  attempts INT NOT NULL DEFAULT 0,
+  next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  lease_owner VARCHAR(128),
+  lease_until DATETIME,
+  last_error TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  sent_at DATETIME,
+  UNIQUE KEY uq_outbox_punch (device_serial, biometric_id, timestamp),
+  KEY idx_outbox_status (status, id),
+  KEY idx_outbox_bio_ts (biometric_id, timestamp),
+  KEY idx_outbox_ts (timestamp)
+);
+
+CREATE TABLE attendance_parked (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  device_serial VARCHAR(64) NOT NULL DEFAULT '',
+  biometric_id INT NOT NULL,
+  timestamp DATETIME NOT NULL,
+  type VARCHAR(16) NOT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_parked_punch (device_serial, biometric_id, timestamp),
+  KEY idx_parked_bio_ts (biometric_id, timestamp),
+  KEY idx_parked_ts (timestamp)
+);
+
+CREATE TABLE devices (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  name VARCHAR(64) NOT NULL,
+  ip VARCHAR(64) NOT NULL,
+  port INT NOT NULL DEFAULT 4370,
+  password INT,
+  force_udp TINYINT NOT NULL DEFAULT 1,
+  enabled TINYINT NOT NULL DEFAULT 1,
+  serial VARCHAR(64),
+  last_seen_at DATETIME,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_devices_endpoint (ip, port)
 );
+
+INSERT INTO schema_migrations (version, name) VALUES
+  (1, '001_employees.sql'),
+  (2, '002_attendance_logs.sql'),
+  (3, '003_attendance_outbox.sql'),
+  (4, '004_devices.sql'),
+  (5, '005_employees_updated_at.sql'),
+  (6, '006_attendance_parked.sql');
@@ -0,0 +1,80 @@
+import json
+import os
+from pathlib import Path
+
+# ─── Config ───
+CHECKPOINT_DIR = Path(os.getenv("CHECKPOINT_DIR", Path(__file__).resolve().parent.parent / "data"))
+
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def empty_checkpoint(serial):
+    return {"serial": serial, "records": 0, "last_timestamp": None, "last_user_id": None}
+
+def checkpoint_path(serial):
+    return CHECKPOINT_DIR / f"checkpoint_{serial}.json"
+
+def load_checkpoint(serial):
+    """Load the saved position for a device, or an empty one."""
+    path = checkpoint_path(serial)
+    try:
+        with open(path) as f:
+            cp = json.load(f)
+    except FileNotFoundError:
+        return empty_checkpoint(serial)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable checkpoint {path}: {e}")
+        return empty_checkpoint(serial)
+    if cp.get("serial") != serial:
+        return empty_checkpoint(serial)
+    return cp
+
+def save_checkpoint(cp):
+    """Write the checkpoint atomically so a crash never leaves half a file."""
+    path = checkpoint_path(cp["serial"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(cp, f, indent=2)
+    os.replace(tmp, path)
+
+def _key(log):
+    return str(log.user_id), log.timestamp.strftime(TS_FORMAT)
+
+def is_last_seen(cp, log):
+    """True if ``log`` is the record the checkpoint ends with."""
+    return _key(log) == (cp["last_user_id"], cp["last_timestamp"])
+
+def resume_index(logs, cp):
+    """
+    Return the index of the first record in ``logs`` not covered by ``cp``.
+
+    The device log is append-only, so normally the record at position
+    ``records - 1`` is the one we saw last. If it is not (the log was
+    cleared or the oldest entries were rotated out), fall back to the last
+    processed timestamp. Records sharing that second are returned again and
+    left to the usual duplicate check.
+    """
+    n = cp["records"]
+    last = cp["last_timestamp"]
+    if n and n <= len(logs) and is_last_seen(cp, logs[n - 1]):
+        return n
+    if not last:
+        return 0
+    if n:
+        print(f"♻️ Device log changed under checkpoint ({n} → {len(logs)} records). Resuming by timestamp.")
+    for i, log in enumerate(logs):
+        if log.timestamp.strftime(TS_FORMAT) >= last:
+            return i
+    return len(logs)
+
+def advance(cp, logs, upto, base=0):
+    """
+    Return a checkpoint covering ``logs[:upto]``, where ``logs[0]`` is
+    record number ``base`` on the device.
+    """
+    if upto <= 0:
+        # Nothing confirmed yet: keep the timestamp but force a re-read.
+        return dict(cp, records=base)
+    user_id, ts = _key(logs[upto - 1])
+    return {"serial": cp["serial"], "records": base + upto, "last_timestamp": ts, "last_user_id": user_id}
@@ -0,0 +1,83 @@
+import heapq
+import os
+from datetime import datetime, timedelta
+
+# ─── Config ───
+DEDUPE_WINDOW_HOURS = float(os.getenv("DEDUPE_WINDOW_HOURS", "72"))
+
+
+class DedupeIndex:
+    """
+    In-memory set of recently recorded ``(biometric_id, timestamp)`` keys.
+
+    Only punches newer than ``window`` are kept; a heap ordered by punch
+    time lets old keys be evicted without scanning. Lookups for keys older
+    than the window go to the database.
+    """
+
+    def __init__(self, window_hours=DEDUPE_WINDOW_HOURS):
+        self.window = timedelta(hours=window_hours)
+        self._keys = set()
+        self._heap = []
+
+        self.hits = 0
+        self.misses = 0
+        self.db_lookups = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def cutoff(self):
+        return datetime.now() - self.window
+
+    def seed(self, conn):
+        """Load every delivered, queued or parked key inside the window with one query."""
+        cutoff = self.cutoff()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT biometric_id, timestamp FROM attendance_logs WHERE timestamp >= %s "
+            "UNION SELECT biometric_id, timestamp FROM attendance_outbox WHERE timestamp >= %s "
+            "UNION SELECT biometric_id, timestamp FROM attendance_parked WHERE timestamp >= %s",
+            (cutoff, cutoff, cutoff)
+        )
+        for bio_id, ts in cursor:
+            self.add(bio_id, ts)
+        cursor.close()
+        print(f"🧠 Dedupe index seeded with {len(self)} punch(es) from the last {self.window}.")
+
+    def add(self, bio_id, ts):
+        key = (str(bio_id), ts)
+        if key not in self._keys:
+            self._keys.add(key)
+            heapq.heappush(self._heap, (ts, key[0]))
+        self.evict()
+
+    def evict(self):
+        cutoff = self.cutoff()
+        while self._heap and self._heap[0][0] < cutoff:
+            ts, bio_id = heapq.heappop(self._heap)
+            self._keys.discard((bio_id, ts))
+
+    def seen(self, bio_id, ts, fallback=None):
+        """
+        True if the punch was already recorded.
+
+        ``fallback(bio_id, ts)`` is consulted for punches older than the
+        window, which the index does not hold.
+        """
+        if ts < self.cutoff():
+            self.db_lookups += 1
+            return fallback(bio_id, ts) if fallback else False
+        if (str(bio_id), ts) in self._keys:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def stats(self):
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "db_lookups": self.db_lookups,
+        }
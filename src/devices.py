@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from zk import ZK
+from dotenv import load_dotenv
+from pathlib import Path
+
+# ─── Load environment from root .env ───
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+
+# ─── Config ───
+# Used when the devices table is empty, so single-terminal setups keep working.
+ZK_IP       = os.getenv("ZK_IP", "192.168.68.52")
+ZK_PORT     = int(os.getenv("ZK_PORT", "4370"))
+ZK_PASSWORD = os.getenv("ZK_PASSWORD", None)
+ZK_TIMEOUT  = int(os.getenv("ZK_TIMEOUT", "10"))
+# Device user tables are cached here per serial; an empty value turns the disk copy off.
+ZK_USER_CACHE_DIR = os.getenv("ZK_USER_CACHE_DIR", str(Path(__file__).resolve().parent.parent / "data")) or None
+# Chunk requests kept in flight by UDP dumps; raise it for terminals behind slow links.
+ZK_READ_WINDOW = int(os.getenv("ZK_READ_WINDOW", "1"))
+
+
+def env_device():
+    if not ZK_IP:
+        return None
+    return {
+        "name": ZK_IP,
+        "ip": ZK_IP,
+        "port": ZK_PORT,
+        "password": int(ZK_PASSWORD) if ZK_PASSWORD else 0,
+        "force_udp": True,
+    }
+
+def load_devices(conn):
+    """Enabled devices from the ``devices`` table, or the ``ZK_IP`` device if none are registered."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT name, ip, port, password, force_udp FROM devices WHERE enabled = 1 ORDER BY id")
+    devices = [dict(row, password=row["password"] or 0, force_udp=bool(row["force_udp"])) for row in cursor.fetchall()]
+    cursor.close()
+    if not devices and env_device():
+        devices = [env_device()]
+    return devices
+
+def connect(device):
+    """Connect to a registered device and return ``(dev, serial)``."""
+    zk = ZK(device["ip"], port=device["port"], password=device["password"], timeout=ZK_TIMEOUT,
+            force_udp=device["force_udp"], user_cache=ZK_USER_CACHE_DIR, read_window=ZK_READ_WINDOW)
+    dev = zk.connect()
+    return dev, dev.get_serialnumber()
+
+def mark_seen(conn, device, serial):
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE devices SET serial = %s, last_seen_at = NOW() WHERE ip = %s AND port = %s",
+        (serial, device["ip"], device["port"])
+    )
+    conn.commit()
+    cursor.close()
+
+
+class DeviceHealth:
+    """
+    Connection state and lag of one device.
+
+    ``lag_records`` is how many records the device holds beyond the
+    checkpoint; ``lag_seconds`` is the time since the last completed
+    catch-up read.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.serial = None
+        self.state = "starting"
+        self.last_error = None
+        self._lock = threading.Lock()
+
+        self.connects = 0
+        self.errors = 0
+        self.catch_ups = 0
+        self.queued = 0
+        self.device_records = 0
+        self.checkpoint_records = 0
+        self.last_catch_up = None
+        self.last_punch_at = None
+
+    def connected(self, serial):
+        with self._lock:
+            self.serial = serial
+            self.state = "online"
+            self.connects += 1
+
+    def failed(self, error):
+        with self._lock:
+            self.state = "error"
+            self.last_error = str(error)
+            self.errors += 1
+
+    def observe(self, device_records):
+        with self._lock:
+            self.device_records = device_records
+
+    def caught_up(self, checkpoint):
+        with self._lock:
+            self.checkpoint_records = checkpoint["records"]
+            self.catch_ups += 1
+            self.last_catch_up = time.monotonic()
+
+    def punch(self, when):
+        with self._lock:
+            self.queued += 1
+            if self.last_punch_at is None or when > self.last_punch_at:
+                self.last_punch_at = when
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "serial": self.serial,
+                "state": self.state,
+                "last_error": self.last_error,
+                "connects": self.connects,
+                "errors": self.errors,
+                "catch_ups": self.catch_ups,
+                "queued": self.queued,
+                "device_records": self.device_records,
+                "lag_records": max(self.device_records - self.checkpoint_records, 0),
+                "lag_seconds": None if self.last_catch_up is None else time.monotonic() - self.last_catch_up,
+                "last_punch_at": self.last_punch_at.strftime("%Y-%m-%d %H:%M:%S") if self.last_punch_at else None,
+            }
@@ -0,0 +1,121 @@
+import os
+import queue
+import threading
+import time
+import zlib
+import zoho_attendance
+
+# ─── Config ───
+ZOHO_WORKERS    = int(os.getenv("ZOHO_WORKERS", "4"))
+ZOHO_BATCH_SIZE = int(os.getenv("ZOHO_BATCH_SIZE", "50"))
+# Longest a worker holds a punch back waiting for its batch to fill. The default
+# sends whatever has queued up at once, which keeps live punches sub-second.
+ZOHO_BATCH_DELAY = float(os.getenv("ZOHO_BATCH_DELAY", "0"))
+
+_STOP = object()
+
+
+class ZohoDispatcher:
+    """
+    Delivers punches to Zoho from a pool of worker threads.
+
+    Every employee is pinned to one worker (by a stable hash of the Zoho
+    employee ID) and each worker drains its own FIFO queue, so one
+    employee's check-in and check-out are never reordered while different
+    employees are sent in parallel. The worker count is the concurrency cap.
+    A worker sends whatever has queued up since its last call, up to
+    ``batch_size`` punches, as one bulk import; with ``max_delay`` it waits
+    up to that many seconds after the first punch for the batch to fill.
+
+    ``on_result(punch)`` is called from the worker thread once ``sent`` is set.
+    """
+
+    def __init__(self, on_result=None, workers=ZOHO_WORKERS, batch_size=ZOHO_BATCH_SIZE, max_delay=ZOHO_BATCH_DELAY):
+        self.on_result = on_result
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queues = [queue.Queue() for _ in range(max(1, workers))]
+        self._done = threading.Condition()
+        self._threads = []
+
+        self.batches = 0
+        self.fallbacks = 0
+        self.sent = 0
+        self.failed = 0
+
+    def start(self):
+        for i, q in enumerate(self._queues):
+            t = threading.Thread(target=self._run, args=(q,), name=f"zoho-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout=None):
+        """Deliver what is queued, then stop the workers."""
+        for q in self._queues:
+            q.put(_STOP)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def pending(self):
+        return sum(q.qsize() for q in self._queues)
+
+    def submit(self, punch):
+        idx = zlib.crc32(str(punch["emp_id"]).encode()) % len(self._queues)
+        self._queues[idx].put(punch)
+
+    def wait(self, punches, timeout=None):
+        """Block until every punch in ``punches`` has a delivery result."""
+        with self._done:
+            return self._done.wait_for(lambda: all(p["sent"] is not None for p in punches), timeout)
+
+    def _run(self, q):
+        while True:
+            item = q.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                try:
+                    item = q.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._deliver(batch)
+            if stop:
+                return
+
+    def _deliver(self, batch):
+        try:
+            results, fell_back = zoho_attendance.deliver_batch(batch)
+        except Exception as e:
+            print(f"❌ Zoho delivery error: {e}")
+            results, fell_back = [False] * len(batch), False
+        with self._done:
+            self.batches += 1
+            self.fallbacks += fell_back
+            for punch, ok in zip(batch, results):
+                punch["sent"] = bool(ok)
+                if ok:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+                if self.on_result:
+                    self.on_result(punch)
+            self._done.notify_all()
+
+    def stats(self):
+        return {
+            "workers": len(self._queues),
+            "pending": self.pending(),
+            "batches": self.batches,
+            "fallbacks": self.fallbacks,
+            "sent": self.sent,
+            "failed": self.failed,
+        }
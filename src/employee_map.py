@@ -0,0 +1,129 @@
+import os
+import threading
+from datetime import timedelta
+
+# ─── Config ───
+MAPPING_REFRESH_INTERVAL = float(os.getenv("MAPPING_REFRESH_INTERVAL", "30"))
+# Re-read rows this far behind the watermark, for transactions that commit late.
+MAPPING_REFRESH_OVERLAP  = int(os.getenv("MAPPING_REFRESH_OVERLAP", "60"))
+
+SELECT_ALL = "SELECT zoho_emp_id, biometric_id, updated_at FROM employees"
+SELECT_CHANGED = SELECT_ALL + " WHERE updated_at >= %s ORDER BY updated_at"
+
+
+class EmployeeMap:
+    """
+    biometric ID -> Zoho employee ID, refreshed incrementally from the
+    ``employees`` table.
+
+    ``refresh`` only reads rows whose ``updated_at`` moved past the last
+    watermark and, if anything changed, publishes a new dict with a single
+    assignment. Readers call ``get`` without locking and always see either
+    the old or the new mapping.
+    """
+
+    def __init__(self):
+        self.mapping = {}
+        self._bio_of = {}  # zoho_emp_id -> biometric_id, to drop stale IDs
+        self.watermark = None
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.refreshes = 0
+        self.changes = 0
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def get(self, bio_id):
+        return self.mapping.get(bio_id)
+
+    def load(self, conn):
+        """Read the whole table; used once at startup."""
+        self._bio_of = {}
+        self.mapping = {}
+        self.apply(self._fetch(conn, SELECT_ALL))
+        print(f"👥 Loaded {len(self)} biometric mapping(s).")
+
+    def refresh(self, conn):
+        """Apply rows changed since the last refresh. Returns the number of changed mappings."""
+        if self.watermark is None:
+            self.load(conn)
+            return len(self)
+        since = self.watermark - timedelta(seconds=MAPPING_REFRESH_OVERLAP)
+        changed = self.apply(self._fetch(conn, SELECT_CHANGED, (since,)))
+        self.refreshes += 1
+        if changed:
+            print(f"👥 Biometric mapping refreshed: {changed} change(s), {len(self)} mapping(s).")
+        return changed
+
+    def _fetch(self, conn, query, params=()):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.commit()  # end the snapshot so the next refresh sees new commits
+        return rows
+
+    def apply(self, rows):
+        """Merge ``rows`` into a copy of the mapping and swap it in."""
+        mapping = None
+        changed = 0
+        for row in rows:
+            emp_id = row["zoho_emp_id"]
+            bio_id = None if row["biometric_id"] is None else str(row["biometric_id"])
+            if self.watermark is None or row["updated_at"] > self.watermark:
+                self.watermark = row["updated_at"]
+            old = self._bio_of.get(emp_id)
+            if old == bio_id and (bio_id is None or self.mapping.get(bio_id) == emp_id):
+                continue
+            if mapping is None:
+                mapping = dict(self.mapping)
+            if old is not None and mapping.get(old) == emp_id:
+                del mapping[old]
+            if bio_id is None:
+                self._bio_of.pop(emp_id, None)
+            else:
+                mapping[bio_id] = emp_id
+                self._bio_of[emp_id] = bio_id
+            changed += 1
+        if mapping is not None:
+            self.mapping = mapping
+            self.changes += changed
+        return changed
+
+    def start(self, connect, interval=MAPPING_REFRESH_INTERVAL):
+        """Refresh every ``interval`` seconds on a background thread with its own connection."""
+        self._thread = threading.Thread(target=self._run, args=(connect, interval), name="employee-map", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self, connect, interval):
+        conn = None
+        while not self._stop.wait(interval):
+            try:
+                if conn is None:
+                    conn = connect()
+                self.refresh(conn)
+            except Exception as e:
+                print(f"❌ Biometric mapping refresh failed: {e}")
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+        if conn is not None:
+            conn.close()
+
+    def stats(self):
+        return {
+            "size": len(self),
+            "refreshes": self.refreshes,
+            "changes": self.changes,
+        }
@@ -1,130 +1,396 @@
 import os
 import time
+import argparse
+import threading
 import mysql.connector
-import requests
-from zk import ZK
+import metrics
+from datetime import datetime
+from mysql.connector import pooling
+from zk.exception import ZKError
 from dotenv import load_dotenv
 from pathlib import Path
-from datetime import datetime
+from zoho_attendance import new_punch
+from dispatcher import ZohoDispatcher
+from migrate import migrate
+from dedupe import DedupeIndex
+from employee_map import EmployeeMap
+from outbox import OutboxWriter, OutboxDrainer
+from resolver import BioResolver, ParkedWriter
+from devices import load_devices, connect, mark_seen, DeviceHealth
+from checkpoint import load_checkpoint, save_checkpoint, resume_index, advance, is_last_seen
 
 # Load environment variables
 load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
 
 DB_CONFIG = {
     "host": os.getenv("DB_HOST"),
+    "port": int(os.getenv("DB_PORT", 3306)),
     "user": os.getenv("DB_USER"),
     "password": os.getenv("DB_PASS"),
     "database": os.getenv("DB_NAME"),
 }
 
-DOMAIN = os.getenv("ZOHO_DOMAIN", "zoho.com")
-CLIENT_ID = os.getenv("ZOHO_CLIENT_ID")
-CLIENT_SECRET = os.getenv("ZOHO_CLIENT_SECRET")
-REFRESH_TOKEN = os.getenv("ZOHO_REFRESH_TOKEN")
-
-ZK_IP = os.getenv("ZK_IP", "192.168.68.52")
-ZK_PORT = int(os.getenv("ZK_PORT", "4370"))
-ZK_PASSWORD = os.getenv("ZK_PASSWORD", None)
-
-def get_access_token():
-    r = requests.post(f"https://accounts.{DOMAIN}/oauth/v2/token", data={
-        "refresh_token": REFRESH_TOKEN,
-        "client_id": CLIENT_ID,
-        "client_secret": CLIENT_SECRET,
-        "grant_type": "refresh_token"
-    })
-    r.raise_for_status()
-    return r.json()["access_token"]
-
-def send_attendance_to_zoho(emp_id, timestamp, atype):
-    token = get_access_token()
-    url = f"https://people.{DOMAIN}/people/api/attendance"
-    headers = {"Authorization": f"Zoho-oauthtoken {token}"}
-    data = {
-        "employeeId": emp_id,
-        "checkIn": timestamp if atype == "Check-in" else "",
-        "checkOut": timestamp if atype == "Check-out" else ""
-    }
-    r = requests.post(url, headers=headers, data=data)
-    if r.status_code == 200:
-        print(f"✅ Sent {atype} for {emp_id} at {timestamp}")
-        return True
-    else:
-        print(f"❌ Failed to send {atype} for {emp_id}: {r.text}")
-        return False
-
-def fetch_employee_mappings(conn):
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT zoho_emp_id, biometric_id FROM employees WHERE biometric_id IS NOT NULL")
-    rows = cursor.fetchall()
-    cursor.close()
-    return {str(row["biometric_id"]): row["zoho_emp_id"] for row in rows}
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "5"))
+
+# Live mode
+LIVE_TIMEOUT        = int(os.getenv("LIVE_TIMEOUT", "10"))
+CATCH_UP_INTERVAL   = float(os.getenv("CATCH_UP_INTERVAL", "300"))
+RECONNECT_DELAY     = float(os.getenv("RECONNECT_DELAY", "5"))
+RECONNECT_MAX_DELAY = float(os.getenv("RECONNECT_MAX_DELAY", "120"))
+
+# Fleet
+FLEET_STATUS_INTERVAL = float(os.getenv("FLEET_STATUS_INTERVAL", "60"))
+METRICS_PORT          = int(os.getenv("METRICS_PORT", "9108"))
+# mysql-connector caps a pool at 32 connections.
+DB_POOL_MAX_SIZE      = 32
 
 def log_exists(conn, bio_id, ts):
     cursor = conn.cursor()
-    cursor.execute("SELECT id FROM attendance_logs WHERE biometric_id=%s AND timestamp=%s", (bio_id, ts))
+    cursor.execute(
+        "SELECT 1 FROM attendance_logs WHERE biometric_id=%s AND timestamp=%s "
+        "UNION ALL SELECT 1 FROM attendance_outbox WHERE biometric_id=%s AND timestamp=%s "
+        "UNION ALL SELECT 1 FROM attendance_parked WHERE biometric_id=%s AND timestamp=%s LIMIT 1",
+        (bio_id, ts, bio_id, ts, bio_id, ts)
+    )
     exists = cursor.fetchone() is not None
     cursor.close()
     return exists
 
-def save_log(conn, bio_id, ts, emp_id, atype):
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO attendance_logs (biometric_id, timestamp, zoho_emp_id, type, created_at) VALUES (%s, %s, %s, %s, NOW())",
-        (bio_id, ts, emp_id, atype)
-    )
-    conn.commit()
-    cursor.close()
+class Pipeline:
+    """
+    State shared by all device workers: employee mapping (refreshed in the
+    background), resolver for unknown biometric IDs, dedupe index, Zoho
+    dispatcher and the outbox drainer.
 
-def main():
-    print("🔥 Starting final.py...")
+    Capture only commits punches to the outbox; the OutboxDrainer delivers
+    them to Zoho in the background on its own connection, so a slow or
+    unavailable Zoho never holds back device reads or checkpoints.
+    """
 
-    conn = mysql.connector.connect(**DB_CONFIG)
-    mapping = fetch_employee_mappings(conn)
-    unknown_ids = set()
+    def __init__(self, conn, connect):
+        self.employees = EmployeeMap()
+        self.employees.load(conn)
+        self.employees.start(connect)
+        self.unknown_ids = set()
+        self.dedupe = DedupeIndex()
+        self.dedupe.seed(conn)
+        self._lock = threading.Lock()
+        self.dispatcher = ZohoDispatcher().start()
+        self.drainer = OutboxDrainer(connect, self.dispatcher).start()
+        self.resolver = BioResolver(self.employees, connect, on_replayed=self.drainer.wake).start()
 
-    zk = ZK(ZK_IP, port=ZK_PORT, password=ZK_PASSWORD, timeout=10, force_udp=True)
-    try:
-        dev = zk.connect()
+    def resolve(self, bio_id):
+        """Zoho employee ID, or None if the punch has to be parked for now."""
+        emp_id = self.resolver.lookup(bio_id)
+        if not emp_id and bio_id not in self.unknown_ids:
+            print(f"⚠️ Unknown biometric ID {bio_id}. Parking its punches until it is resolved.")
+            self.unknown_ids.add(bio_id)
+        return emp_id
+
+    def claim(self, conn, bio_id, ts):
+        """True if the punch is new; it is then marked as recorded for every device."""
+        with self._lock:
+            if self.dedupe.seen(bio_id, ts, lambda b, t: log_exists(conn, b, t)):
+                return False
+            self.dedupe.add(bio_id, ts)
+            return True
+
+    def close(self):
+        self.resolver.stop()
+        self.employees.stop()
+        self.drainer.stop()
+        self.dispatcher.stop()
+
+
+class DeviceWorker:
+    """
+    Thread that follows one device in ``poll`` or ``live`` mode, writes its
+    punches to the outbox (or parks those of unknown biometric IDs) on its
+    own pooled connection and keeps its
+    DeviceHealth up to date. Device and database errors trigger a reconnect
+    with exponential backoff without affecting the other devices.
+    """
+
+    def __init__(self, pipeline, device, connect, mode="poll"):
+        self.pipeline = pipeline
+        self.device = device
+        self.connect = connect
+        self.mode = mode
+        self.health = DeviceHealth(device["name"])
+        self.labels = (device["name"],)
+        self.conn = None
+        self.outbox = None
+        self.parked = None
+        self.dev = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name=f"device-{self.device['name']}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self.dev is not None:
+            self.dev.end_live_capture = True
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def queue_log(self, serial, log):
+        """
+        Queue one device record for delivery to Zoho.
+
+        Returns the queued punch, or None if there is nothing to send now.
+        """
+        bio_id = str(log.user_id)
+        atype = "Check-in" if log.status == 0 else "Check-out"
+
+        if not self.pipeline.claim(self.conn, bio_id, log.timestamp):
+            return None  # Already recorded
+
+        emp_id = self.pipeline.resolve(bio_id)
+        if not emp_id:
+            self.parked.add(serial, bio_id, log.timestamp.strftime("%Y-%m-%d %H:%M:%S"), atype)
+            return None
+
+        punch = new_punch(serial, bio_id, emp_id, log.timestamp, atype)
+        self.outbox.add(serial, bio_id, punch["timestamp"], emp_id, atype)
+        self.health.punch(log.timestamp)
+        return punch
+
+    def process_logs(self, serial, logs, start):
+        """Queue ``logs[start:]`` and return the number of records handled."""
+        for i in range(start, len(logs)):
+            self.queue_log(serial, logs[i])
+        return len(logs)
+
+    def catch_up(self, dev, checkpoint):
+        """Process everything the device recorded since ``checkpoint`` and persist the new position."""
+        started, bytes_before = time.perf_counter(), dev.bytes_read
+        logs, base, start = fetch_new_logs(dev, checkpoint)
+        metrics.device_dump_seconds.observe(time.perf_counter() - started, self.labels)
+        metrics.device_dump_bytes.inc(dev.bytes_read - bytes_before, self.labels)
+        metrics.device_poll_records.observe(len(logs) - start, self.labels)
+        done = self.process_logs(checkpoint["serial"], logs, start)
+        # The checkpoint only moves once the punches are durable in the outbox.
+        self.flush()
+        checkpoint = advance(checkpoint, logs, done, base)
+        save_checkpoint(checkpoint)
+        self.health.observe(dev.records)
+        self.health.caught_up(checkpoint)
+        return checkpoint
+
+    def flush(self):
+        self.parked.flush()
+        if self.outbox.flush():
+            self.pipeline.drainer.wake()
+
+    def run_poll(self, dev, checkpoint):
         dev.disable_device()
-        print("✅ Connected to ZKTeco. Listening for new logs...")
+        try:
+            while not self._stop.is_set():
+                # read_sizes() is one small packet; only pull the full log when it grew or shrank.
+                # A full device may overwrite old records without changing the count, so always read then.
+                dev.read_sizes()
+                self.health.observe(dev.records)
+                device_full = dev.rec_cap and dev.records >= dev.rec_cap
+                if dev.records != checkpoint["records"] or device_full:
+                    checkpoint = self.catch_up(dev, checkpoint)
+                self._stop.wait(POLL_INTERVAL)
+        finally:
+            dev.enable_device()
+
+    def run_live(self, dev, checkpoint):
+        """
+        Forward punches as the device reports them through live_capture.
 
-        while True:
-            logs = dev.get_attendance()
-            if not logs:
-                time.sleep(5)
+        Every CATCH_UP_INTERVAL seconds the capture is paused for a
+        checkpoint read, which also picks up anything missed while
+        disconnected.
+        """
+        serial = checkpoint["serial"]
+        while not self._stop.is_set():
+            # A fresh connection reports 0 records until read_sizes() runs, which
+            # would turn the catch-up into a full read of the device log.
+            dev.read_sizes()
+            checkpoint = self.catch_up(dev, checkpoint)
+            deadline = time.monotonic() + CATCH_UP_INTERVAL
+            for log in dev.live_capture(new_timeout=LIVE_TIMEOUT):
+                if log is not None:
+                    # Live punches trickle in one by one; write each right away instead
+                    # of leaving it buffered until the next event or LIVE_TIMEOUT.
+                    self.queue_log(serial, log)
+                    self.flush()
+                if time.monotonic() >= deadline or self._stop.is_set():
+                    dev.end_live_capture = True
+
+    def run(self):
+        name = self.device["name"]
+        delay = RECONNECT_DELAY
+        while not self._stop.is_set():
+            try:
+                if self.conn is None:
+                    self.conn = self.connect()
+                    # Rows that failed to flush stay buffered and go out on the new connection.
+                    if self.outbox is None:
+                        self.outbox = OutboxWriter(self.conn)
+                        self.parked = ParkedWriter(self.conn)
+                    self.outbox.conn = self.parked.conn = self.conn
+                self.dev, serial = connect(self.device)
+                self.health.connected(serial)
+                mark_seen(self.conn, self.device, serial)
+                checkpoint = load_checkpoint(serial)
+                print(f"✅ Connected to ZKTeco {name} ({serial}, {self.mode}). Resuming after {checkpoint['records']} record(s).")
+                delay = RECONNECT_DELAY
+
+                if self.mode == "live":
+                    self.run_live(self.dev, checkpoint)
+                else:
+                    self.run_poll(self.dev, checkpoint)
+            except Exception as e:
+                self.health.failed(e)
+                print(f"❌ {name}: {e}. Reconnecting in {delay:.0f}s...")
+                if not isinstance(e, (ZKError, OSError)):
+                    self.close_db()  # the connection may be unusable
+                self.disconnect()
+                if self._stop.wait(delay):
+                    break
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
                 continue
+            self.disconnect()
+        self.close_db()
+        print(f"🔌 {name} stopped.")
+
+    def disconnect(self):
+        if self.dev is not None:
+            try:
+                self.dev.disconnect()
+            except Exception:
+                pass
+            self.dev = None
 
-            for log in logs:
-                bio_id = str(log.user_id)
-                ts = log.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                status = log.status
+    def close_db(self):
+        if self.conn is None:
+            return
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"❌ {self.device['name']}: could not flush outbox: {e}")
+        finally:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
 
-                emp_id = mapping.get(bio_id)
-                if not emp_id:
-                    if bio_id not in unknown_ids:
-                        print(f"⚠️ Unknown biometric ID {bio_id}. Skipping future warnings for this ID.")
-                        unknown_ids.add(bio_id)
-                    continue
+def fetch_new_logs(dev, checkpoint):
+    """
+    Read the records the checkpoint does not cover yet.
 
-                atype = "Check-in" if status == 0 else "Check-out"
+    Returns ``(logs, base, start)``: ``logs[0]`` is device record number
+    ``base`` and ``logs[start:]`` are new. When the checkpoint still lines up
+    with the device, only the tail from the last seen record is transferred;
+    otherwise the full log is read and matched by timestamp. Expects
+    ``dev.records`` from a ``read_sizes()`` call made just before.
+    """
+    n = checkpoint["records"]
+    if n and n <= dev.records:
+        logs = dev.get_attendance_since(n - 1)
+        if logs and is_last_seen(checkpoint, logs[0]):
+            return logs, n - 1, 1
+    logs = dev.get_attendance()
+    return logs, 0, resume_index(logs, checkpoint)
 
-                if log_exists(conn, bio_id, ts):
-                    continue  # Already recorded
+def _age(ts):
+    return None if ts is None else (datetime.now() - ts).total_seconds()
 
-                success = send_attendance_to_zoho(emp_id, ts, atype)
-                if success:
-                    save_log(conn, bio_id, ts, emp_id, atype)
+def register_metrics(pipeline, workers):
+    """Expose state the pipeline already tracks; read only when scraped."""
+    backlog = lambda key: (pipeline.drainer.backlog or {}).get(key)
+    health = lambda: [w.health.snapshot() for w in workers]
+    metrics.Callback("dedupe_hits_total", "Punches skipped as already recorded.",
+                     lambda: pipeline.dedupe.hits, kind="counter")
+    metrics.Callback("dedupe_db_lookups_total", "Dedupe checks that had to query the database.",
+                     lambda: pipeline.dedupe.db_lookups, kind="counter")
+    metrics.Callback("outbox_pending", "Punches waiting in the outbox.", lambda: backlog("depth"))
+    metrics.Callback("outbox_oldest_pending_age_seconds", "Age of the oldest punch not yet delivered.",
+                     lambda: _age(backlog("oldest")))
+    metrics.Callback("outbox_newest_pending_age_seconds", "Age of the newest punch not yet delivered.",
+                     lambda: _age(backlog("newest")))
+    metrics.Callback("outbox_delivered_total", "Outbox rows delivered to Zoho.",
+                     lambda: pipeline.drainer.sent, kind="counter")
+    metrics.Callback("outbox_failed_total", "Outbox delivery attempts that failed.",
+                     lambda: pipeline.drainer.failed, kind="counter")
+    metrics.Callback("parked_replayed_total", "Parked punches replayed after their biometric ID resolved.",
+                     lambda: pipeline.resolver.replayed, kind="counter")
+    metrics.Callback("device_up", "1 while the device worker is connected.",
+                     lambda: {h["name"]: int(h["state"] == "online") for h in health()}, labels=("device",))
+    metrics.Callback("device_lag_records", "Records on the device beyond the checkpoint.",
+                     lambda: {h["name"]: h["lag_records"] for h in health()}, labels=("device",))
+    metrics.Callback("device_lag_seconds", "Seconds since the last completed read of the device.",
+                     lambda: {h["name"]: h["lag_seconds"] for h in health()}, labels=("device",))
+    metrics.Callback("device_errors_total", "Device connection errors.",
+                     lambda: {h["name"]: h["errors"] for h in health()}, labels=("device",), kind="counter")
 
-            time.sleep(5)
+def print_fleet_status(workers):
+    for w in workers:
+        h = w.health.snapshot()
+        lag = "n/a" if h["lag_seconds"] is None else f"{h['lag_seconds']:.0f}s"
+        print(f"📟 {h['name']} [{h['serial'] or '?'}] {h['state']}: lag {h['lag_records']} record(s) / {lag}, "
+              f"queued {h['queued']}, errors {h['errors']}")
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Forward ZKTeco attendance to Zoho People.")
+    parser.add_argument("--mode", choices=["poll", "live"], default=os.getenv("INGEST_MODE", "poll"),
+                        help="poll: check the device every POLL_INTERVAL seconds; live: use real-time events")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print(f"🔥 Starting final.py ({args.mode} mode)...")
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        migrate(conn)
+        devices = load_devices(conn)
+    finally:
+        conn.close()
+    if not devices:
+        print("❌ No devices registered. Add rows to the devices table or set ZK_IP.")
+        return
+
+    # One connection per device, plus the outbox drainer, mapping refresher, resolver and setup.
+    if len(devices) + 4 > DB_POOL_MAX_SIZE:
+        print(f"⚠️ {len(devices)} devices exceed the DB pool; split them across several processes.")
+    pool = pooling.MySQLConnectionPool(pool_name="final", pool_size=min(len(devices) + 4, DB_POOL_MAX_SIZE), **DB_CONFIG)
+    conn = pool.get_connection()
+    try:
+        pipeline = Pipeline(conn, pool.get_connection)
     finally:
-        dev.enable_device()
-        dev.disconnect()
         conn.close()
-        print("🔒 DB connection closed. Device disconnected.")
+
+    workers = [DeviceWorker(pipeline, device, pool.get_connection, args.mode).start() for device in devices]
+    register_metrics(pipeline, workers)
+    metrics.serve(METRICS_PORT)
+    print(f"🛰️ Following {len(workers)} device(s).")
+    try:
+        while any(w.is_alive() for w in workers):
+            time.sleep(FLEET_STATUS_INTERVAL)
+            print_fleet_status(workers)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for w in workers:
+            w.stop()
+        for w in workers:
+            w.join()
+        pipeline.close()
+        print("🔒 DB connections closed.")
 
 if __name__ == "__main__":
     main()
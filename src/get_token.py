@@ -1,11 +1,11 @@
 # zoho_auth_tool.py
 
-import requests
 import json
 import os
 import webbrowser
 from datetime import datetime
 from dotenv import load_dotenv
+import zoho_client
 
 # Load env file
 load_dotenv("e.env")
@@ -102,7 +102,7 @@ def exchange_code_for_tokens(auth_code):
     }
 
     print("🔄 Exchanging auth code for access/refresh token...")
-    response = requests.post(url, data=data)
+    response = zoho_client.post(url, data=data)
 
     try:
         response.raise_for_status()
@@ -131,7 +131,7 @@ def refresh_access_token():
     }
 
     print("🔄 Requesting new access token using refresh token...")
-    response = requests.post(url, data=data)
+    response = zoho_client.post(url, data=data)
 
     try:
         response.raise_for_status()
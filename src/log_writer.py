@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+import metrics
+
+# ─── Config ───
+LOG_BATCH_SIZE      = int(os.getenv("LOG_BATCH_SIZE", "500"))
+LOG_FLUSH_INTERVAL  = float(os.getenv("LOG_FLUSH_INTERVAL", "2"))
+
+# Re-delivered punches hit uq_attendance_punch and are skipped, so callers
+# never need to check for an existing row first.
+INSERT_LOG = (
+    "INSERT IGNORE INTO attendance_logs (device_serial, biometric_id, timestamp, zoho_emp_id, type) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+
+
+class AttendanceLogWriter:
+    """
+    Buffers confirmed punches and writes them to ``attendance_logs`` with a
+    single ``executemany`` and one commit.
+
+    ``add`` may be called from any thread; flushing happens only in the
+    thread that owns the connection, through ``flush_if_due`` (at
+    ``batch_size`` rows or after ``max_delay`` seconds) or an explicit
+    ``flush`` at the end of a poll cycle.
+    """
+
+    query = INSERT_LOG
+    table = "attendance_logs"
+
+    def __init__(self, conn, batch_size=LOG_BATCH_SIZE, max_delay=LOG_FLUSH_INTERVAL):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._rows = []
+        self._first_at = None
+        self._lock = threading.Lock()
+
+        self.flushes = 0
+        self.rows_written = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, *row):
+        """Buffer one row, in the column order of ``query``."""
+        with self._lock:
+            if not self._rows:
+                self._first_at = time.monotonic()
+            self._rows.append(row)
+
+    def due(self):
+        if not self._rows:
+            return False
+        return len(self._rows) >= self.batch_size or time.monotonic() - self._first_at >= self.max_delay
+
+    def flush_if_due(self):
+        return self.flush() if self.due() else 0
+
+    def flush(self):
+        """Write all buffered rows. On error the rows stay buffered for the next flush."""
+        with self._lock:
+            if not self._rows:
+                return 0
+            rows = self._rows
+            start = time.perf_counter()
+            cursor = self.conn.cursor()
+            try:
+                cursor.executemany(self.query, rows)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+            metrics.db_write_seconds.observe(time.perf_counter() - start, (self.table,))
+            metrics.db_write_rows.inc(len(rows), (self.table,))
+            self._rows = []
+            self._first_at = None
+            self.flushes += 1
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def stats(self):
+        return {
+            "pending": len(self._rows),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+        }
@@ -0,0 +1,189 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS    = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Sharded:
+    """
+    Base for metrics updated from many threads without a lock: every thread
+    writes to its own shard and ``collect`` sums the shards at scrape time.
+    Labels are plain tuples; they are only formatted when scraped.
+    """
+
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()  # only taken once per thread, to register its shard
+        REGISTRY.append(self)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _merged(self):
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            for key, value in list(shard.items()):
+                merged.setdefault(key, []).append(value)
+        return merged
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, amount=1, labels=()):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self):
+        for labels, values in self._merged().items():
+            yield self.name, labels, sum(values)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            # [count per bucket..., +Inf count, sum]
+            cell = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def collect(self):
+        for labels, cells in self._merged().items():
+            counts = [sum(c[i] for c in cells) for i in range(len(self.buckets) + 1)]
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                total += count
+                yield self.name + "_bucket", labels + (("le", bound),), total
+            yield self.name + "_sum", labels, sum(c[-1] for c in cells)
+            yield self.name + "_count", labels, total
+
+
+class Callback:
+    """
+    A gauge or counter read at scrape time from ``fn``, for values the
+    pipeline already tracks. ``fn`` returns a number or a
+    ``{label values: number}`` dict.
+    """
+
+    def __init__(self, name, help, fn, labels=(), kind="gauge"):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labels = labels
+        self.kind = kind
+        REGISTRY.append(self)
+
+    def collect(self):
+        value = self.fn()
+        if isinstance(value, dict):
+            for labels, v in value.items():
+                if v is not None:
+                    yield self.name, labels if isinstance(labels, tuple) else (labels,), v
+        elif value is not None:
+            yield self.name, (), value
+
+
+REGISTRY = []
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values):
+    pairs = []
+    for name, value in zip(names, values):
+        pairs.append(f'{name}="{_escape(value)}"')
+    for extra in values[len(names):]:  # e.g. the histogram "le" pair
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+def render(registry=None):
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY if registry is None else registry:
+        try:
+            samples = list(metric.collect())
+        except Exception as e:
+            print(f"⚠️ Metric {metric.name} failed: {e}")
+            continue
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in samples:
+            lines.append(f"{name}{_format_labels(metric.labels, labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="0.0.0.0"):
+    """Serve ``/metrics`` on a daemon thread. Returns the server, or None if ``port`` is 0."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"📈 Metrics on http://{host}:{port}/metrics")
+    return server
+
+
+# ─── Shared metrics ───
+zoho_request_seconds = Histogram(
+    "zoho_request_duration_seconds", "Zoho HTTP request latency.", labels=("endpoint", "status"))
+db_write_seconds = Histogram(
+    "db_write_duration_seconds", "Duration of batched database writes.", labels=("table",))
+db_write_rows = Counter(
+    "db_write_rows_total", "Rows written by batched database writes.", labels=("table",))
+device_dump_seconds = Histogram(
+    "device_dump_duration_seconds", "Duration of attendance reads from a device.", labels=("device",))
+device_dump_bytes = Counter(
+    "device_dump_bytes_total", "Bytes received from devices in buffered reads.", labels=("device",))
+device_poll_records = Histogram(
+    "device_poll_records", "New records per device read.", labels=("device",), buckets=SIZE_BUCKETS)
+
+def _token_refreshes():
+    from zoho_token import get_token_manager  # zoho_token imports metrics through zoho_client
+    return get_token_manager().refreshes
+
+zoho_token_refreshes = Callback(
+    "zoho_token_refreshes_total", "Zoho OAuth token refreshes.", _token_refreshes, kind="counter")
@@ -0,0 +1,86 @@
+import os
+import mysql.connector
+from dotenv import load_dotenv
+from pathlib import Path
+
+# ─── Load environment from root .env ───
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+
+# ─── Config ───
+DB_CONFIG = {
+    "host":     os.getenv("DB_HOST", "127.0.0.1"),
+    "port":     int(os.getenv("DB_PORT", 3306)),
+    "user":     os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASS"),
+    "database": os.getenv("DB_NAME"),
+}
+
+MIGRATIONS_DIR = Path(os.getenv("MIGRATIONS_DIR", Path(__file__).resolve().parent.parent / "migrations"))
+LOCK_NAME = "zkteco_zoho_migrations"
+
+
+def split_statements(sql):
+    """Split a migration file into statements (``;`` at end of line, ``--`` comments)."""
+    statements, current = [], []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("--"):
+            continue
+        current.append(line)
+        if stripped.endswith(";"):
+            statements.append("\n".join(current).rstrip().rstrip(";"))
+            current = []
+    if current:
+        statements.append("\n".join(current))
+    return statements
+
+def pending_migrations(applied):
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        version = int(path.name.split("_", 1)[0])
+        if version not in applied:
+            yield version, path
+
+def migrate(conn):
+    """Apply every migration not yet recorded in schema_migrations. Safe to run concurrently."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT GET_LOCK(%s, 60)", (LOCK_NAME,))
+    if cursor.fetchone()[0] != 1:
+        cursor.close()
+        raise RuntimeError("Timed out waiting for the migration lock")
+    try:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version INT PRIMARY KEY,"
+            " name VARCHAR(255) NOT NULL,"
+            " applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+
+        done = []
+        for version, path in pending_migrations(applied):
+            print(f"🛠️ Applying migration {path.name}...")
+            for statement in split_statements(path.read_text()):
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, path.name)
+            )
+            conn.commit()
+            done.append(path.name)
+        return done
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cursor.fetchall()
+        cursor.close()
+
+def main():
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        done = migrate(conn)
+        print(f"✅ Schema up to date ({len(done)} migration(s) applied).")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
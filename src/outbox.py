@@ -0,0 +1,227 @@
+import os
+import socket
+import threading
+import time
+import uuid
+import metrics
+from log_writer import AttendanceLogWriter, INSERT_LOG
+from zoho_attendance import new_punch
+
+# ─── Config ───
+OUTBOX_FLUSH_INTERVAL = float(os.getenv("OUTBOX_FLUSH_INTERVAL", "0.2"))
+OUTBOX_LEASE_SIZE     = int(os.getenv("OUTBOX_LEASE_SIZE", "200"))
+OUTBOX_SCAN_LIMIT     = int(os.getenv("OUTBOX_SCAN_LIMIT", "2000"))
+OUTBOX_LEASE_SECONDS  = int(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+OUTBOX_POLL_INTERVAL  = float(os.getenv("OUTBOX_POLL_INTERVAL", "2"))
+OUTBOX_RETRY_BASE     = int(os.getenv("OUTBOX_RETRY_BASE", "30"))
+OUTBOX_RETRY_MAX      = int(os.getenv("OUTBOX_RETRY_MAX", "3600"))
+OUTBOX_MAX_ATTEMPTS   = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "20"))
+OUTBOX_BACKLOG_INTERVAL = float(os.getenv("OUTBOX_BACKLOG_INTERVAL", "15"))
+
+INSERT_OUTBOX = (
+    "INSERT IGNORE INTO attendance_outbox (device_serial, biometric_id, timestamp, zoho_emp_id, type) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+
+SCAN_PENDING = (
+    "SELECT id, device_serial, biometric_id, timestamp, zoho_emp_id, type, attempts, "
+    "next_attempt_at <= NOW() AND (lease_until IS NULL OR lease_until < NOW()) AS ready "
+    "FROM attendance_outbox WHERE status = 'pending' ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED"
+)
+
+MARK_SENT = (
+    "UPDATE attendance_outbox SET status = 'sent', sent_at = NOW(), last_error = NULL, "
+    "lease_owner = NULL, lease_until = NULL WHERE id = %s"
+)
+
+MARK_FAILED = (
+    "UPDATE attendance_outbox SET status = IF(attempts >= %s, 'failed', 'pending'), last_error = %s, "
+    "next_attempt_at = NOW() + INTERVAL %s SECOND, lease_owner = NULL, lease_until = NULL WHERE id = %s"
+)
+
+
+class OutboxWriter(AttendanceLogWriter):
+    """Batched, idempotent capture of punches into ``attendance_outbox`` as ``pending``."""
+
+    query = INSERT_OUTBOX
+    table = "attendance_outbox"
+
+    def __init__(self, conn, max_delay=OUTBOX_FLUSH_INTERVAL, **kw):
+        super().__init__(conn, max_delay=max_delay, **kw)
+
+
+def outbox_backlog(conn):
+    """Number of pending rows and the punch times of the oldest and newest of them."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM attendance_outbox WHERE status = 'pending'")
+    depth, oldest, newest = cursor.fetchone()
+    cursor.close()
+    conn.commit()
+    return {"depth": depth, "oldest": oldest, "newest": newest}
+
+def select_leasable(rows, limit):
+    """
+    Pick rows to lease from pending rows in id order.
+
+    Once an employee has a row that is not ready (backing off, or leased
+    by another drainer), none of their later rows are picked, so a retry
+    can never be overtaken by a newer punch of the same person.
+    """
+    blocked = set()
+    picked = []
+    for row in rows:
+        emp_id = row["zoho_emp_id"]
+        if emp_id in blocked:
+            continue
+        if not row["ready"]:
+            blocked.add(emp_id)
+            continue
+        picked.append(row)
+        if len(picked) >= limit:
+            break
+    return picked
+
+def retry_delay(attempts):
+    return min(OUTBOX_RETRY_BASE * 2 ** max(attempts - 1, 0), OUTBOX_RETRY_MAX)
+
+
+class OutboxDrainer:
+    """
+    Background thread that delivers pending outbox rows through a
+    ZohoDispatcher.
+
+    Rows are leased (``lease_owner``/``lease_until``, ``attempts`` + 1) in
+    a short transaction, delivered, and then marked ``sent`` together with
+    their ``attendance_logs`` row, or scheduled for a retry with
+    exponential backoff and ``last_error``. After ``OUTBOX_MAX_ATTEMPTS``
+    a row is parked as ``failed``. Leases of a crashed process simply
+    expire, so a restart resumes where it stopped.
+
+    The drainer owns its DB connection; ``connect`` is called to (re)open it.
+    """
+
+    def __init__(self, connect, dispatcher, lease_size=OUTBOX_LEASE_SIZE, poll_interval=OUTBOX_POLL_INTERVAL):
+        self.connect = connect
+        self.dispatcher = dispatcher
+        self.lease_size = lease_size
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.conn = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.backlog = None
+        self._backlog_at = 0
+
+        self.leased = 0
+        self.sent = 0
+        self.failed = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="outbox-drainer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if self.conn is not None:
+            self.conn.close()
+
+    def wake(self):
+        """New rows were committed; drain now instead of at the next poll."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.conn is None:
+                    self.conn = self.connect()
+                if time.monotonic() >= self._backlog_at:
+                    self.backlog = outbox_backlog(self.conn)
+                    self._backlog_at = time.monotonic() + OUTBOX_BACKLOG_INTERVAL
+                if self.drain_once():
+                    continue
+            except Exception as e:
+                print(f"❌ Outbox drainer error: {e}")
+                if self.conn is not None:
+                    try:
+                        self.conn.close()
+                    except Exception:
+                        pass
+                    self.conn = None
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def lease(self):
+        cursor = self.conn.cursor(dictionary=True)
+        try:
+            cursor.execute(SCAN_PENDING, (OUTBOX_SCAN_LIMIT,))
+            rows = select_leasable(cursor.fetchall(), self.lease_size)
+            if rows:
+                ids = [row["id"] for row in rows]
+                marks = ", ".join(["%s"] * len(ids))
+                cursor.execute(
+                    "UPDATE attendance_outbox SET lease_owner = %s, lease_until = NOW() + INTERVAL %s SECOND, "
+                    f"attempts = attempts + 1 WHERE id IN ({marks})",
+                    [self.owner, OUTBOX_LEASE_SECONDS] + ids
+                )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return rows
+
+    def drain_once(self):
+        """Lease, deliver and settle one batch. Returns the number of rows handled."""
+        rows = self.lease()
+        if not rows:
+            return 0
+        self.leased += len(rows)
+        punches = []
+        for row in rows:
+            punch = new_punch(row["device_serial"], str(row["biometric_id"]), row["zoho_emp_id"], row["timestamp"], row["type"])
+            punch["outbox_id"] = row["id"]
+            punch["attempts"] = row["attempts"] + 1
+            punches.append(punch)
+            self.dispatcher.submit(punch)
+        self.dispatcher.wait(punches)
+        self.settle(punches)
+        return len(rows)
+
+    def settle(self, punches):
+        sent = [p for p in punches if p["sent"]]
+        failed = [p for p in punches if not p["sent"]]
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            if sent:
+                cursor.executemany(MARK_SENT, [(p["outbox_id"],) for p in sent])
+                cursor.executemany(INSERT_LOG, [
+                    (p["serial"], p["bio_id"], p["timestamp"], p["emp_id"], p["type"]) for p in sent
+                ])
+            if failed:
+                cursor.executemany(MARK_FAILED, [
+                    (OUTBOX_MAX_ATTEMPTS, "Zoho did not accept the punch", retry_delay(p["attempts"]), p["outbox_id"])
+                    for p in failed
+                ])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        metrics.db_write_seconds.observe(time.perf_counter() - start, ("attendance_outbox_settle",))
+        self.sent += len(sent)
+        self.failed += len(failed)
+
+    def stats(self):
+        return {
+            "leased": self.leased,
+            "sent": self.sent,
+            "failed": self.failed,
+        }
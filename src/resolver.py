@@ -0,0 +1,267 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+import requests
+import zoho_client
+from dotenv import load_dotenv
+from pathlib import Path
+from log_writer import AttendanceLogWriter
+from zoho_token import get_access_token
+
+# ─── Load environment from root .env ───
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+
+# ─── Config ───
+DOMAIN                = os.getenv("ZOHO_DOMAIN", "zoho.com")
+PEOPLE_URL            = os.getenv("ZOHO_PEOPLE_URL", f"https://people.{DOMAIN}")
+# Zoho People field holding the device user ID; the Zoho lookup is skipped when unset.
+ZOHO_BIOMETRIC_FIELD  = os.getenv("ZOHO_BIOMETRIC_FIELD", "")
+ZOHO_EMPLOYEE_FORM    = os.getenv("ZOHO_EMPLOYEE_FORM", "employee")
+RESOLVER_CACHE_SIZE   = int(os.getenv("RESOLVER_CACHE_SIZE", "1024"))
+RESOLVER_NEGATIVE_TTL = float(os.getenv("RESOLVER_NEGATIVE_TTL", "300"))
+RESOLVER_SCAN_INTERVAL = float(os.getenv("RESOLVER_SCAN_INTERVAL", "60"))
+
+INSERT_PARKED = (
+    "INSERT IGNORE INTO attendance_parked (device_serial, biometric_id, timestamp, type) "
+    "VALUES (%s, %s, %s, %s)"
+)
+
+
+class ParkedWriter(AttendanceLogWriter):
+    """Batched capture of punches whose biometric ID is not mapped yet."""
+
+    query = INSERT_PARKED
+    table = "attendance_parked"
+
+
+def lookup_db(conn, bio_id):
+    cursor = conn.cursor()
+    cursor.execute("SELECT zoho_emp_id FROM employees WHERE biometric_id = %s", (bio_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    conn.commit()
+    return row[0] if row else None
+
+def parse_employee_records(payload):
+    """Employee IDs from a forms ``getRecords`` response."""
+    resp = payload.get("response", {}) if isinstance(payload, dict) else {}
+    if str(resp.get("status", 0)) != "0":
+        return []
+    emp_ids = []
+    for item in resp.get("result") or []:
+        for records in (item.values() if isinstance(item, dict) else []):
+            for record in records if isinstance(records, list) else [records]:
+                emp_id = isinstance(record, dict) and record.get("EmployeeID")
+                if emp_id:
+                    emp_ids.append(emp_id)
+    return emp_ids
+
+def lookup_zoho(bio_id):
+    """Find the employee whose ZOHO_BIOMETRIC_FIELD equals ``bio_id``."""
+    if not ZOHO_BIOMETRIC_FIELD:
+        return None
+    url = f"{PEOPLE_URL}/people/api/forms/{ZOHO_EMPLOYEE_FORM}/getRecords"
+    search = f"{{searchField:'{ZOHO_BIOMETRIC_FIELD}',searchOperator:'Is',searchText:'{bio_id}'}}"
+    headers = {"Authorization": f"Zoho-oauthtoken {get_access_token()}"}
+    try:
+        r = zoho_client.get(url, headers=headers, params={"searchParams": search})
+    except requests.RequestException as e:
+        print(f"❌ Zoho lookup of biometric ID {bio_id} failed: {e}")
+        return None
+    if r.status_code != 200:
+        return None
+    try:
+        emp_ids = parse_employee_records(r.json())
+    except ValueError:
+        return None
+    return emp_ids[0] if len(emp_ids) == 1 else None
+
+def replay_parked(conn, bio_id, emp_id):
+    """Move parked punches of ``bio_id`` into the outbox in one transaction. Returns the count."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT id, device_serial, timestamp, type FROM attendance_parked WHERE biometric_id = %s FOR UPDATE",
+            (bio_id,)
+        )
+        rows = cursor.fetchall()
+        if rows:
+            cursor.executemany(
+                "INSERT IGNORE INTO attendance_outbox (device_serial, biometric_id, timestamp, zoho_emp_id, type) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [(serial, bio_id, ts, emp_id, atype) for _, serial, ts, atype in rows]
+            )
+            cursor.executemany("DELETE FROM attendance_parked WHERE id = %s", [(row[0],) for row in rows])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+class BioResolver:
+    """
+    Resolves biometric IDs missing from the EmployeeMap.
+
+    ``lookup`` never blocks: it answers from the EmployeeMap, an LRU of
+    earlier resolutions or a TTL cache of failed ones, and otherwise queues
+    the ID for a background thread. That thread tries a single-row DB
+    lookup, then Zoho, and replays the ID's parked punches into the outbox
+    once it is resolved. Parked IDs are rescanned every
+    ``RESOLVER_SCAN_INTERVAL`` seconds, after their negative entry expired.
+    """
+
+    def __init__(self, employees, connect, on_replayed=None,
+                 cache_size=RESOLVER_CACHE_SIZE, negative_ttl=RESOLVER_NEGATIVE_TTL):
+        self.employees = employees
+        self.connect = connect
+        self.on_replayed = on_replayed
+        self.cache_size = cache_size
+        self.negative_ttl = negative_ttl
+        self._cache = OrderedDict()
+        self._negative = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.cache_hits = 0
+        self.negative_hits = 0
+        self.db_resolved = 0
+        self.zoho_resolved = 0
+        self.unresolved = 0
+        self.replayed = 0
+
+    def lookup(self, bio_id):
+        """Zoho employee ID for ``bio_id``, or None while it is unresolved."""
+        emp_id = self.employees.get(bio_id)
+        if emp_id:
+            return emp_id
+        with self._lock:
+            emp_id = self._cache.get(bio_id)
+            if emp_id:
+                self._cache.move_to_end(bio_id)
+                self.cache_hits += 1
+                return emp_id
+            if self._negative.get(bio_id, 0) > time.monotonic():
+                self.negative_hits += 1
+                return None
+            if bio_id not in self._pending:
+                self._pending.add(bio_id)
+                self._queue.put(bio_id)
+        return None
+
+    def remember(self, bio_id, emp_id):
+        with self._lock:
+            self._cache[bio_id] = emp_id
+            self._cache.move_to_end(bio_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self._negative.pop(bio_id, None)
+
+    def resolve(self, conn, bio_id):
+        emp_id = lookup_db(conn, bio_id)
+        if emp_id:
+            self.db_resolved += 1
+        else:
+            emp_id = lookup_zoho(bio_id)
+            if emp_id:
+                self.zoho_resolved += 1
+                print(f"🔎 Biometric ID {bio_id} resolved through Zoho to {emp_id}.")
+        if emp_id:
+            self.remember(bio_id, emp_id)
+        else:
+            self.unresolved += 1
+            with self._lock:
+                self._negative[bio_id] = time.monotonic() + self.negative_ttl
+        return emp_id
+
+    def handle(self, conn, bio_id):
+        """Resolve ``bio_id`` and replay its parked punches if that worked."""
+        try:
+            emp_id = self.employees.get(bio_id) or self._cache.get(bio_id) or self.resolve(conn, bio_id)
+        finally:
+            with self._lock:
+                self._pending.discard(bio_id)
+        if emp_id:
+            replayed = replay_parked(conn, bio_id, emp_id)
+            if replayed:
+                self.replayed += replayed
+                print(f"♻️ Replayed {replayed} parked punch(es) of biometric ID {bio_id}.")
+                if self.on_replayed:
+                    self.on_replayed()
+        return emp_id
+
+    def scan_parked(self, conn):
+        """Queue every parked ID that may be resolvable by now."""
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT biometric_id FROM attendance_parked")
+        bio_ids = [str(row[0]) for row in cursor.fetchall()]
+        cursor.close()
+        conn.commit()
+        now = time.monotonic()
+        with self._lock:
+            self._negative = {b: until for b, until in self._negative.items() if until > now}
+        for bio_id in bio_ids:
+            self.lookup(bio_id)
+            with self._lock:
+                # Known IDs are answered by lookup() without queueing; replay them too.
+                if bio_id not in self._pending and (self.employees.get(bio_id) or bio_id in self._cache):
+                    self._pending.add(bio_id)
+                    self._queue.put(bio_id)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="bio-resolver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        conn = None
+        next_scan = 0
+        while not self._stop.is_set():
+            try:
+                if conn is None:
+                    conn = self.connect()
+                if time.monotonic() >= next_scan:
+                    next_scan = time.monotonic() + RESOLVER_SCAN_INTERVAL
+                    self.scan_parked(conn)
+                try:
+                    bio_id = self._queue.get(timeout=max(next_scan - time.monotonic(), 0))
+                except queue.Empty:
+                    continue
+                if bio_id is not None:
+                    self.handle(conn, bio_id)
+            except Exception as e:
+                print(f"❌ Biometric ID resolver error: {e}")
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+                self._stop.wait(1)
+        if conn is not None:
+            conn.close()
+
+    def stats(self):
+        return {
+            "cached": len(self._cache),
+            "negative": len(self._negative),
+            "cache_hits": self.cache_hits,
+            "negative_hits": self.negative_hits,
+            "db_resolved": self.db_resolved,
+            "zoho_resolved": self.zoho_resolved,
+            "unresolved": self.unresolved,
+            "replayed": self.replayed,
+        }
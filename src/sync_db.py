@@ -1,19 +1,27 @@
 import os
-import requests
+import time
 import mysql.connector
-from zk import ZK
+import metrics
 from datetime import datetime
 from dotenv import load_dotenv
 from pathlib import Path
+from zoho_token import get_access_token
+from migrate import migrate
+import zoho_client
+from devices import load_devices, connect
 
 # ─── Load environment from root .env ───
 load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
 
 # ─── Config ───
 DOMAIN        = os.getenv("ZOHO_DOMAIN", "zoho.com")
-CLIENT_ID     = os.getenv("ZOHO_CLIENT_ID")
-CLIENT_SECRET = os.getenv("ZOHO_CLIENT_SECRET")
-REFRESH_TOKEN = os.getenv("ZOHO_REFRESH_TOKEN")
+PEOPLE_URL    = os.getenv("ZOHO_PEOPLE_URL", f"https://people.{DOMAIN}")
+EMPLOYEE_PAGE_SIZE = 200
+
+# Its own port, so the sync job can run next to final.py (9108) on one host.
+SYNC_METRICS_PORT   = int(os.getenv("SYNC_METRICS_PORT", "9109"))
+# Keep serving metrics this long after the run so a scrape can pick them up.
+SYNC_METRICS_LINGER = float(os.getenv("SYNC_METRICS_LINGER", "30"))
 
 DB_CONFIG = {
     "host":     os.getenv("DB_HOST", "127.0.0.1"),
@@ -23,50 +31,42 @@ DB_CONFIG = {
     "database": os.getenv("DB_NAME"),
 }
 
-ZK_IP       = os.getenv("ZK_IP")
-ZK_PORT     = int(os.getenv("ZK_PORT", 4370))
-ZK_PASSWORD = os.getenv("ZK_PASSWORD", None)
-
-# ─── Token Cache ───
-_token_cache = {}
-def get_access_token():
-    import time
-    now = time.time()
-    info = _token_cache.get("info")
-    if info and now < info["fetched"] + info["expires_in"] - 60:
-        return info["access_token"]
-
-    resp = requests.post(
-        f"https://accounts.{DOMAIN}/oauth/v2/token",
-        data={
-            "refresh_token": REFRESH_TOKEN,
-            "client_id": CLIENT_ID,
-            "client_secret": CLIENT_SECRET,
-            "grant_type": "refresh_token"
-        }
-    )
-    resp.raise_for_status()
-    d = resp.json()
-    _token_cache["info"] = {
-        "access_token": d["access_token"],
-        "expires_in":   int(d.get("expires_in", 3600)),
-        "fetched":      now
-    }
-    return d["access_token"]
+# ─── Metrics ───
+sync_seconds = metrics.Histogram("sync_step_duration_seconds", "Duration of sync steps.", labels=("step",))
+sync_employees = metrics.Counter("sync_employees_total", "Employees written by the Zoho sync.", labels=("result",))
+sync_biometric_updates = metrics.Counter(
+    "sync_biometric_updates_total", "Biometric IDs matched per device.", labels=("device",))
+sync_failures = metrics.Counter("sync_failures_total", "Failed sync steps.", labels=("step",))
 
-# ─── Fetch Zoho Employees ───
-def fetch_zoho_employees():
-    token   = get_access_token()
-    url     = f"https://people.{DOMAIN}/people/api/forms/P_EmployeeView/records?per_page=200"
-    headers = {"Authorization": f"Zoho-oauthtoken {token}"}
+def timed(step, fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    except Exception:
+        sync_failures.inc(1, (step,))
+        raise
+    finally:
+        sync_seconds.observe(time.perf_counter() - start, (step,))
 
-    resp = requests.get(url, headers=headers)
-    resp.raise_for_status()
-    data = resp.json()
-    records = data.get("data") if isinstance(data, dict) else data
+# ─── Fetch Zoho Employees ───
+def fetch_employee_records():
+    """All P_EmployeeView rows, read page by page (Zoho returns at most 200 per request)."""
+    url     = f"{PEOPLE_URL}/people/api/forms/P_EmployeeView/records"
+    headers = {"Authorization": f"Zoho-oauthtoken {get_access_token()}"}
+
+    records = []
+    while True:
+        resp = zoho_client.get(url, headers=headers, params={"sIndex": len(records) + 1, "limit": EMPLOYEE_PAGE_SIZE})
+        resp.raise_for_status()
+        data = resp.json()
+        page = data.get("data") if isinstance(data, dict) else data
+        records.extend(page or [])
+        if not page or len(page) < EMPLOYEE_PAGE_SIZE:
+            return records
 
+def fetch_zoho_employees():
     employees = []
-    for r in records:
+    for r in fetch_employee_records():
         emp_id = r.get("Employee ID")
         name = r.get("ownerName") or f"{r.get('First Name', '').strip()} {r.get('Last Name', '').strip()}".strip()
         status = 1 if r.get("Employee Status", "").lower() == "active" else 0
@@ -96,50 +96,67 @@ def sync_zoho(conn):
 
     conn.commit()
     cursor.close()
+    sync_employees.inc(ins, ("inserted",))
+    sync_employees.inc(upd, ("updated",))
     print(f"✅ Zoho sync: fetched={len(emps)}, inserted={ins}, updated={upd}")
 
 # ─── Sync Biometric IDs ───
 def sync_biometric(conn):
-    zk  = ZK(ZK_IP, port=ZK_PORT, password=ZK_PASSWORD, timeout=10, force_udp=True)
-    dev = zk.connect()
-    dev.disable_device()
-
-    cursor = conn.cursor()
+    for device in load_devices(conn):
+        try:
+            timed("biometric", sync_device_users, conn, device)
+        except Exception as e:
+            print(f"❌ Biometric sync failed for {device['name']}: {e}")
+
+def sync_device_users(conn, device):
+    dev, serial = connect(device)
     updated = 0
+    try:
+        dev.disable_device()
+        cursor = conn.cursor()
 
-    for user in dev.get_users():
-        normalized_name = user.name.strip().replace(" ", "").replace("-", "").lower()
-        bio_id = user.user_id
+        for user in dev.get_users():
+            normalized_name = user.name.strip().replace(" ", "").replace("-", "").lower()
+            bio_id = user.user_id
 
-        cursor.execute(
-            "SELECT id FROM employees WHERE REPLACE(REPLACE(LOWER(name),' ',''),'-','')=%s",
-            (normalized_name,)
-        )
-        if cursor.fetchone():
             cursor.execute(
-                "UPDATE employees SET biometric_id=%s WHERE REPLACE(REPLACE(LOWER(name),' ',''),'-','')=%s",
-                (bio_id, normalized_name)
+                "SELECT id FROM employees WHERE REPLACE(REPLACE(LOWER(name),' ',''),'-','')=%s",
+                (normalized_name,)
             )
-            updated += 1
-        else:
-            print(f"⚠️  ZKTeco user '{user.name}' (UID:{bio_id}) not in employees")
-
-    conn.commit()
-    cursor.close()
-    dev.enable_device()
-    dev.disconnect()
+            if cursor.fetchone():
+                cursor.execute(
+                    "UPDATE employees SET biometric_id=%s WHERE REPLACE(REPLACE(LOWER(name),' ',''),'-','')=%s",
+                    (bio_id, normalized_name)
+                )
+                updated += 1
+            else:
+                print(f"⚠️  ZKTeco user '{user.name}' (UID:{bio_id}) not in employees")
+
+        conn.commit()
+        cursor.close()
+    finally:
+        # A failed sync must not leave the terminal locked or its session open.
+        try:
+            dev.enable_device()
+        finally:
+            dev.disconnect()
 
-    print(f"✅ Biometric sync: updated_biometric_ids={updated}")
+    sync_biometric_updates.inc(updated, (device["name"],))
+    print(f"✅ Biometric sync ({device['name']}, {serial}): updated_biometric_ids={updated}")
 
 # ─── Main ───
 def main():
+    server = metrics.serve(SYNC_METRICS_PORT)
     conn = mysql.connector.connect(**DB_CONFIG)
     try:
-        sync_zoho(conn)
+        migrate(conn)
+        timed("zoho", sync_zoho, conn)
         sync_biometric(conn)
     finally:
         conn.close()
         print("🔒 Database connection closed.")
+        if server and SYNC_METRICS_LINGER:
+            time.sleep(SYNC_METRICS_LINGER)
 
 if __name__ == "__main__":
     main()
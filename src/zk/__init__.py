@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+# pyzk 0.9 (https://github.com/fananimi/pyzk), extended for this project.
+# It ships with src/ and shadows any pip-installed pyzk.
+from .base import ZK
+
+VERSION = (0, 9)
+
+__all__ = ['ZK']
+
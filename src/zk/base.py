@@ -0,0 +1,2100 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import sys
+from datetime import datetime
+from socket import AF_INET, SOCK_DGRAM, SOCK_STREAM, SOL_SOCKET, SO_RCVBUF, socket, timeout
+from struct import Struct, pack, unpack, unpack_from
+from time import monotonic
+import codecs
+
+from . import const
+from .attendance import Attendance
+from .exception import ZKErrorConnection, ZKErrorResponse, ZKNetworkError
+from .user import User
+from .finger import Finger
+
+try:
+    import numpy as np
+except ImportError: # optional, only get_attendance_array needs it
+    np = None
+
+# record layouts, compiled once and shared by the decoders
+ATTENDANCE_8 = Struct('<HBIB')
+ATTENDANCE_16 = Struct('<IIBB2sI')
+ATTENDANCE_40 = Struct('<H24sBIB8s')
+USER_28 = Struct('<HB5s8sIxBhI')
+USER_72 = Struct('<HB8s24sIx7sx24s')
+TEMPLATE_HEADER = Struct('<HHbb')
+CHECKSUM_WORD = Struct('H')
+
+# windowed buffer reads (read_window > 1)
+MIN_CHUNK = 1024 # one UDP data packet
+RECV_BUFFER = 1 << 21 # room for a full window of answers while the caller is busy
+MIN_READ_TIMEOUT = 0.2
+CHUNK_RETRIES = 3
+
+# the same attendance layouts as numpy dtypes, for get_attendance_array
+if np is not None:
+    ATTENDANCE_DTYPES = {
+        8: np.dtype([('uid', '<u2'), ('status', 'u1'), ('time', '<u4'), ('punch', 'u1')]),
+        16: np.dtype([('user_id', '<u4'), ('time', '<u4'), ('status', 'u1'), ('punch', 'u1'),
+                      ('reserved', 'V2'), ('workcode', '<u4')]),
+        40: np.dtype([('uid', '<u2'), ('user_id', 'S24'), ('status', 'u1'), ('time', '<u4'),
+                      ('punch', 'u1'), ('space', 'V8')]),
+    }
+
+
+def safe_cast(val, to_type, default=None):
+    #https://stackoverflow.com/questions/6330071/safe-casting-in-python
+    try:
+        return to_type(val)
+    except (ValueError, TypeError):
+        return default
+
+
+def make_commkey(key, session_id, ticks=50):
+    """
+    take a password and session_id and scramble them to send to the machine.
+    copied from commpro.c - MakeKey
+    """
+    key = int(key)
+    session_id = int(session_id)
+    k = 0
+    for i in range(32):
+        if (key & (1 << i)):
+            k = (k << 1 | 1)
+        else:
+            k = k << 1
+    k += session_id
+
+    k = pack(b'I', k)
+    k = unpack(b'BBBB', k)
+    k = pack(
+        b'BBBB',
+        k[0] ^ ord('Z'),
+        k[1] ^ ord('K'),
+        k[2] ^ ord('S'),
+        k[3] ^ ord('O'))
+    k = unpack(b'HH', k)
+    k = pack(b'HH', k[1], k[0])
+
+    B = 0xff & ticks
+    k = unpack(b'BBBB', k)
+    k = pack(
+        b'BBBB',
+        k[0] ^ B,
+        k[1] ^ B,
+        B,
+        k[3] ^ B)
+    return k
+
+
+class ZK_helper(object):
+    """
+    ZK helper class
+    """
+
+    def __init__(self, ip, port=4370):
+        """
+        Construct a new 'ZK_helper' object.
+        """
+        self.address = (ip, port)
+        self.ip = ip
+        self.port = port
+
+    def test_ping(self):
+        """
+        Returns True if host responds to a ping request
+
+        :return: bool
+        """
+        import subprocess, platform
+        # Ping parameters as function of OS
+        ping_str = "-n 1" if  platform.system().lower()=="windows" else "-c 1 -W 5"
+        args = "ping " + " " + ping_str + " " + self.ip
+        need_sh = False if  platform.system().lower()=="windows" else True
+        # Ping
+        return subprocess.call(args,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            shell=need_sh) == 0
+
+    def test_tcp(self):
+        """
+        test TCP connection
+        """
+
+        self.client = socket(AF_INET, SOCK_STREAM)
+        self.client.settimeout(10)
+        res = self.client.connect_ex(self.address)
+        self.client.close()
+        return res
+
+    def test_udp(self):
+        """
+        test UDP connection
+        """
+        self.client = socket(AF_INET, SOCK_DGRAM)
+        self.client.settimeout(10)
+
+
+class ZK(object):
+    """
+    ZK main class
+    """
+    def __init__(self, ip, port=4370, timeout=60, password=0, force_udp=False, ommit_ping=False, verbose=False, encoding='UTF-8', user_cache=None, read_window=1):
+        """
+        Construct a new 'ZK' object.
+
+        :param ip: machine's IP address
+        :param port: machine's port
+        :param timeout: timeout number
+        :param password: passint
+        :param force_udp: use UDP connection
+        :param omit_ping: check ip using ping before connect
+        :param verbose: showing log while run the commands
+        :param encoding: user encoding
+        :param user_cache: directory to keep each device's user table in,
+            so attendance reads skip the user download across restarts
+        :param read_window: buffered reads over UDP keep up to this many
+            chunk requests in flight (1: one at a time)
+        """
+        User.encoding = encoding
+        self.__address = (ip, port)
+        self.__sock = socket(AF_INET, SOCK_DGRAM)
+        self.__sock.settimeout(timeout)
+        self.__timeout = timeout
+        self.__password = password # passint
+        self.__session_id = 0
+        self.__reply_id = const.USHRT_MAX - 1
+        self.__data_recv = None
+        self.__data = None
+
+        self.is_connect = False
+        self.is_enabled = True
+        self.helper = ZK_helper(ip, port)
+        self.force_udp = force_udp
+        self.ommit_ping = ommit_ping
+        self.verbose = verbose
+        self.encoding = encoding
+        self.tcp = not force_udp
+        self.users = 0
+        self.fingers = 0
+        self.records = 0
+        self.dummy = 0
+        self.cards = 0
+        self.fingers_cap = 0
+        self.users_cap = 0
+        self.rec_cap = 0
+        self.faces = 0
+        self.faces_cap = 0
+        self.fingers_av = 0
+        self.users_av = 0
+        self.rec_av = 0
+        self.next_uid = 1
+        self.next_user_id='1'
+        self.user_packet_size = 28 # default zk6
+        self.end_live_capture = False
+        self.bytes_read = 0 # payload bytes received through buffered reads
+        self.user_cache = user_cache
+        self.__serialnumber = None
+        self.__user_table = None # (serial, users, fingers), user_packet_size, users
+        self.read_window = read_window
+        self.__pipelining = None # does the device answer pipelined 1504s? None: unknown yet
+        self.__chunk = None # windowed chunk size, tuned by loss
+        self.__srtt = None # smoothed round trip of chunk requests
+
+    def __nonzero__(self):
+        """
+        for boolean test
+        """
+        return self.is_connect
+
+    def __create_socket(self):
+        if self.tcp:
+            self.__sock = socket(AF_INET, SOCK_STREAM)
+            self.__sock.settimeout(self.__timeout)
+            self.__sock.connect_ex(self.__address)
+        else:
+            self.__sock = socket(AF_INET, SOCK_DGRAM)
+            self.__sock.settimeout(self.__timeout)
+        if self.read_window > 1:
+            self.__sock.setsockopt(SOL_SOCKET, SO_RCVBUF, RECV_BUFFER)
+
+    def __create_tcp_top(self, packet):
+        """
+        witch the complete packet set top header
+        """
+        length = len(packet)
+        top = pack('<HHI', const.MACHINE_PREPARE_DATA_1, const.MACHINE_PREPARE_DATA_2, length)
+        return top + packet
+
+    def __create_header(self, command, command_string, session_id, reply_id):
+        """
+        Puts a the parts that make up a packet together and packs them into a byte string
+        """
+        buf = pack('<4H', command, 0, session_id, reply_id) + command_string
+        buf = unpack('8B' + '%sB' % len(command_string), buf)
+        checksum = unpack('H', self.__create_checksum(buf))[0]
+        reply_id += 1
+        if reply_id >= const.USHRT_MAX:
+            reply_id -= const.USHRT_MAX
+
+        buf = pack('<4H', command, checksum, session_id, reply_id)
+        return buf + command_string
+
+    def __create_checksum(self, p):
+        """
+        Calculates the checksum of the packet to be sent to the time clock
+        Copied from zkemsdk.c
+        """
+        if not isinstance(p, (bytes, bytearray, memoryview)):
+            p = bytes(p) # __create_header passes a tuple of byte values
+        l = len(p)
+        checksum = 0
+        for (word,) in CHECKSUM_WORD.iter_unpack(memoryview(p)[:l - l % 2]):
+            checksum += word
+            if checksum > const.USHRT_MAX:
+                checksum -= const.USHRT_MAX
+        if l % 2:
+            checksum = checksum + p[-1]
+
+        while checksum > const.USHRT_MAX:
+            checksum -= const.USHRT_MAX
+
+        checksum = ~checksum
+
+        while checksum < 0:
+            checksum += const.USHRT_MAX
+
+        return pack('H', checksum)
+
+    def __test_tcp_top(self, packet):
+        """
+        return size!
+        """
+        if len(packet)<=8:
+            return 0
+        tcp_header = unpack('<HHI', packet[:8])
+        if tcp_header[0] == const.MACHINE_PREPARE_DATA_1 and tcp_header[1] == const.MACHINE_PREPARE_DATA_2:
+            return tcp_header[2]
+        return 0
+
+    def __send_command(self, command, command_string=b'', response_size=8):
+        """
+        send command to the terminal
+        """
+        if command not in [const.CMD_CONNECT, const.CMD_AUTH] and not self.is_connect:
+            raise ZKErrorConnection("instance are not connected.")
+
+        buf = self.__create_header(command, command_string, self.__session_id, self.__reply_id)
+        try:
+            if self.tcp:
+                top = self.__create_tcp_top(buf)
+                self.__sock.send(top)
+                self.__tcp_data_recv = self.__sock.recv(response_size + 8)
+                self.__tcp_length = self.__test_tcp_top(self.__tcp_data_recv)
+                if self.__tcp_length == 0:
+                    raise ZKNetworkError("TCP packet invalid")
+                self.__header = unpack('<4H', self.__tcp_data_recv[8:16])
+                self.__data_recv = self.__tcp_data_recv[8:]
+            else:
+                self.__sock.sendto(buf, self.__address)
+                self.__data_recv = self.__sock.recv(response_size)
+                self.__header = unpack('<4H', self.__data_recv[:8])
+        except Exception as e:
+            raise ZKNetworkError(str(e))
+
+        self.__response = self.__header[0]
+        self.__reply_id = self.__header[3]
+        self.__data = self.__data_recv[8:]
+        if self.__response in [const.CMD_ACK_OK, const.CMD_PREPARE_DATA, const.CMD_DATA]:
+            return {
+                'status': True,
+                'code': self.__response
+            }
+        return {
+            'status': False,
+            'code': self.__response
+        }
+
+    def __ack_ok(self):
+        """
+        event ack ok
+        """
+        buf = self.__create_header(const.CMD_ACK_OK, b'', self.__session_id, const.USHRT_MAX - 1)
+        try:
+            if self.tcp:
+                top = self.__create_tcp_top(buf)
+                self.__sock.send(top)
+            else:
+                self.__sock.sendto(buf, self.__address)
+        except Exception as e:
+            raise ZKNetworkError(str(e))
+
+    def __get_data_size(self):
+        """
+        Checks a returned packet to see if it returned CMD_PREPARE_DATA,
+        indicating that data packets are to be sent
+
+        Returns the amount of bytes that are going to be sent
+        """
+        response = self.__response
+        if response == const.CMD_PREPARE_DATA:
+            size = unpack('I', self.__data[:4])[0]
+            return size
+        else:
+            return 0
+
+    def __reverse_hex(self, hex):
+        data = ''
+        for i in reversed(range(len(hex) / 2)):
+            data += hex[i * 2:(i * 2) + 2]
+        return data
+
+    def __decode_time(self, t):
+        """
+        Decode a timestamp retrieved from the timeclock
+
+        copied from zkemsdk.c - DecodeTime
+        """
+
+        return self.__decode_ticks(unpack("<I", t)[0])
+
+    def __decode_ticks(self, t):
+        """
+        Decode a timestamp already unpacked to an int
+        """
+        second = t % 60
+        t = t // 60
+
+        minute = t % 60
+        t = t // 60
+
+        hour = t % 24
+        t = t // 24
+
+        day = t % 31 + 1
+        t = t // 31
+
+        month = t % 12 + 1
+        t = t // 12
+
+        year = t + 2000
+
+        d = datetime(year, month, day, hour, minute, second)
+
+        return d
+
+    def __decode_timehex(self, timehex):
+        """
+        timehex string of six bytes
+        """
+        year, month, day, hour, minute, second = unpack("6B", timehex)
+        year += 2000
+        d = datetime(year, month, day, hour, minute, second)
+        return d
+
+    def __encode_time(self, t):
+        """
+        Encode a timestamp so that it can be read on the timeclock
+        """
+        # formula taken from zkemsdk.c - EncodeTime
+        # can also be found in the technical manual
+        d = (
+            ((t.year % 100) * 12 * 31 + ((t.month - 1) * 31) + t.day - 1) *
+            (24 * 60 * 60) + (t.hour * 60 + t.minute) * 60 + t.second
+        )
+        return d
+
+    def connect(self):
+        """
+        connect to the device
+
+        :return: bool
+        """
+        self.end_live_capture = False
+        if not self.ommit_ping and not self.helper.test_ping():
+            raise ZKNetworkError("can't reach device (ping %s)" % self.__address[0])
+        if not self.force_udp and self.helper.test_tcp() == 0:
+            self.user_packet_size = 72 # default zk8
+        self.__create_socket()
+        self.__serialnumber = None # may be another terminal behind the same address
+        self.__pipelining = None
+        self.__chunk = None
+        self.__srtt = None
+        self.__session_id = 0
+        self.__reply_id = const.USHRT_MAX - 1
+        cmd_response = self.__send_command(const.CMD_CONNECT)
+        self.__session_id = self.__header[2]
+        if cmd_response.get('code') == const.CMD_ACK_UNAUTH:
+            if self.verbose: print ("try auth")
+            command_string = make_commkey(self.__password, self.__session_id)
+            cmd_response = self.__send_command(const.CMD_AUTH, command_string)
+        if cmd_response.get('status'):
+            self.is_connect = True
+            return self
+        else:
+            if cmd_response["code"] == const.CMD_ACK_UNAUTH:
+                raise ZKErrorResponse("Unauthenticated")
+            if self.verbose: print ("connect err response {} ".format(cmd_response["code"]))
+            raise ZKErrorResponse("Invalid response: Can't connect")
+
+    def disconnect(self):
+        """
+        diconnect from the connected device
+
+        :return: bool
+        """
+        cmd_response = self.__send_command(const.CMD_EXIT)
+        if cmd_response.get('status'):
+            self.is_connect = False
+            if self.__sock:
+                self.__sock.close()
+            return True
+        else:
+            raise ZKErrorResponse("can't disconnect")
+
+    def enable_device(self):
+        """
+        re-enable the connected device and allow user activity in device again
+
+        :return: bool
+        """
+        cmd_response = self.__send_command(const.CMD_ENABLEDEVICE)
+        if cmd_response.get('status'):
+            self.is_enabled = True
+            return True
+        else:
+            raise ZKErrorResponse("Can't enable device")
+
+    def disable_device(self):
+        """
+        disable (lock) device, to ensure no user activity in device while some process run
+
+        :return: bool
+        """
+        cmd_response = self.__send_command(const.CMD_DISABLEDEVICE)
+        if cmd_response.get('status'):
+            self.is_enabled = False
+            return True
+        else:
+            raise ZKErrorResponse("Can't disable device")
+
+    def get_firmware_version(self):
+        """
+        :return: the firmware version
+        """
+        cmd_response = self.__send_command(const.CMD_GET_VERSION,b'', 1024)
+        if cmd_response.get('status'):
+            firmware_version = self.__data.split(b'\x00')[0]
+            return firmware_version.decode()
+        else:
+            raise ZKErrorResponse("Can't read frimware version")
+
+    def get_serialnumber(self):
+        """
+        :return: the serial number
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'~SerialNumber\x00'
+        response_size = 1024
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            serialnumber = self.__data.split(b'=', 1)[-1].split(b'\x00')[0]
+            serialnumber = serialnumber.replace(b'=', b'')
+            return serialnumber.decode() # string?
+        else:
+            raise ZKErrorResponse("Can't read serial number")
+
+    def get_platform(self):
+        """
+        :return: the platform name
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'~Platform\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            platform = self.__data.split(b'=', 1)[-1].split(b'\x00')[0]
+            platform = platform.replace(b'=', b'')
+            return platform.decode()
+        else:
+            raise ZKErrorResponse("Can't read platform name")
+
+    def get_mac(self):
+        """
+        :return: the machine's mac address
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'MAC\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            mac = self.__data.split(b'=', 1)[-1].split(b'\x00')[0]
+            return mac.decode()
+        else:
+            raise ZKErrorResponse("can't read mac address")
+
+    def get_device_name(self):
+        """
+        return the device name
+
+        :return: str
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'~DeviceName\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            device = self.__data.split(b'=', 1)[-1].split(b'\x00')[0]
+            return device.decode()
+        else:
+            return ""
+
+    def get_face_version(self):
+        """
+        :return: the face version
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'ZKFaceVersion\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            response = self.__data.split(b'=', 1)[-1].split(b'\x00')[0]
+            return safe_cast(response, int, 0)  if response else 0
+        else:
+            return None
+
+    def get_fp_version(self):
+        """
+        :return: the fingerprint version
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'~ZKFPVersion\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            response = self.__data.split(b'=', 1)[-1].split(b'\x00')[0]
+            response = response.replace(b'=', b'')
+            return safe_cast(response, int, 0) if response else 0
+        else:
+            raise ZKErrorResponse("can't read fingerprint version")
+
+    def _clear_error(self, command_string=b''):
+        """
+        clear ACK_error
+        """
+        cmd_response = self.__send_command(const.CMD_ACK_ERROR, command_string, 1024)
+        cmd_response = self.__send_command(const.CMD_ACK_UNKNOWN, command_string, 1024)
+        cmd_response = self.__send_command(const.CMD_ACK_UNKNOWN, command_string, 1024)
+        cmd_response = self.__send_command(const.CMD_ACK_UNKNOWN, command_string, 1024)
+
+    def get_extend_fmt(self):
+        """
+        determine extend fmt
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'~ExtendFmt\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            fmt = (self.__data.split(b'=', 1)[-1].split(b'\x00')[0])
+            return safe_cast(fmt, int, 0) if fmt else 0
+        else:
+            self._clear_error(command_string)
+            return None
+
+    def get_user_extend_fmt(self):
+        """
+        determine user extend fmt
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'~UserExtFmt\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            fmt = (self.__data.split(b'=', 1)[-1].split(b'\x00')[0])
+            return safe_cast(fmt, int, 0) if fmt else 0
+        else:
+            self._clear_error(command_string)
+            return None
+
+    def get_face_fun_on(self):
+        """
+        determine extend fmt
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'FaceFunOn\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            response = (self.__data.split(b'=', 1)[-1].split(b'\x00')[0])
+            return safe_cast(response, int ,0) if response else 0
+        else:
+            self._clear_error(command_string)
+            return None
+
+    def get_compat_old_firmware(self):
+        """
+        determine old firmware
+        """
+        command = const.CMD_OPTIONS_RRQ
+        command_string = b'CompatOldFirmware\x00'
+        response_size = 1024
+
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            response = (self.__data.split(b'=', 1)[-1].split(b'\x00')[0])
+            return safe_cast(response, int, 0) if response else 0
+        else:
+            self._clear_error(command_string)
+            return None
+
+    def get_network_params(self):
+        """
+        get network params
+        """
+        ip = self.__address[0]
+        mask = b''
+        gate = b''
+        cmd_response = self.__send_command(const.CMD_OPTIONS_RRQ, b'IPAddress\x00', 1024)
+        if cmd_response.get('status'):
+            ip = (self.__data.split(b'=', 1)[-1].split(b'\x00')[0])
+        cmd_response = self.__send_command(const.CMD_OPTIONS_RRQ, b'NetMask\x00', 1024)
+        if cmd_response.get('status'):
+            mask = (self.__data.split(b'=', 1)[-1].split(b'\x00')[0])
+        cmd_response = self.__send_command(const.CMD_OPTIONS_RRQ, b'GATEIPAddress\x00', 1024)
+        if cmd_response.get('status'):
+            gate = (self.__data.split(b'=', 1)[-1].split(b'\x00')[0])
+        return {'ip': ip.decode(), 'mask': mask.decode(), 'gateway': gate.decode()}
+
+    def get_pin_width(self):
+        """
+        :return: the PIN width
+        """
+        command = const.CMD_GET_PINWIDTH
+        command_string = b' P'
+        response_size = 9
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            width = self.__data.split(b'\x00')[0]
+            return bytearray(width)[0]
+        else:
+            raise ZKErrorResponse("can0t get pin width")
+
+    def free_data(self):
+        """
+        clear buffer
+
+        :return: bool
+        """
+        command = const.CMD_FREE_DATA
+        cmd_response = self.__send_command(command)
+        if cmd_response.get('status'):
+            return True
+        else:
+            raise ZKErrorResponse("can't free data")
+
+    def read_sizes(self):
+        """
+        read the memory ussage
+        """
+        command = const.CMD_GET_FREE_SIZES
+        response_size = 1024
+        cmd_response = self.__send_command(command,b'', response_size)
+        if cmd_response.get('status'):
+            if self.verbose: print(codecs.encode(self.__data,'hex'))
+            size = len(self.__data)
+            if len(self.__data) >= 80:
+                fields = unpack('20i', self.__data[:80])
+                self.users = fields[4]
+                self.fingers = fields[6]
+                self.records = fields[8]
+                self.dummy = fields[10] #???
+                self.cards = fields[12]
+                self.fingers_cap = fields[14]
+                self.users_cap = fields[15]
+                self.rec_cap = fields[16]
+                self.fingers_av = fields[17]
+                self.users_av = fields[18]
+                self.rec_av = fields[19]
+                self.__data = self.__data[80:]
+            if len(self.__data) >= 12: #face info
+                fields = unpack('3i', self.__data[:12]) #dirty hack! we need more information
+                self.faces = fields[0]
+                self.faces_cap = fields[2]
+            return True
+        else:
+            raise ZKErrorResponse("can't read sizes")
+
+    def unlock(self, time=3):
+        """
+        unlock the door\n
+        thanks to https://github.com/SoftwareHouseMerida/pyzk/
+
+        :param time: define delay in seconds
+        :return: bool
+        """
+        command = const.CMD_UNLOCK
+        command_string = pack("I",int(time)*10)
+        cmd_response = self.__send_command(command, command_string)
+        if cmd_response.get('status'):
+            return True
+        else:
+            raise ZKErrorResponse("Can't open door")
+
+    def __str__(self):
+        """
+        for debug
+        """
+        return "ZK %s://%s:%s users[%i]:%i/%i fingers:%i/%i, records:%i/%i faces:%i/%i" % (
+            "tcp" if self.tcp else "udp", self.__address[0], self.__address[1],
+            self.user_packet_size, self.users, self.users_cap,
+            self.fingers, self.fingers_cap,
+            self.records, self.rec_cap,
+            self.faces, self.faces_cap
+        )
+
+    def restart(self):
+        """
+        restart the device
+
+        :return: bool
+        """
+        command = const.CMD_RESTART
+        cmd_response = self.__send_command(command)
+        if cmd_response.get('status'):
+            self.is_connect = False
+            self.next_uid = 1
+            return True
+        else:
+            raise ZKErrorResponse("can't restart device")
+
+    def get_time(self):
+        """
+        :return: the machine's time
+        """
+        command = const.CMD_GET_TIME
+        response_size = 1032
+        cmd_response = self.__send_command(command, b'', response_size)
+        if cmd_response.get('status'):
+            return self.__decode_time(self.__data[:4])
+        else:
+            raise ZKErrorResponse("can't get time")
+
+    def set_time(self, timestamp):
+        """
+        set Device time (pass datetime object)
+
+        :param timestamp: python datetime object
+        """
+        command = const.CMD_SET_TIME
+        command_string = pack(b'I', self.__encode_time(timestamp))
+        cmd_response = self.__send_command(command, command_string)
+        if cmd_response.get('status'):
+            return True
+        else:
+            raise ZKErrorResponse("can't set time")
+
+    def poweroff(self):
+        """
+        shutdown the machine
+        """
+        command = const.CMD_POWEROFF
+        command_string = b''
+        response_size = 1032
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if cmd_response.get('status'):
+            self.is_connect = False
+            self.next_uid = 1
+            return True
+        else:
+            raise ZKErrorResponse("can't poweroff")
+
+    def refresh_data(self):
+        command = const.CMD_REFRESHDATA
+        cmd_response = self.__send_command(command)
+        if cmd_response.get('status'):
+            return True
+        else:
+            raise ZKErrorResponse("can't refresh data")
+
+    def test_voice(self, index=0):
+        """
+        play test voice:\n
+         0 Thank You\n
+         1 Incorrect Password\n
+         2 Access Denied\n
+         3 Invalid ID\n
+         4 Please try again\n
+         5 Dupicate ID\n
+         6 The clock is flow\n
+         7 The clock is full\n
+         8 Duplicate finger\n
+         9 Duplicated punch\n
+         10 Beep kuko\n
+         11 Beep siren\n
+         12 -\n
+         13 Beep bell\n
+         14 -\n
+         15 -\n
+         16 -\n
+         17 -\n
+         18 Windows(R) opening sound\n
+         19 -\n
+         20 Fingerprint not emolt\n
+         21 Password not emolt\n
+         22 Badges not emolt\n
+         23 Face not emolt\n
+         24 Beep standard\n
+         25 -\n
+         26 -\n
+         27 -\n
+         28 -\n
+         29 -\n
+         30 Invalid user\n
+         31 Invalid time period\n
+         32 Invalid combination\n
+         33 Illegal Access\n
+         34 Disk space full\n
+         35 Duplicate fingerprint\n
+         36 Fingerprint not registered\n
+         37 -\n
+         38 -\n
+         39 -\n
+         40 -\n
+         41 -\n
+         42 -\n
+         43 -\n
+         43 -\n
+         45 -\n
+         46 -\n
+         47 -\n
+         48 -\n
+         49 -\n
+         50 -\n
+         51 Focus eyes on the green box\n
+         52 -\n
+         53 -\n
+         54 -\n
+         55 -\n
+
+        :param index: int sound index
+        :return: bool
+        """
+        command = const.CMD_TESTVOICE
+        command_string = pack("I", index)
+        cmd_response = self.__send_command(command, command_string)
+        if cmd_response.get('status'):
+            return True
+        else:
+            return False
+
+    def set_user(self, uid=None, name='', privilege=0, password='', group_id='', user_id='', card=0):
+        """
+        create or update user by uid
+
+        :param name: name ot the user
+        :param privilege: check the const.py for reference
+        :param password: int password
+        :param group_id: group ID
+        :param user_id: your own user ID
+        :param card: card
+        :return: bool
+        """
+        command = const.CMD_USER_WRQ
+        if uid is None:
+            uid = self.next_uid
+            if not user_id:
+                user_id = self.next_user_id
+        if not user_id:
+            user_id = str(uid) #ZK6 needs uid2 == uid
+        #TODO: check what happens if name is missing...
+        if privilege not in [const.USER_DEFAULT, const.USER_ADMIN]:
+            privilege = const.USER_DEFAULT
+        privilege = int(privilege)
+        if self.user_packet_size == 28: #self.firmware == 6:
+            if not group_id:
+                group_id = 0
+            try:
+                command_string = pack('HB5s8sIxBHI', uid, privilege, password.encode(self.encoding, errors='ignore'), name.encode(self.encoding, errors='ignore'), card, int(group_id), 0, int(user_id))
+            except Exception as e:
+                if self.verbose: print("s_h Error pack: %s" % e)
+                if self.verbose: print("Error pack: %s" % sys.exc_info()[0])
+                raise ZKErrorResponse("Can't pack user")
+        else:
+            name_pad = name.encode(self.encoding, errors='ignore').ljust(24, b'\x00')[:24]
+            card_str = pack('<I', int(card))[:4]
+            command_string = pack('HB8s24s4sx7sx24s', uid, privilege, password.encode(self.encoding, errors='ignore'), name_pad, card_str, group_id.encode(), user_id.encode())
+        response_size = 1024 #TODO check response?
+        cmd_response = self.__send_command(command, command_string, response_size)
+        if self.verbose: print("Response: %s" % cmd_response)
+        if not cmd_response.get('status'):
+            raise ZKErrorResponse("Can't set user")
+        self.forget_users()
+        self.refresh_data()
+        if self.next_uid == uid:
+            self.next_uid += 1 # better recalculate again
+        if self.next_user_id == user_id:
+            self.next_user_id = str(self.next_uid)
+
+    def save_user_template(self, user, fingers=[]):
+        """
+        save user and template
+
+        :param user: user
+        :param fingers: list of finger. (The maximum index 0-9)
+        """
+        if not isinstance(user, User):
+            users = self.get_users()
+            tusers = list(filter(lambda x: x.uid==user, users))
+            if len(tusers) == 1:
+                user = tusers[0]
+            else:
+                tusers = list(filter(lambda x: x.user_id==str(user), users))
+                if len(tusers) == 1:
+                    user = tusers[0]
+                else:
+                    raise ZKErrorResponse("Can't find user")
+        if isinstance(fingers, Finger):
+            fingers = [fingers]
+        fpack = b""
+        table = b""
+        fnum = 0x10
+        tstart = 0
+        for finger in fingers:
+            tfp = finger.repack_only()
+            table += pack("<bHbI", 2, user.uid, fnum + finger.fid, tstart)
+            tstart += len(tfp)
+            fpack += tfp
+        if self.user_packet_size == 28:
+            upack = user.repack29()
+        else:
+            upack = user.repack73()
+        head = pack("III", len(upack), len(table), len(fpack))
+        packet = head + upack + table + fpack
+        self._send_with_buffer(packet)
+        command = 110
+        command_string = pack('<IHH', 12,0,8)
+        cmd_response = self.__send_command(command, command_string)
+        if not cmd_response.get('status'):
+            raise ZKErrorResponse("Can't save utemp")
+        self.refresh_data()
+
+    def _send_with_buffer(self, buffer):
+        MAX_CHUNK = 1024
+        size = len(buffer)
+        self.free_data()
+        command = const.CMD_PREPARE_DATA
+        command_string = pack('I', size)
+        cmd_response = self.__send_command(command, command_string)
+        if not cmd_response.get('status'):
+            raise ZKErrorResponse("Can't prepare data")
+        remain = size % MAX_CHUNK
+        packets = (size - remain) // MAX_CHUNK
+        start = 0
+        for _wlk in range(packets):
+            self.__send_chunk(buffer[start:start+MAX_CHUNK])
+            start += MAX_CHUNK
+        if remain:
+            self.__send_chunk(buffer[start:start+remain])
+
+    def __send_chunk(self, command_string):
+        command = const.CMD_DATA
+        cmd_response = self.__send_command(command, command_string)
+        if cmd_response.get('status'):
+            return True
+        else:
+            raise ZKErrorResponse("Can't send chunk")
+
+    def delete_user_template(self, uid=0, temp_id=0, user_id=''):
+        """
+        Delete specific template
+
+        :param uid: user ID that are generated from device
+        :param user_id: your own user ID
+        :return: bool
+        """
+        if self.tcp and user_id:
+            command = 134
+            command_string = pack('<24sB', str(user_id), temp_id)
+            cmd_response = self.__send_command(command, command_string)
+            if cmd_response.get('status'):
+                return True
+            else:
+                return False # probably empty!
+        if not uid:
+            users = self.get_users()
+            users = list(filter(lambda x: x.user_id==str(user_id), users))
+            if not users:
+                return False
+            uid = users[0].uid
+        command = const.CMD_DELETE_USERTEMP
+        command_string = pack('hb', uid, temp_id)
+        cmd_response = self.__send_command(command, command_string)
+        if cmd_response.get('status'):
+            return True #refres_data (1013)?
+        else:
+            return False # probably empty!
+
+    def delete_user(self, uid=0, user_id=''):
+        """
+        delete specific user by uid or user_id
+
+        :param uid: user ID that are generated from device
+        :param user_id: your own user ID
+        :return: bool
+        """
+        if not uid:
+            users = self.get_users()
+            users = list(filter(lambda x: x.user_id==str(user_id), users))
+            if not users:
+                return False
+            uid = users[0].uid
+        command = const.CMD_DELETE_USER
+        command_string = pack('h', uid)
+        cmd_response = self.__send_command(command, command_string)
+        if not cmd_response.get('status'):
+            raise ZKErrorResponse("Can't delete user")
+        self.forget_users()
+        self.refresh_data()
+        if uid == (self.next_uid - 1):
+            self.next_uid = uid
+
+    def get_user_template(self, uid, temp_id=0, user_id=''):
+        """
+        :param uid: user ID that are generated from device
+        :param user_id: your own user ID
+        :return: list Finger object of the selected user
+        """
+        if not uid:
+            users = self.get_users()
+            users = list(filter(lambda x: x.user_id==str(user_id), users))
+            if not users:
+                return False
+            uid = users[0].uid
+        for _retries in range(3):
+            command = 88 # command secret!!! GET_USER_TEMPLATE
+            command_string = pack('hb', uid, temp_id)
+            response_size = 1024 + 8
+            cmd_response = self.__send_command(command, command_string, response_size)
+            data = self.__recieve_chunk()
+            if data is not None:
+                resp = data[:-1]
+                if resp[-6:] == b'\x00\x00\x00\x00\x00\x00': # padding? bug?
+                    resp = resp[:-6]
+                return Finger(uid, temp_id, 1, resp)
+            if self.verbose: print ("retry get_user_template")
+        else:
+            if self.verbose: print ("Can't read/find finger")
+            return None
+
+    def get_templates(self):
+        """
+        :return: list of Finger object
+        """
+        self.read_sizes()
+        if self.fingers == 0:
+            return []
+        templates = []
+        templatedata, size = self.read_with_buffer(const.CMD_DB_RRQ, const.FCT_FINGERTMP)
+        if size < 4:
+            if self.verbose: print("WRN: no user data")
+            return []
+        total_size = unpack('i', templatedata[0:4])[0]
+        if self.verbose: print ("get template total size {}, size {} len {}".format(total_size, size, len(templatedata)))
+        view = memoryview(templatedata)
+        offset = 4
+        while total_size:
+            size, uid, fid, valid = TEMPLATE_HEADER.unpack_from(view, offset)
+            template = unpack_from("%is" % (size-6), view, offset + 6)[0]
+            finger = Finger(uid, fid, valid, template)
+            if self.verbose: print(finger)
+            templates.append(finger)
+            offset += size
+            total_size -= size
+        return templates
+
+    def get_users(self):
+        """
+        :return: list of User object
+        """
+        self.read_sizes()
+        if self.users == 0:
+            self.next_uid = 1
+            self.next_user_id='1'
+            return []
+        users = []
+        max_uid = 0
+        userdata, size = self.read_with_buffer(const.CMD_USERTEMP_RRQ, const.FCT_USER)
+        if self.verbose: print("user size {} (= {})".format(size, len(userdata)))
+        if size <= 4:
+            print("WRN: missing user data")
+            return []
+        total_size = unpack("I",userdata[:4])[0]
+        self.user_packet_size = total_size / self.users
+        if not self.user_packet_size in [28, 72]:
+            if self.verbose: print("WRN packet size would be  %i" % self.user_packet_size)
+        if self.user_packet_size == 28:
+            for uid, privilege, password, name, card, group_id, timezone, user_id in self.__records(userdata, USER_28, 4):
+                if uid > max_uid: max_uid = uid
+                password = (password.split(b'\x00')[0]).decode(self.encoding, errors='ignore')
+                name = (name.split(b'\x00')[0]).decode(self.encoding, errors='ignore').strip()
+                group_id = str(group_id)
+                user_id = str(user_id)
+                #TODO: check card value and find in ver8
+                if not name:
+                    name = "NN-%s" % user_id
+                user = User(uid, name, privilege, password, group_id, user_id, card)
+                users.append(user)
+                if self.verbose: print("[6]user:",uid, privilege, password, name, card, group_id, timezone, user_id)
+        else:
+            for uid, privilege, password, name, card, group_id, user_id in self.__records(userdata, USER_72, 4):
+                password = (password.split(b'\x00')[0]).decode(self.encoding, errors='ignore')
+                name = (name.split(b'\x00')[0]).decode(self.encoding, errors='ignore').strip()
+                group_id = (group_id.split(b'\x00')[0]).decode(self.encoding, errors='ignore').strip()
+                user_id = (user_id.split(b'\x00')[0]).decode(self.encoding, errors='ignore')
+                if uid > max_uid: max_uid = uid
+                if not name:
+                    name = "NN-%s" % user_id
+                user = User(uid, name, privilege, password, group_id, user_id, card)
+                users.append(user)
+        self.__set_next_ids(max_uid, users)
+        return users
+
+    def __set_next_ids(self, max_uid, users):
+        max_uid += 1
+        self.next_uid = max_uid
+        self.next_user_id = str(max_uid)
+        user_ids = set(u.user_id for u in users)
+        while self.next_user_id in user_ids:
+            max_uid += 1
+            self.next_user_id = str(max_uid)
+
+    def get_cached_users(self):
+        """
+        the user table, downloaded again only when the device serial or
+        its users/fingers counters no longer match the cached copy.
+        uses the counters of the last read_sizes call.
+
+        :return: list of User object
+        """
+        if self.__serialnumber is None:
+            self.__serialnumber = self.get_serialnumber()
+        key = [self.__serialnumber, self.users, self.fingers]
+        if self.__user_table is None and self.user_cache:
+            self.__user_table = self.__load_user_table()
+        if self.__user_table is not None and self.__user_table[0] == key:
+            if self.verbose: print ("user table cached for {}".format(key))
+            _, self.user_packet_size, users = self.__user_table
+            self.__set_next_ids(max([u.uid for u in users] or [0]), users)
+            return users
+        users = self.get_users()
+        key = [self.__serialnumber, self.users, self.fingers]
+        self.__user_table = (key, self.user_packet_size, users)
+        if self.user_cache:
+            self.__save_user_table()
+        return users
+
+    def forget_users(self):
+        """
+        drop the cached user table, in memory and on disk
+        """
+        self.__user_table = None
+        if self.user_cache:
+            if self.__serialnumber is None: # fresh connection, the cache file is still there
+                self.__serialnumber = self.get_serialnumber()
+            try:
+                os.remove(self.__user_table_path())
+            except OSError:
+                pass
+
+    def __user_table_path(self):
+        return os.path.join(self.user_cache, "users_%s.json" % self.__serialnumber)
+
+    def __load_user_table(self):
+        try:
+            with open(self.__user_table_path()) as f:
+                cached = json.load(f)
+            return (cached['key'], cached['user_packet_size'],
+                    [User.json_unpack(u) for u in cached['users']])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if self.verbose: print ("no cached user table: {}".format(e))
+            return None
+
+    def __save_user_table(self):
+        key, user_packet_size, users = self.__user_table
+        path = self.__user_table_path()
+        try:
+            os.makedirs(self.user_cache, exist_ok=True)
+            with open(path + '.tmp', 'w') as f:
+                json.dump({'key': key, 'user_packet_size': user_packet_size,
+                           'users': [u.json_pack() for u in users]}, f)
+            os.replace(path + '.tmp', path)
+        except (OSError, TypeError) as e:
+            if self.verbose: print ("can't save user table: {}".format(e))
+
+    def cancel_capture(self):
+        """
+        cancel capturing finger
+
+        :return: bool
+        """
+        command = const.CMD_CANCELCAPTURE
+        cmd_response = self.__send_command(command)
+        return bool(cmd_response.get('status'))
+
+    def verify_user(self):
+        """
+        start verify finger mode (after capture)
+
+        :return: bool
+        """
+        command = const.CMD_STARTVERIFY
+        cmd_response = self.__send_command(command)
+        if cmd_response.get('status'):
+            return True
+        else:
+            raise ZKErrorResponse("Cant Verify")
+
+    def reg_event(self, flags):
+        """
+        reg events
+        """
+        command = const.CMD_REG_EVENT
+        command_string = pack ("I", flags)
+        cmd_response = self.__send_command(command, command_string)
+        if not cmd_response.get('status'):
+            raise ZKErrorResponse("cant' reg events %i" % flags)
+
+    def set_sdk_build_1(self):
+        command = const.CMD_OPTIONS_WRQ
+        command_string = b"SDKBuild=1"
+        cmd_response = self.__send_command(command, command_string)
+        if not cmd_response.get('status'):
+            return False
+        return True
+
+    def enroll_user(self, uid=0, temp_id=0, user_id=''):
+        """
+        start enroll user
+
+        :param uid: uid
+        :param temp_id: template id
+        :param user_id: user ID
+        :return: bool
+        """
+        command = const.CMD_STARTENROLL
+        done = False
+        if  not user_id:
+            users = self.get_users()
+            users = list(filter(lambda x: x.uid==uid, users))
+            if len(users) >= 1:
+                user_id = users[0].user_id
+            else:
+                return False
+        if self.tcp:
+            command_string = pack('<24sbb',str(user_id).encode(), temp_id, 1)
+        else:
+            command_string = pack('<Ib', int(user_id), temp_id)
+        self.cancel_capture()
+        cmd_response = self.__send_command(command, command_string)
+        if not cmd_response.get('status'):
+            raise ZKErrorResponse("Cant Enroll user #%i [%i]" %(uid, temp_id))
+        self.__sock.settimeout(60)
+        attempts = 3
+        while attempts:
+            if self.verbose: print("A:%i esperando primer regevent" % attempts)
+            data_recv = self.__sock.recv(1032)
+            self.__ack_ok()
+            if self.verbose: print(codecs.encode(data_recv,'hex'))
+            if self.tcp:
+                if len(data_recv) > 16:
+                    res = unpack("H", data_recv.ljust(24,b"\x00")[16:18])[0]
+                    if self.verbose: print("res %i" % res)
+                    if res == 0 or res == 6 or res == 4:
+                        if self.verbose: print ("posible timeout  o reg Fallido")
+                        break
+            else:
+                if len(data_recv) > 8:
+                    res = unpack("H", data_recv.ljust(16,b"\x00")[8:10])[0]
+                    if self.verbose: print("res %i" % res)
+                    if res == 6 or res == 4:
+                        if self.verbose: print ("posible timeout")
+                        break
+            if self.verbose: print ("A:%i esperando 2do regevent" % attempts)
+            data_recv = self.__sock.recv(1032)
+            self.__ack_ok()
+            if self.verbose: print (codecs.encode(data_recv, 'hex'))
+            if self.tcp:
+                if len(data_recv) > 8:
+                    res = unpack("H", data_recv.ljust(24,b"\x00")[16:18])[0]
+                    if self.verbose: print("res %i" % res)
+                    if res == 6 or res == 4:
+                        if self.verbose: print ("posible timeout  o reg Fallido")
+                        break
+                    elif res == 0x64:
+                        if self.verbose: print ("ok, continue?")
+                        attempts -= 1
+            else:
+                if len(data_recv) > 8:
+                    res = unpack("H", data_recv.ljust(16,b"\x00")[8:10])[0]
+                    if self.verbose: print("res %i" % res)
+                    if res == 6 or res == 4:
+                        if self.verbose: print ("posible timeout  o reg Fallido")
+                        break
+                    elif res == 0x64:
+                        if self.verbose: print ("ok, continue?")
+                        attempts -= 1
+        if attempts == 0:
+            data_recv = self.__sock.recv(1032)
+            self.__ack_ok()
+            if self.verbose: print (codecs.encode(data_recv, 'hex'))
+            if self.tcp:
+                res = unpack("H", data_recv.ljust(24,b"\x00")[16:18])[0]
+            else:
+                res = unpack("H", data_recv.ljust(16,b"\x00")[8:10])[0]
+            if self.verbose: print("res %i" % res)
+            if res == 5:
+                if self.verbose: print ("finger duplicate")
+            if res == 6 or res == 4:
+                if self.verbose: print ("posible timeout")
+            if res  == 0:
+                size = unpack("H", data_recv.ljust(16,b"\x00")[10:12])[0]
+                pos = unpack("H", data_recv.ljust(16,b"\x00")[12:14])[0]
+                if self.verbose: print("enroll ok", size, pos)
+                done = True
+        self.__sock.settimeout(self.__timeout)
+        self.reg_event(0) # TODO: test
+        self.cancel_capture()
+        self.verify_user()
+        return done
+
+    def live_capture(self, new_timeout=10):
+        """
+        try live capture of events
+        """
+        was_enabled = self.is_enabled
+        self.read_sizes()
+        users = self.get_cached_users()
+        _, by_user_id = self.__index_users(users)
+        self.cancel_capture()
+        self.verify_user()
+        if not self.is_enabled:
+            self.enable_device()
+        if self.verbose: print ("start live_capture")
+        self.reg_event(const.EF_ATTLOG)
+        self.__sock.settimeout(new_timeout)
+        self.end_live_capture = False
+        while not self.end_live_capture:
+            try:
+                if self.verbose: print ("esperando event")
+                data_recv = self.__sock.recv(1032)
+                self.__ack_ok()
+                if self.tcp:
+                    size = unpack('<HHI', data_recv[:8])[2]
+                    header = unpack('HHHH', data_recv[8:16])
+                    data = data_recv[16:]
+                else:
+                    size = len(data_recv)
+                    header = unpack('<4H', data_recv[:8])
+                    data = data_recv[8:]
+                if not header[0] == const.CMD_REG_EVENT:
+                    if self.verbose: print("not event! %x" % header[0])
+                    continue
+                if not len(data):
+                    if self.verbose: print ("empty")
+                    continue
+                while len(data) >= 12:
+                    if len(data) == 12:
+                        user_id, status, punch, timehex = unpack('<IBB6s', data)
+                        data = data[12:]
+                    elif len(data) == 32:
+                        user_id,  status, punch, timehex = unpack('<24sBB6s', data[:32])
+                        data = data[32:]
+                    elif len(data) == 36:
+                        user_id,  status, punch, timehex, _other = unpack('<24sBB6s4s', data[:36])
+                        data = data[36:]
+                    elif len(data) >= 52:
+                        user_id,  status, punch, timehex, _other = unpack('<24sBB6s20s', data[:52])
+                        data = data[52:]
+                    if isinstance(user_id, int):
+                        user_id = str(user_id)
+                    else:
+                        user_id = (user_id.split(b'\x00')[0]).decode(errors='ignore')
+                    timestamp = self.__decode_timehex(timehex)
+                    tuser = by_user_id.get(user_id)
+                    if tuser is None:
+                        uid = int(user_id)
+                    else:
+                        uid = tuser.uid
+                    yield Attendance(user_id, timestamp, status, punch, uid)
+            except timeout:
+                if self.verbose: print ("time out")
+                yield None # return to keep watching
+            except (KeyboardInterrupt, SystemExit):
+                if self.verbose: print ("break")
+                break
+        if self.verbose: print ("exit gracefully")
+        self.__sock.settimeout(self.__timeout)
+        self.reg_event(0)
+        if not was_enabled:
+            self.disable_device()
+
+    def clear_data(self):
+        """
+        clear all data (included: user, attendance report, finger database)
+
+        :return: bool
+        """
+        command = const.CMD_CLEAR_DATA
+        command_string = ''
+        cmd_response = self.__send_command(command, command_string)
+        if cmd_response.get('status'):
+            self.next_uid = 1
+            self.forget_users()
+            return True
+        else:
+            raise ZKErrorResponse("can't clear data")
+
+    def __recieve_tcp_data(self, data_recv, size):
+        """ data_recv, raw tcp packet
+         must analyze tcp_length
+
+         must return data, broken
+         """
+        data = []
+        tcp_length = self.__test_tcp_top(data_recv)
+        if self.verbose: print ("tcp_length {}, size {}".format(tcp_length, size))
+        if tcp_length <= 0:
+            if self.verbose: print ("Incorrect tcp packet")
+            return None, b""
+        if (tcp_length - 8) < size:
+            if self.verbose: print ("tcp length too small... retrying")
+            resp, bh = self.__recieve_tcp_data(data_recv, tcp_length - 8)
+            data.append(resp)
+            size -= len(resp)
+            if self.verbose: print ("new tcp DATA packet to fill misssing {}".format(size))
+            data_recv = bh + self.__sock.recv(size + 16 )
+            if self.verbose: print ("new tcp DATA starting with {} bytes".format(len(data_recv)))
+            resp, bh = self.__recieve_tcp_data(data_recv, size)
+            data.append(resp)
+            if self.verbose: print ("for misssing {} recieved {} with extra {}".format(size, len(resp), len(bh)))
+            return b''.join(data), bh
+        recieved = len(data_recv)
+        if self.verbose: print ("recieved {}, size {}".format(recieved, size))
+        response = unpack('HHHH', data_recv[8:16])[0]
+        if recieved >= (size + 32):
+            if response == const.CMD_DATA:
+                resp = data_recv[16 : size + 16]
+                if self.verbose: print ("resp complete len {}".format(len(resp)))
+                return resp, data_recv[size + 16:]
+            else:
+                if self.verbose: print("incorrect response!!! {}".format(response))
+                return None, b""
+        else:
+            if self.verbose: print ("try DATA incomplete (actual valid {})".format(recieved-16))
+            data.append(data_recv[16 : size + 16 ])
+            size -= recieved - 16
+            broken_header = b""
+            if size < 0:
+                broken_header = data_recv[size:]
+                if self.verbose: print ("broken", (broken_header).encode('hex'))
+            if size > 0:
+                data_recv = self.__recieve_raw_data(size)
+                data.append(data_recv)
+            return b''.join(data), broken_header
+
+    def __recieve_raw_data(self, size):
+        """ partial data ? """
+        data = []
+        if self.verbose: print ("expecting {} bytes raw data".format(size))
+        while size > 0:
+            data_recv = self.__sock.recv(size)
+            recieved = len(data_recv)
+            if self.verbose: print ("partial recv {}".format(recieved))
+            if recieved < 100 and self.verbose: print ("   recv {}".format(codecs.encode(data_recv, 'hex')))
+            data.append(data_recv)
+            size -= recieved
+            if self.verbose: print ("still need {}".format(size))
+        return b''.join(data)
+
+    def __recieve_chunk(self):
+        """ recieve a chunk """
+        if self.__response == const.CMD_DATA:
+            if self.tcp:
+                if self.verbose: print ("_rc_DATA! is {} bytes, tcp length is {}".format(len(self.__data), self.__tcp_length))
+                if len(self.__data) < (self.__tcp_length - 8):
+                    need = (self.__tcp_length - 8) - len(self.__data)
+                    if self.verbose: print ("need more data: {}".format(need))
+                    more_data = self.__recieve_raw_data(need)
+                    return b''.join([self.__data, more_data])
+                else:
+                    if self.verbose: print ("Enough data")
+                    return self.__data
+            else:
+                if self.verbose: print ("_rc len is {}".format(len(self.__data)))
+                return self.__data
+        elif self.__response == const.CMD_PREPARE_DATA:
+            data = []
+            size = self.__get_data_size()
+            if self.verbose: print ("recieve chunk: prepare data size is {}".format(size))
+            if self.tcp:
+                if len(self.__data) >= (8 + size):
+                    data_recv = self.__data[8:]
+                else:
+                    data_recv = self.__data[8:] + self.__sock.recv(size + 32)
+                resp, broken_header = self.__recieve_tcp_data(data_recv, size)
+                data.append(resp)
+                # get CMD_ACK_OK
+                if len(broken_header) < 16:
+                    data_recv = broken_header + self.__sock.recv(16)
+                else:
+                    data_recv = broken_header
+                if len(data_recv) < 16:
+                    print ("trying to complete broken ACK %s /16" % len(data_recv))
+                    if self.verbose: print (data_recv.encode('hex'))
+                    data_recv += self.__sock.recv(16 - len(data_recv)) #TODO: CHECK HERE_!
+                if not self.__test_tcp_top(data_recv):
+                    if self.verbose: print ("invalid chunk tcp ACK OK")
+                    return None
+                response = unpack('HHHH', data_recv[8:16])[0]
+                if response == const.CMD_ACK_OK:
+                    if self.verbose: print ("chunk tcp ACK OK!")
+                    return b''.join(data)
+                if self.verbose: print("bad response %s" % data_recv)
+                if self.verbose: print (codecs.encode(data,'hex'))
+                return None
+
+                return resp
+            while True:
+                data_recv = self.__sock.recv(1024+8)
+                response = unpack('<4H', data_recv[:8])[0]
+                if self.verbose: print ("# packet response is: {}".format(response))
+                if response == const.CMD_DATA:
+                    data.append(data_recv[8:])
+                    size -= 1024
+                elif response == const.CMD_ACK_OK:
+                    break
+                else:
+                    if self.verbose: print ("broken!")
+                    break
+                if self.verbose: print ("still needs %s" % size)
+            return b''.join(data)
+        else:
+            if self.verbose: print ("invalid response %s" % self.__response)
+            return None
+
+    def __read_chunk(self, start, size):
+        """
+        read a chunk from buffer
+        """
+        for _retries in range(3):
+            command = 1504
+            command_string = pack('<ii', start, size)
+            if self.tcp:
+                response_size = size + 32
+            else:
+                response_size = 1024 + 8
+            cmd_response = self.__send_command(command, command_string, response_size)
+            data = self.__recieve_chunk()
+            if data is not None:
+                return data
+        else:
+            raise ZKErrorResponse("can't read chunk %i:[%i]" % (start, size))
+
+    def __prepare_buffer(self, command, fct=0, ext=0):
+        """
+        ask the device to prepare a buffered read (ZK6: 1503)
+
+        :return: (data, size) when the device answered inline, (None, size) otherwise
+        """
+        command_string = pack('<bhii', 1, command, fct, ext)
+        if self.verbose: print ("rwb cs", command_string)
+        response_size = 1024
+        cmd_response = self.__send_command(1503, command_string, response_size)
+        if not cmd_response.get('status'):
+            raise ZKErrorResponse("RWB Not supported")
+        if cmd_response['code'] == const.CMD_DATA:
+            data = self.__data
+            if self.tcp:
+                if self.verbose: print ("DATA! is {} bytes, tcp length is {}".format(len(self.__data), self.__tcp_length))
+                if len(self.__data) < (self.__tcp_length - 8):
+                    need = (self.__tcp_length - 8) - len(self.__data)
+                    if self.verbose: print ("need more data: {}".format(need))
+                    more_data = self.__recieve_raw_data(need)
+                    data = b''.join([self.__data, more_data])
+                else:
+                    if self.verbose: print ("Enough data")
+            self.bytes_read += len(data)
+            return data, len(data)
+        size = unpack('I', self.__data[1:5])[0]
+        if self.verbose: print ("size fill be %i" % size)
+        return None, size
+
+    def __read_buffer_range(self, start, size):
+        """
+        read bytes [start, size) of a prepared buffer with 1504 chunks
+        """
+        return b''.join(self.__iter_buffer_range(start, size))
+
+    def __iter_buffer_range(self, start, size):
+        """
+        yield bytes [start, size) of a prepared buffer one 1504 chunk at a
+        time, freeing the buffer when done or when the caller stops early
+        """
+        if self.tcp:
+            MAX_CHUNK = 0xFFc0
+        else:
+            MAX_CHUNK = 16 * 1024
+        try:
+            if self.read_window > 1 and not self.tcp and self.__pipelining is not False:
+                for chunk in self.__iter_windowed(start, size, MAX_CHUNK):
+                    yield chunk
+            else:
+                for chunk in self.__iter_chunks(start, size, MAX_CHUNK):
+                    yield chunk
+        finally:
+            self.free_data()
+        if self.verbose: print ("_read w/chunk %i bytes" % size)
+
+    def __iter_chunks(self, start, size, max_chunk):
+        """
+        yield bytes [start, size) one 1504 chunk at a time (stop and wait)
+        """
+        remain = (size - start) % max_chunk
+        packets = (size - start - remain) // max_chunk # should be size /16k
+        if self.verbose: print ("rwb: #{} packets of max {} bytes, and extra {} bytes remain".format(packets, max_chunk, remain))
+        for _wlk in range(packets):
+            chunk = self.__read_chunk(start, max_chunk)
+            self.bytes_read += len(chunk)
+            start += max_chunk
+            yield chunk
+        if remain:
+            chunk = self.__read_chunk(start, remain)
+            self.bytes_read += len(chunk)
+            start += remain
+            yield chunk
+
+    def __iter_windowed(self, start, size, max_chunk):
+        """
+        yield bytes [start, size) in order with up to read_window 1504
+        requests in flight (UDP). Answers are matched to their request by
+        reply id and reassembled by offset. The device answers in order,
+        so a request still unanswered when a later one completes was lost;
+        lost requests are sent again and halve the chunk size, clean runs
+        grow it back up to max_chunk. The receive timeout follows the
+        measured round trip. If the device does not answer pipelined
+        requests, or a chunk keeps getting lost, the rest is read stop
+        and wait.
+        """
+        chunk_size = self.__chunk or max_chunk
+        in_flight = {} # reply id -> [offset, size, packets, sent at, tries, prepared, pipelined]
+        retry = [] # [offset, size, tries] to request again
+        done = {} # offset -> data
+        offset = start # next offset to request
+        position = start # next offset to yield
+        clean = 0 # chunks complete in a row
+        strikes = 0 # losses before pipelining was confirmed
+        fallback = False
+        if self.verbose: print ("rwb: window of {} requests, chunks of {} bytes".format(self.read_window, chunk_size))
+        try:
+            while position < size and not fallback:
+                window = self.read_window if self.__pipelining else 2 # probe with two until confirmed
+                while len(in_flight) < window and (retry or offset < size):
+                    if retry:
+                        chunk_start, chunk_len, tries = retry.pop(0)
+                    else:
+                        chunk_start, chunk_len, tries = offset, min(chunk_size, size - offset), 0
+                        offset += chunk_len
+                    reply_id = self.__send_chunk_request(chunk_start, chunk_len)
+                    in_flight[reply_id] = [chunk_start, chunk_len, [], monotonic(), tries, False, bool(in_flight)]
+                self.__sock.settimeout(self.__read_timeout())
+                try:
+                    data_recv = self.__sock.recv(MIN_CHUNK + 8)
+                except timeout:
+                    lost = list(in_flight)
+                else:
+                    response, _, _, reply_id = unpack('<4H', data_recv[:8])
+                    request = in_flight.get(reply_id)
+                    if request is None:
+                        continue # late answer to a request already sent again
+                    if not request[2] and not request[5]:
+                        self.__sample_rtt(monotonic() - request[3])
+                    if response == const.CMD_PREPARE_DATA:
+                        request[5] = True
+                        continue
+                    if response == const.CMD_DATA:
+                        request[2].append(data_recv[8:])
+                        if request[5]:
+                            continue # more data until CMD_ACK_OK
+                    elif response != const.CMD_ACK_OK:
+                        if self.verbose: print ("rwb: chunk {} answered with {}".format(request[0], response))
+                        fallback = True
+                        continue
+                    del in_flight[reply_id]
+                    data = b''.join(request[2])
+                    lost = [older for older, r in in_flight.items() if r[3] < request[3]]
+                    if len(data) != request[1]:
+                        if self.verbose: print ("rwb: chunk {} incomplete, {} of {} bytes".format(request[0], len(data), request[1]))
+                        in_flight[reply_id] = request
+                        lost.append(reply_id)
+                    else:
+                        if request[6] and not lost and not self.__pipelining:
+                            if self.verbose: print ("rwb: device answers pipelined requests")
+                            self.__pipelining = True
+                        done[request[0]] = data
+                        clean += 1
+                        if clean >= 8 and chunk_size < max_chunk:
+                            chunk_size = min(chunk_size * 2, max_chunk)
+                            clean = 0
+                if lost:
+                    if self.verbose: print ("rwb: {} chunk request(s) lost".format(len(lost)))
+                    if self.__pipelining is None:
+                        strikes += 1
+                    for reply_id in lost:
+                        request = in_flight.pop(reply_id)
+                        retry.append([request[0], request[1], request[4] + 1])
+                        fallback = fallback or request[4] + 1 >= CHUNK_RETRIES
+                    retry.sort()
+                    fallback = fallback or strikes >= 2
+                    chunk_size = max(chunk_size // 2, MIN_CHUNK)
+                    clean = 0
+                while position in done:
+                    data = done.pop(position)
+                    self.bytes_read += len(data)
+                    position += len(data)
+                    yield data
+        finally:
+            self.__chunk = chunk_size
+            self.__sock.settimeout(self.__timeout)
+        if position >= size:
+            return
+        if self.verbose: print ("rwb: windowed read failed, stop and wait from {}".format(position))
+        if self.__pipelining is None:
+            self.__pipelining = False
+        self.__drain()
+        missing = sorted([(request[0], request[1]) for request in in_flight.values()] +
+                         [(chunk_start, chunk_len) for chunk_start, chunk_len, _ in retry])
+        for chunk_start, chunk_len in missing:
+            done[chunk_start] = self.__read_chunk(chunk_start, chunk_len)
+        while position in done:
+            data = done.pop(position)
+            self.bytes_read += len(data)
+            position += len(data)
+            yield data
+        for chunk in self.__iter_chunks(offset, size, max_chunk):
+            yield chunk
+
+    def __send_chunk_request(self, start, size):
+        """
+        send a 1504 without waiting for the answer
+
+        :return: the reply id the answer will carry
+        """
+        buf = self.__create_header(1504, pack('<ii', start, size), self.__session_id, self.__reply_id)
+        self.__reply_id = unpack('<4H', buf[:8])[3]
+        self.__sock.sendto(buf, self.__address)
+        return self.__reply_id
+
+    def __sample_rtt(self, rtt):
+        if self.__srtt is None:
+            self.__srtt = rtt
+        else:
+            self.__srtt = 0.875 * self.__srtt + 0.125 * rtt
+
+    def __read_timeout(self):
+        if self.__srtt is None:
+            return self.__timeout
+        return min(self.__timeout, max(MIN_READ_TIMEOUT, 4 * self.__srtt))
+
+    def __drain(self):
+        """
+        discard late answers to abandoned requests before going back to
+        stop and wait, which takes the next datagram as its answer
+        """
+        self.__sock.settimeout(self.__read_timeout())
+        try:
+            while True:
+                self.__sock.recv(MIN_CHUNK + 8)
+        except timeout:
+            pass
+        finally:
+            self.__sock.settimeout(self.__timeout)
+
+    def read_with_buffer(self, command, fct=0 ,ext=0):
+        """
+        Test read info with buffered command (ZK6: 1503)
+        """
+        data, size = self.__prepare_buffer(command, fct, ext)
+        if data is not None:
+            return data, size
+        return self.__read_buffer_range(0, size), size
+
+    def get_attendance(self):
+        """
+        return attendance record
+
+        :return: List of Attendance object
+        """
+        self.read_sizes()
+        if self.records == 0:
+            return []
+        users = self.get_cached_users()
+        if self.verbose: print (users)
+        attendance_data, size = self.read_with_buffer(const.CMD_ATTLOG_RRQ)
+        if size < 4:
+            if self.verbose: print ("WRN: no attendance data")
+            return []
+        total_size = unpack("I", attendance_data[:4])[0]
+        record_size = total_size/self.records
+        if self.verbose: print ("record_size is ", record_size)
+        return self.__decode_attendance(memoryview(attendance_data)[4:], record_size, users)
+
+    def iter_attendance(self):
+        """
+        yield attendance records as each chunk of the device buffer
+        arrives, instead of downloading the whole log first. Records that
+        straddle two chunks are held back until the rest arrives.
+
+        :return: generator of Attendance object
+        """
+        self.read_sizes()
+        if self.records == 0:
+            return
+        users = self.__index_users(self.get_cached_users())
+        attendance_data, size = self.__prepare_buffer(const.CMD_ATTLOG_RRQ)
+        if attendance_data is None:
+            chunks = self.__iter_buffer_range(0, size)
+        else:
+            chunks = [attendance_data]
+        pending = b''
+        record_size = None
+        for chunk in chunks:
+            pending = pending + chunk if pending else chunk
+            if record_size is None:
+                if len(pending) < 4:
+                    continue
+                total_size = unpack("I", pending[:4])[0]
+                record_size = total_size/self.records
+                if self.verbose: print ("record_size is ", record_size)
+                step = {8: 8, 16: 16}.get(record_size, 40)
+                pending = pending[4:]
+            complete = len(pending) - len(pending) % step
+            for attendance in self.__iter_decoded(memoryview(pending)[:complete], record_size, users):
+                yield attendance
+            pending = pending[complete:]
+        if record_size is None:
+            if self.verbose: print ("WRN: no attendance data")
+
+    def get_attendance_array(self):
+        """
+        return attendance records as a numpy structured array with the
+        fields user_id, timestamp, status, punch and uid, decoded without
+        building an Attendance object per record.
+        timestamp is the device (local) time as seconds since 1970-01-01,
+        use .astype('datetime64[s]') on it to get wall clock times.
+
+        :return: numpy.ndarray
+        """
+        if np is None:
+            raise ImportError("get_attendance_array needs numpy")
+        self.read_sizes()
+        if self.records == 0:
+            return self.__attendance_array(np.zeros(0, ATTENDANCE_DTYPES[40]), 40, [])
+        attendance_data, size = self.read_with_buffer(const.CMD_ATTLOG_RRQ)
+        if size < 4:
+            if self.verbose: print ("WRN: no attendance data")
+            return self.__attendance_array(np.zeros(0, ATTENDANCE_DTYPES[40]), 40, [])
+        total_size = unpack("I", attendance_data[:4])[0]
+        record_size = total_size/self.records
+        if self.verbose: print ("record_size is ", record_size)
+        if record_size not in ATTENDANCE_DTYPES:
+            record_size = 40 # same fallback as __decode_attendance
+        # 40 byte records carry both ids, the user table is not needed
+        users = [] if record_size == 40 else self.get_cached_users()
+        dtype = ATTENDANCE_DTYPES[record_size]
+        raw = np.frombuffer(attendance_data, dtype, (len(attendance_data) - 4) // dtype.itemsize, 4)
+        return self.__attendance_array(raw, record_size, users)
+
+    def __attendance_array(self, raw, record_size, users):
+        """
+        map the ids of every distinct user once, then gather them with the
+        inverse index; resolves ids exactly like __decode_attendance
+        """
+        by_uid, by_user_id = self.__index_users(users)
+        if record_size == 8:
+            keys, inverse = np.unique(raw['uid'], return_inverse=True)
+            user_ids = [by_uid[key].user_id if key in by_uid else str(key) for key in keys.tolist()]
+            uids = raw['uid']
+        elif record_size == 16:
+            keys, inverse = np.unique(raw['user_id'], return_inverse=True)
+            user_ids = []
+            key_uids = []
+            for key in keys.tolist():
+                tuser = by_user_id.get(str(key))
+                user_ids.append(str(key) if tuser is None else tuser.user_id)
+                key_uids.append(key if tuser is None else tuser.uid)
+            uids = np.array(key_uids, '<u4')[inverse]
+        else:
+            keys, inverse = np.unique(raw['user_id'], return_inverse=True)
+            user_ids = [(key.split(b'\x00')[0]).decode(errors='ignore') for key in keys.tolist()]
+            uids = raw['uid']
+        user_ids = np.array(user_ids, 'U')[inverse.reshape(-1)]
+
+        result = np.empty(len(raw), [('user_id', user_ids.dtype), ('timestamp', '<i8'),
+                                     ('status', 'u1'), ('punch', 'u1'), ('uid', '<u4')])
+        result['user_id'] = user_ids
+        result['timestamp'] = self.__decode_ticks_array(raw['time'])
+        result['status'] = raw['status']
+        result['punch'] = raw['punch']
+        result['uid'] = uids
+        return result
+
+    def __decode_ticks_array(self, t):
+        """
+        __decode_ticks for a whole array, to seconds since 1970-01-01
+        """
+        t = t.astype(np.int64)
+        seconds = t % 86400
+        days = t // 86400
+        day = days % 31
+        months = days // 31 + 30 * 12 # months since 2000-01, counted from 1970-01
+        month_start = months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+        return (month_start + day) * 86400 + seconds
+
+    def get_attendance_since(self, record_index):
+        """
+        return attendance records from position record_index (0 based) on,
+        reading only the tail of the device buffer.
+        falls back to a full read if the firmware rejects partial reads
+
+        :param record_index: number of records already known
+        :return: List of Attendance object
+        """
+        self.read_sizes()
+        if record_index >= self.records:
+            return []
+        if record_index <= 0:
+            return self.get_attendance()
+        users = self.get_cached_users()
+        attendance_data, size = self.__prepare_buffer(const.CMD_ATTLOG_RRQ)
+        if attendance_data is not None:
+            if self.verbose: print ("inline attendance data, slicing")
+            return self.__slice_attendance(attendance_data, users, record_index)
+        record_size = (size - 4) / self.records
+        if record_size not in (8, 16, 40):
+            if self.verbose: print ("WRN: unexpected record size {}, full read".format(record_size))
+            self.free_data()
+            return self.get_attendance()[record_index:]
+        start = 4 + record_index * int(record_size)
+        try:
+            attendance_data = self.__read_buffer_range(start, size)
+        except ZKErrorResponse as e:
+            if self.verbose: print ("partial read rejected ({}), full read".format(e))
+            self.free_data()
+            return self.get_attendance()[record_index:]
+        if self.verbose: print ("read {} of {} bytes from offset {}".format(len(attendance_data), size, start))
+        return self.__decode_attendance(attendance_data, record_size, users)
+
+    def __slice_attendance(self, attendance_data, users, record_index):
+        if len(attendance_data) < 4:
+            return []
+        total_size = unpack("I", attendance_data[:4])[0]
+        record_size = total_size/self.records
+        attendances = self.__decode_attendance(memoryview(attendance_data)[4:], record_size, users)
+        return attendances[record_index:]
+
+    def __records(self, data, record, start=0):
+        """
+        iterate over the complete records in data[start:] without copying
+        """
+        view = memoryview(data)[start:]
+        return record.iter_unpack(view[:len(view) - len(view) % record.size])
+
+    def __index_users(self, users):
+        """
+        index users by uid and by user_id, keeping the first match like a
+        linear search would
+
+        :return: (dict uid -> User, dict user_id -> User)
+        """
+        by_uid = {}
+        by_user_id = {}
+        for user in users:
+            by_uid.setdefault(user.uid, user)
+            by_user_id.setdefault(user.user_id, user)
+        return by_uid, by_user_id
+
+    def __decode_attendance(self, attendance_data, record_size, users):
+        """
+        decode raw attendance records (without the 4 byte size header)
+
+        :return: List of Attendance object
+        """
+        return list(self.__iter_decoded(attendance_data, record_size, self.__index_users(users)))
+
+    def __iter_decoded(self, attendance_data, record_size, users):
+        """
+        yield the Attendance objects of raw attendance records, with users
+        already indexed by __index_users
+        """
+        by_uid, by_user_id = users
+        decode_time = self.__decode_ticks
+        if record_size == 8:
+            for uid, status, timestamp, punch in self.__records(attendance_data, ATTENDANCE_8):
+                if self.verbose: print (uid, status, timestamp, punch)
+                tuser = by_uid.get(uid)
+                if tuser is None:
+                    user_id = str(uid)
+                else:
+                    user_id = tuser.user_id
+                attendance = Attendance(user_id, decode_time(timestamp), status, punch, uid)
+                yield attendance
+        elif record_size == 16:
+            for user_id, timestamp, status, punch, reserved, workcode in self.__records(attendance_data, ATTENDANCE_16):
+                user_id = str(user_id)
+                if self.verbose: print (user_id, timestamp, status, punch, workcode)
+                tuser = by_user_id.get(user_id)
+                if tuser is None:
+                    if self.verbose: print("no uid {}", user_id)
+                    uid = str(user_id)
+                    tuser = by_uid.get(user_id)
+                    if tuser is None:
+                        uid = str(user_id)
+                    else:
+                        uid = tuser.uid
+                        user_id = tuser.user_id
+                else:
+                    uid = tuser.uid
+                attendance = Attendance(user_id, decode_time(timestamp), status, punch, uid)
+                yield attendance
+        else:
+            for uid, user_id, status, timestamp, punch, space in self.__records(attendance_data, ATTENDANCE_40):
+                if self.verbose: print (uid, user_id, status, timestamp, punch)
+                user_id = (user_id.split(b'\x00')[0]).decode(errors='ignore')
+                attendance = Attendance(user_id, decode_time(timestamp), status, punch, uid)
+                yield attendance
+
+    def clear_attendance(self):
+        """
+        clear all attendance record
+
+        :return: bool
+        """
+        command = const.CMD_CLEAR_ATTLOG
+        cmd_response = self.__send_command(command)
+        if cmd_response.get('status'):
+            return True
+        else:
+            raise ZKErrorResponse("Can't clear response")
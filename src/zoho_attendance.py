@@ -0,0 +1,148 @@
+import os
+import json
+import requests
+import zoho_client
+from dotenv import load_dotenv
+from pathlib import Path
+from zoho_token import get_access_token, get_token_manager
+
+# ─── Load environment from root .env ───
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+
+# ─── Config ───
+DOMAIN     = os.getenv("ZOHO_DOMAIN", "zoho.com")
+PEOPLE_URL = os.getenv("ZOHO_PEOPLE_URL", f"https://people.{DOMAIN}")
+
+BULK_DATE_FORMAT = "yyyy-MM-dd HH:mm:ss"
+
+
+def new_punch(serial, bio_id, emp_id, when, atype):
+    """A punch waiting for delivery. ``sent`` is filled in by the dispatcher."""
+    return {
+        "serial": serial,
+        "bio_id": bio_id,
+        "emp_id": emp_id,
+        "when": when,
+        "timestamp": when.strftime("%Y-%m-%d %H:%M:%S"),
+        "type": atype,
+        "sent": None,
+    }
+
+def _auth_headers():
+    return {"Authorization": f"Zoho-oauthtoken {get_access_token()}"}
+
+def _check_auth(r):
+    if r.status_code == 401:
+        get_token_manager().invalidate()
+
+# ─── Single record ───
+def send_attendance_to_zoho(emp_id, timestamp, atype):
+    url = f"{PEOPLE_URL}/people/api/attendance"
+    data = {
+        "employeeId": emp_id,
+        "checkIn": timestamp if atype == "Check-in" else "",
+        "checkOut": timestamp if atype == "Check-out" else ""
+    }
+    try:
+        r = zoho_client.post(url, headers=_auth_headers(), data=data)
+    except requests.RequestException as e:
+        print(f"❌ Failed to send {atype} for {emp_id}: {e}")
+        return False
+    _check_auth(r)
+    if r.status_code == 200:
+        print(f"✅ Sent {atype} for {emp_id} at {timestamp}")
+        return True
+    else:
+        print(f"❌ Failed to send {atype} for {emp_id}: {r.text}")
+        return False
+
+# ─── Bulk import ───
+def _bulk_row(punch):
+    key = "checkIn" if punch["type"] == "Check-in" else "checkOut"
+    return {"empId": punch["emp_id"], key: punch["timestamp"]}
+
+def _record_failed(item):
+    return isinstance(item, dict) and any(item.get(k) for k in ("error", "errors", "errorMsg"))
+
+def parse_bulk_response(payload, count):
+    """
+    Map a bulkImport response to one bool per submitted row.
+
+    Returns None when the batch as a whole was rejected, or when the results
+    cannot be matched to the rows (e.g. only the failed rows are listed), so
+    the caller falls back to single posts. If Zoho reports a result per row,
+    rows carrying an error are marked as failed; a response without any
+    result means every row was delivered.
+    """
+    resp = payload.get("response", payload) if isinstance(payload, dict) else {}
+    if str(resp.get("status", 0)) != "0":
+        return None
+    result = resp.get("result")
+    if not result:
+        return [True] * count
+    if isinstance(result, list) and len(result) == count:
+        return [not _record_failed(item) for item in result]
+    return None
+
+def send_bulk_attendance(punches):
+    """
+    Submit punches through Zoho People's bulk attendance import.
+
+    :return: list of bool per punch, or None if the batch failed
+    """
+    url = f"{PEOPLE_URL}/people/api/attendance/bulkImport"
+    data = {
+        "data": json.dumps([_bulk_row(p) for p in punches]),
+        "dateFormat": BULK_DATE_FORMAT,
+    }
+    try:
+        r = zoho_client.post(url, headers=_auth_headers(), data=data)
+    except requests.RequestException as e:
+        print(f"❌ Bulk attendance import failed: {e}")
+        return None
+    _check_auth(r)
+    if r.status_code != 200:
+        print(f"❌ Bulk attendance import failed ({r.status_code}): {r.text}")
+        return None
+    try:
+        results = parse_bulk_response(r.json(), len(punches))
+    except ValueError:
+        results = None
+    if results is None:
+        print(f"❌ Bulk attendance import rejected: {r.text}")
+    return results
+
+def hold_back_after_failure(punches, results):
+    """
+    Mark every punch after an employee's first failed one as failed too, so
+    the retry of a check-in is never overtaken by the check-out behind it.
+    """
+    failed = set()
+    held = []
+    for punch, ok in zip(punches, results):
+        ok = ok and punch["emp_id"] not in failed
+        if not ok:
+            failed.add(punch["emp_id"])
+        held.append(ok)
+    return held
+
+def deliver_batch(punches):
+    """
+    Deliver punches in one bulk import, falling back to single posts if the
+    batch is rejected as a whole. Once a punch of an employee fails, their
+    later punches in the batch are reported as failed (and not posted).
+
+    :return: (list of bool per punch, True if the fallback was used)
+    """
+    if len(punches) > 1:
+        results = send_bulk_attendance(punches)
+        if results is not None:
+            return hold_back_after_failure(punches, results), False
+    failed = set()
+    results = []
+    for p in punches:
+        ok = p["emp_id"] not in failed and send_attendance_to_zoho(p["emp_id"], p["timestamp"], p["type"])
+        if not ok:
+            failed.add(p["emp_id"])
+        results.append(ok)
+    return results, len(punches) > 1
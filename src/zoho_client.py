@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+import requests
+import metrics
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
+
+# ─── Config ───
+HTTP_POOL_CONNECTIONS = int(os.getenv("ZOHO_HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE     = int(os.getenv("ZOHO_HTTP_POOL_MAXSIZE", "16"))
+HTTP_CONNECT_TIMEOUT  = float(os.getenv("ZOHO_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT     = float(os.getenv("ZOHO_HTTP_READ_TIMEOUT", "30"))
+HTTP_RETRIES          = int(os.getenv("ZOHO_HTTP_RETRIES", "3"))
+HTTP_BACKOFF          = float(os.getenv("ZOHO_HTTP_BACKOFF", "0.5"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session():
+    """
+    A keep-alive session for Zoho. Idempotent requests (GET/HEAD/...) are
+    retried with exponential backoff on connection errors and on 429/5xx;
+    POSTs are never retried automatically because attendance writes are not
+    idempotent.
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+class EndpointStats:
+    """Per-endpoint request counts, latency and status codes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, seconds, status):
+        with self._lock:
+            s = self._endpoints.get(endpoint)
+            if s is None:
+                s = self._endpoints[endpoint] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "statuses": {}}
+            s["count"] += 1
+            s["seconds"] += seconds
+            if seconds > s["max_seconds"]:
+                s["max_seconds"] = seconds
+            s["statuses"][status] = s["statuses"].get(status, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {k: dict(v, statuses=dict(v["statuses"])) for k, v in self._endpoints.items()}
+
+
+# ─── Shared instance ───
+_session = None
+_session_lock = threading.Lock()
+endpoint_stats = EndpointStats()
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+def request(method, url, **kwargs):
+    """
+    Send a request through the shared session with default timeouts and
+    record its latency under the URL path. Connection failures are counted
+    with status ``"error"`` and re-raised.
+    """
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    endpoint = urlsplit(url).path
+    start = time.perf_counter()
+    try:
+        resp = get_session().request(method, url, **kwargs)
+    except requests.RequestException:
+        elapsed = time.perf_counter() - start
+        endpoint_stats.record(endpoint, elapsed, "error")
+        metrics.zoho_request_seconds.observe(elapsed, (endpoint, "error"))
+        raise
+    elapsed = time.perf_counter() - start
+    endpoint_stats.record(endpoint, elapsed, resp.status_code)
+    metrics.zoho_request_seconds.observe(elapsed, (endpoint, resp.status_code))
+    return resp
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+def stats():
+    return endpoint_stats.snapshot()
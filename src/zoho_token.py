@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from pathlib import Path
+import zoho_client
+
+# ─── Load environment from root .env ───
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+
+# ─── Config ───
+DOMAIN        = os.getenv("ZOHO_DOMAIN", "zoho.com")
+ACCOUNTS_URL  = os.getenv("ZOHO_ACCOUNTS_URL", f"https://accounts.{DOMAIN}")
+CLIENT_ID     = os.getenv("ZOHO_CLIENT_ID")
+CLIENT_SECRET = os.getenv("ZOHO_CLIENT_SECRET")
+REFRESH_TOKEN = os.getenv("ZOHO_REFRESH_TOKEN")
+
+# Refresh this many seconds before the token expires (background timer).
+REFRESH_AHEAD = int(os.getenv("ZOHO_TOKEN_REFRESH_AHEAD", 300))
+# Never hand out a token with less than this many seconds left.
+MIN_TTL       = int(os.getenv("ZOHO_TOKEN_MIN_TTL", 60))
+
+
+class TokenManager:
+    """
+    Process-wide cache for the Zoho OAuth access token.
+
+    The token is cached together with its expiry and refreshed by a
+    background timer ``refresh_ahead`` seconds before it runs out. Only one
+    thread talks to accounts.zoho.com at a time; concurrent callers block on
+    the same refresh and reuse its result.
+    """
+
+    def __init__(self, domain, client_id, client_secret, refresh_token,
+                 refresh_ahead=REFRESH_AHEAD, min_ttl=MIN_TTL, accounts_url=None):
+        self.token_url = f"{accounts_url or f'https://accounts.{domain}'}/oauth/v2/token"
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.refresh_ahead = refresh_ahead
+        self.min_ttl = min_ttl
+
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._timer = None
+
+        self.hits = 0
+        self.refreshes = 0
+        self.coalesced = 0
+        self.background_refreshes = 0
+        self.failures = 0
+
+    def _valid(self, now=None):
+        now = time.monotonic() if now is None else now
+        return self._token is not None and now < self._expires_at - self.min_ttl
+
+    def get_token(self):
+        """Return a valid access token, refreshing it if needed."""
+        if self._valid():
+            self.hits += 1
+            return self._token
+        with self._refresh_lock:
+            # Another thread may have refreshed while we were waiting.
+            if self._valid():
+                self.coalesced += 1
+                return self._token
+            return self._refresh()
+
+    def invalidate(self):
+        """Drop the cached token, e.g. after Zoho answered 401."""
+        self._expires_at = 0.0
+
+    def _fetch(self):
+        resp = zoho_client.post(self.token_url, data={
+            "refresh_token": self.refresh_token,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "refresh_token"
+        })
+        resp.raise_for_status()
+        d = resp.json()
+        if "access_token" not in d:
+            raise RuntimeError(f"No access_token in Zoho response: {d}")
+        return d["access_token"], int(d.get("expires_in", 3600))
+
+    def _refresh(self):
+        """Fetch a new token. Caller must hold ``_refresh_lock``."""
+        try:
+            token, expires_in = self._fetch()
+        except Exception:
+            self.failures += 1
+            raise
+        self._token = token
+        self._expires_at = time.monotonic() + expires_in
+        self.refreshes += 1
+        self._schedule(expires_in)
+        return token
+
+    def _schedule(self, expires_in):
+        if self._timer:
+            self._timer.cancel()
+        delay = max(expires_in - self.refresh_ahead, self.min_ttl)
+        self._timer = threading.Timer(delay, self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self):
+        with self._refresh_lock:
+            try:
+                self._refresh()
+                self.background_refreshes += 1
+            except Exception as e:
+                # Keep serving the current token; get_token() retries in the foreground.
+                print(f"⚠️ Background Zoho token refresh failed: {e}")
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "coalesced": self.coalesced,
+            "background_refreshes": self.background_refreshes,
+            "failures": self.failures,
+        }
+
+
+# ─── Shared instance ───
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_token_manager():
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = TokenManager(DOMAIN, CLIENT_ID, CLIENT_SECRET, REFRESH_TOKEN, accounts_url=ACCOUNTS_URL)
+    return _manager
+
+def get_access_token():
+    return get_token_manager().get_token()
@@ -0,0 +1,128 @@
+"""
+Microbenchmarks of the pyzk decoders on fixture buffers (see zk_fixtures.py).
+
+Every decode is checked against its golden digest before it is timed, so a
+faster decoder that changes the output fails loudly instead of looking good.
+
+    python tests/bench_decode.py
+    python tests/bench_decode.py --only attendance_16 users_28 --repeat 5 --output decode.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import zk_fixtures
+from zk_fixtures import (DIGESTS, FixtureZK, attendance_zk, canonical_attendance, canonical_attendance_array,
+                         cases, comparable_attendance, digest, load)
+from bench_pipeline import git_revision
+
+CHECKSUM_SIZES = (8, 1032, 65535)
+
+
+def timings(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return {"best": min(runs), "median": statistics.median(runs), "runs": repeat}
+
+def bench_decoders(args):
+    goldens = json.loads(DIGESTS.read_text())
+    results = {}
+    for name, kind, size, n, decode in cases():
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+        load(kind, size, n)  # generate outside the timed runs
+        rows = decode()
+        ok = digest(rows) == goldens.get(name)
+        result = timings(decode, args.repeat)
+        result.update(rows=len(rows), golden_ok=ok, per_row_us=result["best"] / max(len(rows), 1) * 1e6)
+        results[name] = result
+        print(f"{'✅' if ok else '❌'} {name:22} {result['best'] * 1000:10.1f} ms  "
+              f"{result['per_row_us']:7.2f} µs/row")
+    return results
+
+def bench_arrays(args, decoders):
+    """``get_attendance_array`` against ``get_attendance`` on the same buffers (needs numpy)."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("⚠️ numpy not installed, skipping get_attendance_array")
+        return {}
+    results = {}
+    for label, n in zk_fixtures.SIZES.items():
+        for size in (8, 16, 40):
+            name = f"attendance_{size}_{label}"
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            load("attendance", size, n)
+            decode = lambda size=size, n=n: attendance_zk(size, n).get_attendance_array()
+            array = decode()
+            ok = canonical_attendance_array(array) == comparable_attendance(
+                canonical_attendance(attendance_zk(size, n).get_attendance()))
+            result = timings(decode, args.repeat)
+            result.update(rows=len(array), golden_ok=ok, per_row_us=result["best"] / max(len(array), 1) * 1e6,
+                          bytes_per_row=array.itemsize)
+            if name in decoders:
+                result["speedup"] = decoders[name]["best"] / result["best"]
+            results[f"{name}_array"] = result
+            print(f"{'✅' if ok else '❌'} {name + '_array':22} {result['best'] * 1000:10.1f} ms  "
+                  f"{result['per_row_us']:7.2f} µs/row  {result.get('speedup', 0):5.1f}x")
+    return results
+
+def bench_primitives(args):
+    """``__decode_time`` and ``__create_checksum`` on their own."""
+    zk = FixtureZK()
+    attendance = load("attendance", 16, zk_fixtures.SIZES["10k"])[4:]
+    times = [attendance[i + 4:i + 8] for i in range(0, len(attendance), 16)]
+    decode_time = zk._ZK__decode_time
+    result = timings(lambda: [decode_time(t) for t in times], args.repeat)
+    result["per_call_us"] = result["best"] / len(times) * 1e6
+    results = {"decode_time": result}
+    print(f"⏱️ {'decode_time':22} {result['per_call_us']:7.2f} µs/call")
+
+    rng = random.Random(4)
+    checksum = zk._ZK__create_checksum
+    for size in CHECKSUM_SIZES:
+        packet = struct.pack("<4H", 1500, 0, 1, 2) + rng.randbytes(size - 8)
+        result = timings(lambda: [checksum(packet) for _ in range(100)], args.repeat)
+        result["per_call_us"] = result["best"] / 100 * 1e6
+        results[f"checksum_{size}"] = result
+        print(f"⏱️ {f'checksum_{size}':22} {result['per_call_us']:7.2f} µs/call")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the pyzk decoders on fixture buffers.")
+    parser.add_argument("--only", nargs="+", help="case name prefixes, e.g. attendance_16 users_72_1k")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "decoders": bench_decoders(args),
+    }
+    report["decoders"].update(bench_arrays(args, report["decoders"]))
+    if not args.only:
+        report["primitives"] = bench_primitives(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"💾 Results written to {args.output}")
+    if not all(r["golden_ok"] for r in report["decoders"].values()):
+        sys.exit("❌ Decoded output differs from the goldens.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+End-to-end benchmark of final.py against local stand-ins.
+
+Every scenario gets a fresh ZK emulator (tests/zk_emulator.py), a Zoho
+stand-in (tests/zoho_emulator.py) and a throwaway MariaDB database created
+from the DB_* settings and dropped afterwards. The pipeline runs as
+``final.main()`` in a child process, so its peak RSS is its own. Reported:
+
+- punches per second and p50/p95/p99 punch-to-delivery latency
+- device dump time versus record count (also standalone: ``--scenario dump``)
+- DB round trips per capture cycle and per delivered punch
+- peak RSS of the pipeline process
+
+    python tests/bench_pipeline.py --scenario all --output bench.json
+    python tests/bench_pipeline.py --scenario dump --dump-sizes 1000 10000 100000
+
+The DB user needs CREATE and DROP DATABASE. SQLite is not an option: the
+pipeline relies on MariaDB SQL (INSERT IGNORE, SKIP LOCKED, GET_LOCK).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from dotenv import load_dotenv
+from zk import ZK
+from zk_emulator import DeviceState, ZKEmulator, USER_ID_OFFSET
+from zoho_emulator import ZohoEmulator
+
+load_dotenv(dotenv_path=ROOT / ".env")
+
+SCENARIOS = {
+    # Punches trickle in at a steady rate.
+    "steady": {"records": 0, "rate": 20, "duration": 30},
+    # A shift change: thousands of punches within seconds.
+    "burst":  {"records": 0, "rate": 2, "duration": 20, "burst": 3000, "burst_at": 5},
+    # Zoho answers 500 for a while; measures how fast the backlog recovers.
+    "outage": {"records": 0, "rate": 20, "duration": 40, "outage": (10, 25)},
+    # A full device that was never read before.
+    "full":   {"records": 100000, "rate": 0, "duration": 0},
+}
+RESULT_MARKER = "BENCH_RESULT "
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(int(round(pct / 100 * len(ordered))) - 1, 0)]
+
+def _round(value, digits=3):
+    return None if value is None else round(value, digits)
+
+def emp_id_of(user_id):
+    return f"EMP{int(user_id) - USER_ID_OFFSET:05d}"
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ─── Child: the pipeline under test ───
+def _thread_group():
+    name = threading.current_thread().name
+    for prefix in ("device-", "zoho-worker-"):
+        if name.startswith(prefix):
+            return prefix.rstrip("-")
+    return name
+
+
+class CountingCursor:
+    def __init__(self, cursor, count):
+        self._cursor = cursor
+        self._count = count
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, *args, **kwargs):
+        self._count()
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._count()
+        return self._cursor.executemany(*args, **kwargs)
+
+
+class CountingConnection:
+    """Counts statements, commits and rollbacks sent over a connection, per thread group."""
+
+    def __init__(self, conn, trips, lock):
+        self._conn = conn
+        self._trips = trips
+        self._lock = lock
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def _count(self):
+        group = _thread_group()
+        with self._lock:
+            self._trips[group] = self._trips.get(group, 0) + 1
+
+    def cursor(self, *args, **kwargs):
+        return CountingCursor(self._conn.cursor(*args, **kwargs), self._count)
+
+    def commit(self):
+        self._count()
+        return self._conn.commit()
+
+    def rollback(self):
+        self._count()
+        return self._conn.rollback()
+
+
+def child_main(mode):
+    """Run ``final.main()`` with instrumented reads and connections; print the stats on exit."""
+    import final
+    from mysql.connector import pooling
+
+    dumps, trips, lock = [], {}, threading.Lock()
+    fetch_new_logs = final.fetch_new_logs
+
+    def timed_fetch(dev, checkpoint):
+        started, before = time.perf_counter(), dev.bytes_read
+        logs, base, start = fetch_new_logs(dev, checkpoint)
+        dumps.append({"device_records": dev.records, "new_records": len(logs) - start,
+                      "bytes": dev.bytes_read - before, "seconds": time.perf_counter() - started})
+        return logs, base, start
+
+    get_connection = pooling.MySQLConnectionPool.get_connection
+    final.fetch_new_logs = timed_fetch
+    pooling.MySQLConnectionPool.get_connection = lambda pool: CountingConnection(get_connection(pool), trips, lock)
+    sys.argv = [final.__file__, "--mode", mode]
+    final.main()
+    print(RESULT_MARKER + json.dumps({"dumps": dumps, "round_trips": trips, "peak_rss_mb": peak_rss_mb()}), flush=True)
+
+
+# ─── Parent: emulators, database and schedule ───
+def db_config():
+    return {
+        "host":     os.getenv("DB_HOST", "127.0.0.1"),
+        "port":     int(os.getenv("DB_PORT", 3306)),
+        "user":     os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASS"),
+    }
+
+def create_database(name, state, zk_port, force_udp):
+    import mysql.connector
+    from migrate import migrate
+
+    conn = mysql.connector.connect(**db_config())
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE `{name}`")
+    cursor.close()
+    conn.database = name
+    migrate(conn)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO employees (zoho_emp_id, biometric_id, name) VALUES (%s, %s, %s)",
+        [(emp_id_of(user_id), int(user_id), f"Employee {uid}") for uid, user_id in state.users]
+    )
+    cursor.execute("INSERT INTO devices (name, ip, port, force_udp) VALUES (%s, %s, %s, %s)",
+                   ("emulator", "127.0.0.1", zk_port, int(force_udp)))
+    conn.commit()
+    cursor.close()
+    return conn
+
+def drop_database(conn, name):
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{name}`")
+    cursor.close()
+    conn.close()
+
+def wait_until_connected(conn, child, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and child.poll() is None:
+        cursor = conn.cursor()
+        cursor.execute("SELECT last_seen_at FROM devices")
+        seen = cursor.fetchone()[0]
+        cursor.close()
+        conn.commit()
+        if seen:
+            return
+        time.sleep(0.2)
+    raise RuntimeError("pipeline did not connect to the device emulator")
+
+
+def run_scenario(name, spec, args):
+    state = DeviceState(users=args.users, records=spec["records"], record_size=args.record_size)
+    zk = ZKEmulator(state, latency=args.device_latency, rtt=args.device_rtt).start()
+    zoho = ZohoEmulator(employees=args.users, latency=args.zoho_latency, rate_limit=args.zoho_rate_limit).start()
+    db_name = f"zk_bench_{os.getpid()}_{name}"
+    conn = create_database(db_name, state, zk.port, args.transport == "udp")
+    created = {}  # (emp_id, timestamp) -> monotonic time the device recorded it
+
+    env = dict(os.environ, DB_NAME=db_name, ZOHO_PEOPLE_URL=zoho.url, ZOHO_ACCOUNTS_URL=zoho.url,
+               ZOHO_REFRESH_TOKEN=zoho.refresh_token, ZOHO_CLIENT_ID="bench", ZOHO_CLIENT_SECRET="bench",
+               CHECKPOINT_DIR=tempfile.mkdtemp(prefix="zk-bench-"), ZK_USER_CACHE_DIR="", METRICS_PORT="0",
+               ZK_READ_WINDOW=str(args.read_window),
+               POLL_INTERVAL=str(args.poll_interval), FLEET_STATUS_INTERVAL="1")
+    env.update(item.split("=", 1) for item in args.set)
+    child = subprocess.Popen([sys.executable, __file__, "--child", "--mode", args.mode], env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    output = []
+    reader = threading.Thread(target=lambda: output.extend(child.stdout), daemon=True)
+    reader.start()
+
+    def punch(**kw):
+        user_id, when, _, _ = state.add_punch(**kw)
+        created[(emp_id_of(user_id), when.strftime("%Y-%m-%d %H:%M:%S"))] = time.monotonic()
+
+    try:
+        wait_until_connected(conn, child)
+        started = time.monotonic()
+        outage_end = None
+        burst_pending = bool(spec.get("burst"))
+        i = 0
+        while time.monotonic() - started < spec["duration"]:
+            elapsed = time.monotonic() - started
+            if burst_pending and elapsed >= spec["burst_at"]:
+                burst_pending = False
+                burst_at = time.monotonic()
+                before = len(state.punches)
+                state.burst(spec["burst"])
+                for user_id, when, _, _ in state.punches[before:]:
+                    created[(emp_id_of(user_id), when.strftime("%Y-%m-%d %H:%M:%S"))] = burst_at
+            if spec.get("outage"):
+                down = spec["outage"][0] <= elapsed < spec["outage"][1]
+                if down != (zoho.error_rate == 1.0):
+                    zoho.error_rate = 1.0 if down else 0.0
+                    if not down:
+                        outage_end = time.monotonic()
+            if spec["rate"] and i < elapsed * spec["rate"]:
+                punch(user=i % len(state.users))
+                i += 1
+            time.sleep(0.001)
+        zoho.error_rate = 0.0
+        schedule_end = time.monotonic()
+
+        expected = len(state.punches)
+        deadline = schedule_end + args.timeout
+        while len({(a[0], a[2]) for a in zoho.attendance}) < expected and time.monotonic() < deadline:
+            time.sleep(0.1)
+        delivered_at = {}
+        for emp_id, _, ts, at in zoho.attendance:
+            delivered_at.setdefault((emp_id, ts), at)
+    finally:
+        if child.poll() is None:
+            child.send_signal(signal.SIGINT)
+        try:
+            child.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            child.kill()
+        reader.join(5)
+        zk.stop()
+        zoho.stop()
+        if not args.keep_db:
+            drop_database(conn, db_name)
+
+    child_stats = next((json.loads(line[len(RESULT_MARKER):]) for line in output if line.startswith(RESULT_MARKER)), None)
+    if args.verbose or child_stats is None:
+        sys.stdout.write("".join(output))
+    latencies = [delivered_at[k] - t for k, t in created.items() if k in delivered_at]
+    last = max(delivered_at.values(), default=started)
+    result = {
+        "records_on_device": len(state.punches),
+        "expected": expected,
+        "delivered": len(delivered_at),
+        "duplicates": len(zoho.attendance) - len(delivered_at),
+        "elapsed_seconds": round(last - started, 3),
+        "drain_seconds": round(max(last - schedule_end, 0), 3),
+        "punches_per_second": round(len(delivered_at) / (last - started), 1) if last > started else None,
+        "latency_seconds": {f"p{p}": _round(percentile(latencies, p)) for p in (50, 95, 99)},
+        "zoho": zoho.stats(),
+    }
+    if outage_end is not None:
+        pending = [delivered_at.get(k) for k, t in created.items() if t < outage_end]
+        result["outage_recovery_seconds"] = None if None in pending else round(max(pending, default=outage_end) - outage_end, 3)
+    if child_stats:
+        dumps = child_stats["dumps"]
+        trips = child_stats["round_trips"]
+        result.update({
+            "peak_rss_mb": round(child_stats["peak_rss_mb"], 1),
+            "dumps": dumps,
+            "cycles": len(dumps),
+            "round_trips": trips,
+            "round_trips_per_cycle": round(trips.get("device", 0) / len(dumps), 1) if dumps else None,
+            "round_trips_per_delivery": round(trips.get("outbox-drainer", 0) / len(delivered_at), 2) if delivered_at else None,
+        })
+    return result
+
+
+def run_dump(args):
+    """Device read time versus record count, straight from the emulator (no DB)."""
+    results = []
+    for records in args.dump_sizes:
+        state = DeviceState(users=args.users, records=records, record_size=args.record_size)
+        with ZKEmulator(state, latency=args.device_latency, rtt=args.device_rtt) as zk:
+            dev = ZK("127.0.0.1", port=zk.port, force_udp=args.transport == "udp", ommit_ping=True,
+                     read_window=args.read_window).connect()
+            row = {"records": records}
+            for label, read in (("users", dev.get_users), ("full", dev.get_attendance),
+                                ("tail_100", lambda: dev.get_attendance_since(max(records - 100, 0)))):
+                started, before = time.perf_counter(), dev.bytes_read
+                count = len(read())
+                row[label] = {"seconds": round(time.perf_counter() - started, 4), "rows": count,
+                              "bytes": dev.bytes_read - before}
+            dev.disconnect()
+        results.append(row)
+        print(f"📟 {records} records: full read {row['full']['seconds']:.3f}s, "
+              f"tail {row['tail_100']['seconds']:.3f}s")
+    return {"sizes": results, "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark final.py against local device and Zoho stand-ins.")
+    parser.add_argument("--scenario", nargs="+", default=["all"], choices=["all", "dump", *SCENARIOS])
+    parser.add_argument("--mode", choices=["poll", "live"], default="poll")
+    parser.add_argument("--transport", choices=["udp", "tcp"], default="udp")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--record-size", type=int, choices=[8, 16, 40], default=16)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--device-latency", type=float, default=0.0)
+    parser.add_argument("--device-rtt", type=float, default=0.0, help="network round trip to the emulated device")
+    parser.add_argument("--read-window", type=int, default=1, help="chunk requests in flight for UDP dumps")
+    parser.add_argument("--zoho-latency", type=float, default=0.05)
+    parser.add_argument("--zoho-rate-limit", type=int, default=0)
+    parser.add_argument("--dump-sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--timeout", type=float, default=600, help="seconds to wait for delivery after the schedule")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the pipeline, e.g. OUTBOX_RETRY_BASE=2")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--keep-db", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="echo the pipeline's output")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        child_main(args.mode)
+        return
+    names = list(SCENARIOS) + ["dump"] if "all" in args.scenario else args.scenario
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("child", "output", "verbose")},
+        "scenarios": {},
+    }
+    for name in names:
+        print(f"⏱️ Running {name}...")
+        result = run_dump(args) if name == "dump" else run_scenario(name, SCENARIOS[name], args)
+        report["scenarios"][name] = result
+        if name != "dump":
+            lat = result["latency_seconds"]
+            print(f"✅ {name}: {result['delivered']}/{result['expected']} delivered, "
+                  f"{result['punches_per_second']} punches/s, p50 {lat['p50']} p95 {lat['p95']} p99 {lat['p99']}, "
+                  f"RSS {result.get('peak_rss_mb')} MB")
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"💾 Results written to {args.output}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The scripts in src/ import each other as top-level modules.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=()):
+        self.conn.record(query, params)
+
+    def executemany(self, query, rows):
+        self.conn.record(query, list(rows))
+
+    def fetchone(self):
+        return self.conn.rows[0] if self.conn.rows else None
+
+    def fetchall(self):
+        return self.conn.rows
+
+    def __iter__(self):
+        return iter(self.conn.rows)
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    """A MySQL connection that records every statement and answers with fixed rows."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+        self.fail = False
+
+    def record(self, query, params):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.executed.append((query, params))
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+    def queries(self, query):
+        return [params for q, params in self.executed if q == query]
+
+
+@pytest.fixture
+def fake_conn():
+    return FakeConn
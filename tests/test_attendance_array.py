@@ -0,0 +1,34 @@
+import pytest
+from zk import base
+from zk_fixtures import (SIZES, STORED, FixtureZK, attendance_zk, canonical_attendance,
+                         canonical_attendance_array, comparable_attendance)
+
+
+@pytest.mark.parametrize("size", [8, 16, 40])
+def test_array_matches_object_decode(size):
+    pytest.importorskip("numpy")
+    n = SIZES[STORED]
+    array = attendance_zk(size, n).get_attendance_array()
+    objects = canonical_attendance(attendance_zk(size, n).get_attendance())
+    assert len(array) == n
+    assert canonical_attendance_array(array) == comparable_attendance(objects)
+
+
+def test_timestamps_convert_to_wall_clock():
+    np = pytest.importorskip("numpy")
+    array = attendance_zk(16, SIZES[STORED]).get_attendance_array()
+    first = attendance_zk(16, SIZES[STORED]).get_attendance()[0]
+    assert array["timestamp"].astype("datetime64[s]")[0] == np.datetime64(first.timestamp)
+
+
+def test_empty_device_gives_empty_array():
+    pytest.importorskip("numpy")
+    array = FixtureZK().get_attendance_array()
+    assert len(array) == 0
+    assert set(array.dtype.names) == {"user_id", "timestamp", "status", "punch", "uid"}
+
+
+def test_missing_numpy_is_reported(monkeypatch):
+    monkeypatch.setattr(base, "np", None)
+    with pytest.raises(ImportError):
+        FixtureZK().get_attendance_array()
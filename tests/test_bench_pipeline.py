@@ -0,0 +1,39 @@
+import threading
+
+import bench_pipeline
+from bench_pipeline import CountingConnection, percentile
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (50, 95, 99)] == [50, 95, 99]
+    assert percentile([], 50) is None
+    assert percentile([7], 99) == 7
+
+
+def test_round_trips_are_counted_per_thread_group(fake_conn):
+    trips = {}
+    conn = CountingConnection(fake_conn([(1,), (2,)]), trips, threading.Lock())
+
+    def device_cycle():
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.executemany("INSERT", [(1,), (2,)])
+        assert list(cursor) == [(1,), (2,)]
+        conn.commit()
+
+    t = threading.Thread(target=device_cycle, name="device-gate")
+    t.start()
+    t.join()
+    conn.close()
+    assert trips == {"device": 3}
+    assert conn._conn.closed
+
+
+def test_dump_scenario_runs_against_the_emulator():
+    args = bench_pipeline.parse_args(["--scenario", "dump", "--dump-sizes", "300", "--users", "20"])
+    result = bench_pipeline.run_dump(args)
+    row = result["sizes"][0]
+    assert row["full"]["rows"] == 300
+    assert row["tail_100"]["rows"] == 100
+    assert row["tail_100"]["bytes"] < row["full"]["bytes"]
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import checkpoint
+from checkpoint import advance, empty_checkpoint, load_checkpoint, resume_index, save_checkpoint
+
+T0 = datetime(2025, 7, 1, 8, 0, 0)
+
+
+def make_logs(n, offset=0):
+    return [SimpleNamespace(user_id=str(100 + i), timestamp=T0 + timedelta(minutes=i), status=0)
+            for i in range(offset, offset + n)]
+
+
+def test_empty_checkpoint_starts_at_zero():
+    assert resume_index(make_logs(3), empty_checkpoint("SN1")) == 0
+
+
+def test_append_only_log_resumes_after_last_record():
+    logs = make_logs(5)
+    cp = advance(empty_checkpoint("SN1"), logs, 3)
+    assert resume_index(make_logs(8), cp) == 3
+
+
+def test_cleared_log_resumes_by_timestamp():
+    cp = advance(empty_checkpoint("SN1"), make_logs(5), 5)
+    # Device was cleared; only two punches newer than the checkpoint remain.
+    assert resume_index(make_logs(2, offset=6), cp) == 0
+
+
+def test_rotated_log_skips_already_seen_records():
+    cp = advance(empty_checkpoint("SN1"), make_logs(10), 10)
+    # Oldest four records rotated out, three new ones appended.
+    logs = make_logs(9, offset=4)
+    assert resume_index(logs, cp) == 5  # the last seen record, re-checked by dedupe
+
+
+def test_advance_without_progress_forces_reread():
+    cp = advance(empty_checkpoint("SN1"), make_logs(5), 5)
+    cp = advance(cp, make_logs(2, offset=6), 0)
+    assert cp["records"] == 0
+    assert cp["last_timestamp"] == "2025-07-01 08:04:00"
+
+
+def test_checkpoint_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", tmp_path)
+    cp = advance(empty_checkpoint("SN1"), make_logs(4), 4)
+    save_checkpoint(cp)
+    assert load_checkpoint("SN1") == cp
+    assert load_checkpoint("SN2") == empty_checkpoint("SN2")
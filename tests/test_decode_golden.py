@@ -0,0 +1,42 @@
+import json
+import random
+import struct
+from datetime import datetime
+
+import pytest
+from zk_emulator import checksum, encode_time
+from zk_fixtures import DIGESTS, SIZES, STORED, FixtureZK, cases, digest, golden_path, stored
+
+STORED_CASES = [c for c in cases() if stored(c[1], c[3])]
+SMALL_CASES = [c for c in cases() if c[0] == "templates_100"]
+
+
+@pytest.mark.parametrize("name, kind, size, n, decode", STORED_CASES, ids=[c[0] for c in STORED_CASES])
+def test_recorded_fixtures_decode_to_golden(name, kind, size, n, decode):
+    golden = json.loads(golden_path(name).read_text())
+    assert decode() == golden
+
+
+@pytest.mark.parametrize("name, kind, size, n, decode", SMALL_CASES, ids=[c[0] for c in SMALL_CASES])
+def test_generated_fixtures_match_golden_digest(name, kind, size, n, decode):
+    assert digest(decode()) == json.loads(DIGESTS.read_text())[name]
+
+
+def test_every_case_has_a_golden_digest():
+    assert {c[0] for c in cases()} == set(json.loads(DIGESTS.read_text()))
+    assert SIZES[STORED] == 1000
+
+
+def test_decode_time_inverts_encode_time():
+    decode_time = FixtureZK()._ZK__decode_time
+    for t in (datetime(2000, 1, 1), datetime(2024, 2, 29, 23, 59, 59), datetime(2031, 12, 31, 12, 0, 1)):
+        assert decode_time(struct.pack("<I", encode_time(t))) == t
+
+
+def test_checksum_matches_device_side_implementation():
+    create_checksum = FixtureZK()._ZK__create_checksum
+    rng = random.Random(5)
+    assert struct.unpack("H", create_checksum(struct.pack("<4H", 1000, 0, 0, 65534)))[0] == 64535
+    for size in (8, 9, 1032, 4097):
+        packet = rng.randbytes(size)
+        assert struct.unpack("H", create_checksum(packet))[0] == checksum(packet)
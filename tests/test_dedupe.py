@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from dedupe import DedupeIndex
+
+
+def test_seed_loads_window_with_one_query(fake_conn):
+    now = datetime.now().replace(microsecond=0)
+    conn = fake_conn([(101, now - timedelta(hours=1)), (102, now - timedelta(minutes=5))])
+    idx = DedupeIndex(window_hours=24)
+    idx.seed(conn)
+    assert len(conn.executed) == 1
+    assert idx.seen("101", now - timedelta(hours=1))
+    assert not idx.seen("101", now)
+    assert idx.stats()["hits"] == 1
+    assert idx.stats()["misses"] == 1
+
+
+def test_old_keys_use_fallback():
+    idx = DedupeIndex(window_hours=1)
+    old = datetime.now() - timedelta(hours=2)
+    calls = []
+    assert idx.seen("7", old, lambda b, t: calls.append((b, t)) or True)
+    assert calls == [("7", old)]
+    assert idx.stats()["db_lookups"] == 1
+
+
+def test_keys_outside_window_are_evicted():
+    idx = DedupeIndex(window_hours=1)
+    idx.add("1", datetime.now() - timedelta(hours=3))
+    idx.add("2", datetime.now())
+    assert len(idx) == 1
@@ -0,0 +1,76 @@
+from datetime import datetime
+from pathlib import Path
+
+import zk
+import devices
+from devices import DeviceHealth, load_devices
+from zk.base import ZK_helper
+from zk_emulator import DeviceState, ZKEmulator
+
+
+def test_registered_devices_are_loaded(fake_conn):
+    rows = [
+        {"name": "gate", "ip": "10.0.0.1", "port": 4370, "password": None, "force_udp": 1},
+        {"name": "dock", "ip": "10.0.0.2", "port": 4371, "password": 123, "force_udp": 0},
+    ]
+    loaded = load_devices(fake_conn(rows))
+    assert [d["name"] for d in loaded] == ["gate", "dock"]
+    assert loaded[0]["password"] == 0 and loaded[0]["force_udp"] is True
+    assert loaded[1]["password"] == 123 and loaded[1]["force_udp"] is False
+
+
+def test_falls_back_to_env_device(monkeypatch, fake_conn):
+    monkeypatch.setattr(devices, "ZK_IP", "10.0.0.9")
+    monkeypatch.setattr(devices, "ZK_PASSWORD", "42")
+    (device,) = load_devices(fake_conn([]))
+    assert device["ip"] == "10.0.0.9" and device["password"] == 42
+
+
+def test_health_reports_lag():
+    health = DeviceHealth("gate")
+    assert health.snapshot()["lag_seconds"] is None
+
+    health.connected("SN1")
+    health.observe(120)
+    health.caught_up({"records": 100})
+    health.punch(datetime(2025, 7, 1, 8, 0))
+    health.punch(datetime(2025, 7, 1, 7, 0))
+    snap = health.snapshot()
+    assert snap["state"] == "online" and snap["serial"] == "SN1"
+    assert snap["lag_records"] == 20
+    assert snap["lag_seconds"] >= 0
+    assert snap["queued"] == 2
+    assert snap["last_punch_at"] == "2025-07-01 08:00:00"
+
+    health.failed(OSError("timed out"))
+    assert health.snapshot()["state"] == "error"
+    assert health.snapshot()["last_error"] == "timed out"
+
+
+def test_device_library_ships_with_src():
+    # The images copy src/ only; the extended ZK must not come from site-packages.
+    assert Path(zk.__file__).parent == Path(devices.__file__).parent / "zk"
+    assert hasattr(zk.ZK, "get_attendance_since")
+
+
+def test_connect_keeps_the_user_table_in_the_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(ZK_helper, "test_ping", lambda self: True)
+    monkeypatch.setattr(devices, "ZK_USER_CACHE_DIR", str(tmp_path))
+    with ZKEmulator(DeviceState(users=5, records=10)) as emulator:
+        dev, serial = devices.connect({"ip": "127.0.0.1", "port": emulator.port, "password": 0, "force_udp": True})
+        assert len(dev.get_attendance()) == 10
+        dev.disconnect()
+    assert (tmp_path / f"users_{serial}.json").exists()
+
+
+def test_connect_reads_with_a_window_when_configured(monkeypatch):
+    monkeypatch.setattr(ZK_helper, "test_ping", lambda self: True)
+    monkeypatch.setattr(devices, "ZK_USER_CACHE_DIR", None)
+    monkeypatch.setattr(devices, "ZK_READ_WINDOW", 4)
+    state = DeviceState(users=5, records=5000)
+    with ZKEmulator(state, rtt=0.01) as emulator:
+        dev, _ = devices.connect({"ip": "127.0.0.1", "port": emulator.port, "password": 0, "force_udp": True})
+        logs = dev.get_attendance()
+        dev.disconnect()
+    assert emulator.peak_in_flight > 1  # chunk requests overlapped
+    assert [(a.user_id, a.timestamp) for a in logs] == [p[:2] for p in state.punches]
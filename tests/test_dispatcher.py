@@ -0,0 +1,91 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import zoho_attendance
+from dispatcher import ZohoDispatcher
+from zoho_attendance import new_punch
+
+T0 = datetime(2025, 7, 1, 8, 0, 0)
+
+
+def punch(emp, i):
+    return new_punch("SN1", emp, emp, T0 + timedelta(seconds=i), "Check-in" if i % 2 == 0 else "Check-out")
+
+
+def test_per_employee_order_is_preserved(monkeypatch):
+    delivered = []
+    lock = threading.Lock()
+
+    def fake_deliver(batch):
+        time.sleep(0.001)
+        with lock:
+            delivered.extend(batch)
+        return [True] * len(batch), False
+
+    monkeypatch.setattr(zoho_attendance, "deliver_batch", fake_deliver)
+    d = ZohoDispatcher(workers=4, batch_size=3).start()
+    punches = [punch(f"E{e}", i) for i in range(20) for e in range(6)]
+    for p in punches:
+        d.submit(p)
+    assert d.wait(punches, timeout=5)
+    d.stop()
+    for e in range(6):
+        mine = [p["when"] for p in delivered if p["emp_id"] == f"E{e}"]
+        assert mine == sorted(mine)
+        assert len(mine) == 20
+
+
+def test_workers_send_in_parallel(monkeypatch):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_deliver(batch):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        return [True] * len(batch), False
+
+    monkeypatch.setattr(zoho_attendance, "deliver_batch", slow_deliver)
+    d = ZohoDispatcher(workers=4, batch_size=1).start()
+    punches = [punch(f"E{e}", 0) for e in range(16)]
+    start = time.monotonic()
+    for p in punches:
+        d.submit(p)
+    assert d.wait(punches, timeout=5)
+    elapsed = time.monotonic() - start
+    d.stop()
+    assert max(peak) > 1
+    assert max(peak) <= 4
+    assert elapsed < 16 * 0.05
+
+
+def test_results_reach_callback(monkeypatch):
+    monkeypatch.setattr(zoho_attendance, "deliver_batch", lambda batch: ([p["emp_id"] != "E1" for p in batch], False))
+    seen = []
+    d = ZohoDispatcher(on_result=seen.append, workers=2).start()
+    punches = [punch(f"E{e}", 0) for e in range(3)]
+    for p in punches:
+        d.submit(p)
+    d.wait(punches, timeout=5)
+    d.stop()
+    assert sorted(p["emp_id"] for p in seen) == ["E0", "E1", "E2"]
+    assert {p["emp_id"]: p["sent"] for p in punches} == {"E0": True, "E1": False, "E2": True}
+    assert d.stats()["failed"] == 1
+
+
+def test_max_delay_lets_a_batch_fill(monkeypatch):
+    batches = []
+    monkeypatch.setattr(zoho_attendance, "deliver_batch", lambda batch: batches.append(len(batch)) or ([True] * len(batch), False))
+    d = ZohoDispatcher(workers=1, batch_size=10, max_delay=0.5).start()
+    punches = [punch("E1", 0), punch("E1", 1)]
+    d.submit(punches[0])
+    time.sleep(0.05)
+    d.submit(punches[1])
+    assert d.wait(punches, timeout=5)
+    d.stop()
+    assert batches == [2]
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import employee_map
+from employee_map import EmployeeMap, SELECT_CHANGED
+
+T0 = datetime(2025, 7, 1, 8, 0, 0)
+
+
+def emp(emp_id, bio_id, seconds=0):
+    return {"zoho_emp_id": emp_id, "biometric_id": bio_id, "updated_at": T0 + timedelta(seconds=seconds)}
+
+
+def loaded(fake_conn, rows):
+    m = EmployeeMap()
+    m.load(fake_conn(rows))
+    return m
+
+
+def test_load_skips_employees_without_biometric_id(fake_conn):
+    m = loaded(fake_conn, [emp("E1", 1), emp("E2", None), emp("E3", 3, seconds=5)])
+    assert m.mapping == {"1": "E1", "3": "E3"}
+    assert m.watermark == T0 + timedelta(seconds=5)
+
+
+def test_refresh_only_asks_for_changed_rows(fake_conn):
+    m = loaded(fake_conn, [emp("E1", 1, seconds=100)])
+    conn = fake_conn([emp("E2", 2, seconds=120)])
+    assert m.refresh(conn) == 1
+    query, (since,) = conn.executed[0]
+    assert query == SELECT_CHANGED
+    assert since == T0 + timedelta(seconds=100 - employee_map.MAPPING_REFRESH_OVERLAP)
+    assert m.get("2") == "E2" and m.get("1") == "E1"
+
+
+def test_refresh_swaps_a_new_dict(fake_conn):
+    m = loaded(fake_conn, [emp("E1", 1)])
+    before = m.mapping
+    m.refresh(fake_conn([emp("E1", 7, seconds=1)]))
+    assert before == {"1": "E1"}  # readers holding the old dict are unaffected
+    assert m.mapping == {"7": "E1"}
+
+
+def test_unchanged_rows_keep_the_same_dict(fake_conn):
+    m = loaded(fake_conn, [emp("E1", 1)])
+    before = m.mapping
+    assert m.refresh(fake_conn([emp("E1", 1)])) == 0
+    assert m.mapping is before
+
+
+def test_cleared_and_reassigned_ids(fake_conn):
+    m = loaded(fake_conn, [emp("E1", 1), emp("E2", 2)])
+    m.refresh(fake_conn([emp("E2", 1, seconds=1), emp("E1", None, seconds=1)]))
+    assert m.mapping == {"1": "E2"}
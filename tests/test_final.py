@@ -0,0 +1,110 @@
+import threading
+import time
+
+import devices
+import final
+import metrics
+import outbox
+from checkpoint import advance, empty_checkpoint
+from final import DeviceWorker
+from outbox import INSERT_OUTBOX
+from zk import ZK
+from zk.base import ZK_helper
+from zk_emulator import DeviceState, ZKEmulator
+
+
+class FakeDrainer:
+    def __init__(self):
+        self.woken = threading.Event()
+
+    def wake(self):
+        self.woken.set()
+
+
+class FakePipeline:
+    def __init__(self):
+        self.drainer = FakeDrainer()
+
+    def claim(self, conn, bio_id, ts):
+        return True
+
+    def resolve(self, bio_id):
+        return "EMP" + bio_id
+
+
+class FakeWriter:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, *row):
+        self.rows.append(row)
+
+    def flush(self):
+        return False
+
+
+def dump_bytes(device):
+    return dict((labels, v) for _, labels, v in metrics.device_dump_bytes.collect()).get((device,), 0)
+
+
+def test_catch_up_queues_new_records_and_counts_the_bytes(monkeypatch):
+    saved = []
+    monkeypatch.setattr(final, "save_checkpoint", saved.append)
+    state = DeviceState(users=5, records=3)
+    worker = DeviceWorker(FakePipeline(), {"name": "gate"}, connect=None)
+    worker.outbox, worker.parked = FakeWriter(), FakeWriter()
+    bytes_before = dump_bytes("gate")
+    with ZKEmulator(state) as emulator:
+        dev = ZK("127.0.0.1", port=emulator.port, force_udp=True, ommit_ping=True, timeout=5).connect()
+        checkpoint = worker.catch_up(dev, empty_checkpoint("SN1"))
+        dev.disconnect()
+    assert checkpoint["records"] == 3 and saved == [checkpoint]
+    assert [row[1] for row in worker.outbox.rows] == [p[0] for p in state.punches]
+    assert dump_bytes("gate") - bytes_before == dev.bytes_read > 0
+
+
+def start_live(monkeypatch, emulator, pipeline, conn, checkpoint=None):
+    """A live worker for ``emulator``, returned once it listens for events."""
+    monkeypatch.setattr(ZK_helper, "test_ping", lambda self: True)
+    monkeypatch.setattr(devices, "ZK_USER_CACHE_DIR", None)
+    monkeypatch.setattr(final, "LIVE_TIMEOUT", 1)
+    monkeypatch.setattr(final, "load_checkpoint", lambda serial: checkpoint or empty_checkpoint(serial))
+    device = {"name": "gate", "ip": "127.0.0.1", "port": emulator.port, "password": 0, "force_udp": True}
+    worker = DeviceWorker(pipeline, device, lambda: conn, mode="live").start()
+    deadline = time.monotonic() + 5
+    while not emulator.state.listeners and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return worker
+
+
+def test_live_catch_up_after_connect_reads_only_the_tail(monkeypatch, fake_conn):
+    saved = []
+    monkeypatch.setattr(final, "save_checkpoint", saved.append)
+    state = DeviceState(users=10, records=20000)
+    with ZKEmulator(state) as emulator:
+        dev = ZK("127.0.0.1", port=emulator.port, force_udp=True, ommit_ping=True, timeout=5).connect()
+        logs = dev.get_attendance()
+        dev.disconnect()
+        state.burst(5)
+        bytes_before = dump_bytes("gate")
+        worker = start_live(monkeypatch, emulator, FakePipeline(), fake_conn(), advance(empty_checkpoint(state.serial), logs, len(logs)))
+        worker.stop()
+        worker.join(5)
+    assert saved[0]["records"] == 20005
+    assert dump_bytes("gate") - bytes_before < 100 * 16  # the 6-record tail, plus the user table
+
+
+def test_a_lone_live_punch_is_written_within_the_flush_interval(monkeypatch, fake_conn):
+    monkeypatch.setattr(final, "save_checkpoint", lambda checkpoint: None)
+    state, conn, pipeline = DeviceState(users=5), fake_conn(), FakePipeline()
+    with ZKEmulator(state) as emulator:
+        worker = start_live(monkeypatch, emulator, pipeline, conn)
+        user_id, when, _, _ = state.add_punch()
+        punched = time.monotonic()
+        assert pipeline.drainer.woken.wait(5)
+        elapsed = time.monotonic() - punched
+        worker.stop()
+        worker.join(5)
+    assert elapsed < outbox.OUTBOX_FLUSH_INTERVAL
+    (rows,) = conn.queries(INSERT_OUTBOX)
+    assert [row[1:3] for row in rows] == [(user_id, when.strftime("%Y-%m-%d %H:%M:%S"))]
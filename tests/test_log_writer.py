@@ -0,0 +1,46 @@
+import pytest
+
+from log_writer import AttendanceLogWriter
+
+
+def test_burst_is_written_with_one_commit(fake_conn):
+    conn = fake_conn()
+    writer = AttendanceLogWriter(conn, batch_size=1000, max_delay=60)
+    for i in range(300):
+        writer.add("SN1", str(i), "2025-07-01 08:00:00", f"E{i}", "Check-in")
+    assert conn.commits == 0
+    assert writer.flush() == 300
+    assert conn.commits == 1
+    _, rows = conn.executed[0]
+    assert len(rows) == 300
+
+
+def test_flushes_when_batch_is_full(fake_conn):
+    conn = fake_conn()
+    writer = AttendanceLogWriter(conn, batch_size=2, max_delay=60)
+    writer.add("SN1", "1", "2025-07-01 08:00:00", "E1", "Check-in")
+    writer.add("SN1", "2", "2025-07-01 08:00:00", "E2", "Check-in")
+    assert conn.commits == 0
+    writer.flush_if_due()
+    assert conn.commits == 1
+    assert len(writer) == 0
+
+
+def test_flushes_after_max_delay(fake_conn):
+    conn = fake_conn()
+    writer = AttendanceLogWriter(conn, batch_size=100, max_delay=0)
+    writer.add("SN1", "1", "2025-07-01 08:00:00", "E1", "Check-in")
+    writer.flush_if_due()
+    assert conn.commits == 1
+
+
+def test_failed_flush_keeps_rows(fake_conn):
+    conn = fake_conn()
+    writer = AttendanceLogWriter(conn, batch_size=100, max_delay=60)
+    writer.add("SN1", "1", "2025-07-01 08:00:00", "E1", "Check-in")
+    conn.fail = True
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    assert conn.rollbacks == 1
+    conn.fail = False
+    assert writer.flush() == 1
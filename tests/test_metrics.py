@@ -0,0 +1,83 @@
+import importlib
+import threading
+import urllib.request
+
+import metrics
+from metrics import Callback, Counter, Histogram, render
+
+
+def isolated(monkeypatch):
+    registry = []
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    return registry
+
+
+def test_counter_sums_thread_shards(monkeypatch):
+    isolated(monkeypatch)
+    c = Counter("punches_total", "Punches.", labels=("device",))
+
+    def work():
+        for _ in range(1000):
+            c.inc(1, ("gate",))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    c.inc(5, ("dock",))
+    assert dict(((labels, v) for _, labels, v in c.collect())) == {("gate",): 4000, ("dock",): 5}
+
+
+def test_histogram_renders_cumulative_buckets(monkeypatch):
+    isolated(monkeypatch)
+    h = Histogram("latency_seconds", "Latency.", labels=("status",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        h.observe(value, (200,))
+    text = render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{status="200",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{status="200",le="1"} 3' in text
+    assert 'latency_seconds_bucket{status="200",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{status="200"} 4' in text
+    assert 'latency_seconds_sum{status="200"} 4.05' in text
+
+
+def test_callback_skips_missing_values(monkeypatch):
+    isolated(monkeypatch)
+    Callback("lag_seconds", "Lag.", lambda: {"gate": 1.5, "dock": None}, labels=("device",))
+    Callback("depth", "Depth.", lambda: None)
+    text = render()
+    assert 'lag_seconds{device="gate"} 1.5' in text
+    assert "dock" not in text
+    assert "# TYPE depth gauge" in text
+
+
+def test_failing_callback_does_not_break_scrape(monkeypatch):
+    isolated(monkeypatch)
+    Callback("broken", "Broken.", lambda: 1 / 0)
+    Counter("ok_total", "Fine.").inc()
+    assert "ok_total 1" in render()
+
+
+def test_serves_metrics_over_http(monkeypatch):
+    isolated(monkeypatch)
+    Counter("hits_total", "Hits.").inc(3)
+    server = metrics.serve(0)
+    assert server is None
+    server = metrics.ThreadingHTTPServer(("127.0.0.1", 0), metrics._Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain")
+            assert "hits_total 3" in resp.read().decode()
+    finally:
+        server.shutdown()
+
+
+def test_token_refreshes_are_registered_once(monkeypatch):
+    import final
+    importlib.import_module("sync_db")  # registers the sync job's metrics
+    monkeypatch.setattr(metrics, "REGISTRY", list(metrics.REGISTRY))
+    final.register_metrics(pipeline=None, workers=[])
+    assert [m.name for m in metrics.REGISTRY].count("zoho_token_refreshes_total") == 1
@@ -0,0 +1,18 @@
+from migrate import pending_migrations, split_statements
+
+
+def test_split_statements_skips_comments_and_joins_lines():
+    sql = "-- comment\nCREATE TABLE t (\n  id INT\n);\n\nALTER TABLE t ADD x INT;\n"
+    assert split_statements(sql) == ["CREATE TABLE t (\n  id INT\n)", "ALTER TABLE t ADD x INT"]
+
+
+def test_migrations_are_numbered_and_pending_in_order():
+    versions = [v for v, _ in pending_migrations(set())]
+    assert versions == sorted(versions)
+    assert versions[:2] == [1, 2]
+    assert [v for v, _ in pending_migrations({1})][0] == 2
+
+
+def test_every_migration_parses():
+    for _, path in pending_migrations(set()):
+        assert split_statements(path.read_text()), path.name
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import outbox
+from outbox import OutboxDrainer, OutboxWriter, INSERT_OUTBOX, MARK_FAILED, MARK_SENT, retry_delay, select_leasable
+from log_writer import INSERT_LOG
+
+
+def row(id, emp_id, ready=True, attempts=0):
+    return {
+        "id": id, "device_serial": "SN1", "biometric_id": id, "timestamp": datetime(2025, 7, 1, 8, 0, id),
+        "zoho_emp_id": emp_id, "type": "Check-in", "attempts": attempts, "ready": ready,
+    }
+
+
+class FakeDispatcher:
+    def __init__(self, accept):
+        self.accept = accept
+
+    def submit(self, punch):
+        punch["sent"] = self.accept(punch)
+
+    def wait(self, punches, timeout=None):
+        return True
+
+
+def test_writer_targets_outbox():
+    assert OutboxWriter.query == INSERT_OUTBOX
+
+
+def test_blocked_employee_keeps_order():
+    rows = [row(1, "E1", ready=False), row(2, "E2"), row(3, "E1"), row(4, "E2")]
+    assert [r["id"] for r in select_leasable(rows, 10)] == [2, 4]
+
+
+def test_lease_respects_limit():
+    rows = [row(i, f"E{i}") for i in range(1, 6)]
+    assert [r["id"] for r in select_leasable(rows, 2)] == [1, 2]
+
+
+def test_retry_delay_backs_off_and_caps():
+    assert retry_delay(1) == outbox.OUTBOX_RETRY_BASE
+    assert retry_delay(2) == outbox.OUTBOX_RETRY_BASE * 2
+    assert retry_delay(100) == outbox.OUTBOX_RETRY_MAX
+
+
+def test_drain_marks_sent_and_schedules_retries(fake_conn):
+    conn = fake_conn([row(1, "E1"), row(2, "E2", attempts=2)])
+    drainer = OutboxDrainer(lambda: conn, FakeDispatcher(lambda p: p["emp_id"] == "E1"))
+    drainer.conn = conn
+
+    assert drainer.drain_once() == 2
+    assert conn.commits == 2  # lease, then settle
+    assert conn.queries(MARK_SENT) == [[(1,)]]
+    assert conn.queries(INSERT_LOG) == [[("SN1", "1", "2025-07-01 08:00:01", "E1", "Check-in")]]
+    (failed,), = conn.queries(MARK_FAILED)
+    assert failed[2] == retry_delay(3) and failed[3] == 2
+    assert drainer.stats() == {"leased": 2, "sent": 1, "failed": 1}
+
+
+def test_drain_with_nothing_pending(fake_conn):
+    conn = fake_conn([row(1, "E1", ready=False)])
+    drainer = OutboxDrainer(lambda: conn, FakeDispatcher(lambda p: True))
+    drainer.conn = conn
+    assert drainer.drain_once() == 0
@@ -0,0 +1,68 @@
+import resolver
+from resolver import BioResolver, parse_employee_records, replay_parked
+
+
+class FakeEmployees:
+    def __init__(self, mapping=None):
+        self.mapping = mapping or {}
+
+    def get(self, bio_id):
+        return self.mapping.get(bio_id)
+
+
+def test_unknown_id_is_queued_once():
+    r = BioResolver(FakeEmployees(), connect=None)
+    assert r.lookup("7") is None
+    assert r.lookup("7") is None
+    assert r._queue.qsize() == 1
+
+
+def test_known_ids_never_hit_the_resolver():
+    r = BioResolver(FakeEmployees({"1": "E1"}), connect=None)
+    assert r.lookup("1") == "E1"
+    assert r._queue.empty()
+
+
+def test_failed_resolution_is_negatively_cached(monkeypatch, fake_conn):
+    monkeypatch.setattr(resolver, "lookup_zoho", lambda bio_id: None)
+    r = BioResolver(FakeEmployees(), connect=None, negative_ttl=60)
+    r.lookup("7")
+    assert r.handle(fake_conn(), "7") is None
+    assert r.lookup("7") is None
+    assert r._queue.qsize() == 1  # only the first lookup was queued
+    assert r.stats()["negative_hits"] == 1
+
+
+def test_db_hit_is_cached_and_parked_punches_replayed(monkeypatch, fake_conn):
+    replays = []
+    monkeypatch.setattr(resolver, "replay_parked", lambda conn, b, e: replays.append((b, e)) or 3)
+    woken = []
+    r = BioResolver(FakeEmployees(), connect=None, on_replayed=lambda: woken.append(1))
+    assert r.handle(fake_conn([("E7",)]), "7") == "E7"
+    assert replays == [("7", "E7")] and woken == [1]
+    assert r.lookup("7") == "E7"
+    assert r.stats()["db_resolved"] == 1 and r.stats()["replayed"] == 3
+
+
+def test_positive_cache_is_bounded():
+    r = BioResolver(FakeEmployees(), connect=None, cache_size=2)
+    for i in range(3):
+        r.remember(str(i), f"E{i}")
+    assert list(r._cache) == ["1", "2"]
+
+
+def test_replay_moves_rows_in_one_transaction(fake_conn):
+    conn = fake_conn([(11, "SN1", "2025-07-01 08:00:00", "Check-in"), (12, "SN2", "2025-07-01 17:00:00", "Check-out")])
+    assert replay_parked(conn, "7", "E7") == 2
+    _, inserted = conn.executed[1]
+    _, deleted = conn.executed[2]
+    assert inserted == [("SN1", "7", "2025-07-01 08:00:00", "E7", "Check-in"),
+                        ("SN2", "7", "2025-07-01 17:00:00", "E7", "Check-out")]
+    assert deleted == [(11,), (12,)]
+    assert conn.commits == 1
+
+
+def test_parse_employee_records():
+    payload = {"response": {"status": 0, "result": [{"4000": [{"EmployeeID": "E7", "FirstName": "Ada"}]}]}}
+    assert parse_employee_records(payload) == ["E7"]
+    assert parse_employee_records({"response": {"status": 1, "errors": {}}}) == []
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pytest
+
+import sync_db
+
+
+class FakeDevice:
+    def __init__(self, names):
+        self.users = [SimpleNamespace(name=name, user_id=str(i)) for i, name in enumerate(names, 1)]
+        self.calls = []
+
+    def disable_device(self):
+        self.calls.append("disable")
+
+    def get_users(self):
+        return self.users
+
+    def enable_device(self):
+        self.calls.append("enable")
+
+    def disconnect(self):
+        self.calls.append("disconnect")
+
+
+def test_device_users_are_matched_by_name(monkeypatch, fake_conn):
+    dev = FakeDevice(["Ada Lovelace", "Grace-Hopper"])
+    monkeypatch.setattr(sync_db, "connect", lambda device: (dev, "SN1"))
+    conn = fake_conn([(1,)])
+    sync_db.sync_device_users(conn, {"name": "gate"})
+    updates = [params for query, params in conn.executed if query.startswith("UPDATE")]
+    assert updates == [("1", "adalovelace"), ("2", "gracehopper")]
+    assert conn.commits == 1
+    assert dev.calls == ["disable", "enable", "disconnect"]
+
+
+def test_failed_sync_re_enables_the_device(monkeypatch, fake_conn):
+    dev = FakeDevice(["Ada Lovelace"])
+    monkeypatch.setattr(sync_db, "connect", lambda device: (dev, "SN1"))
+    conn = fake_conn()
+    conn.fail = True
+    with pytest.raises(RuntimeError):
+        sync_db.sync_device_users(conn, {"name": "gate"})
+    assert dev.calls == ["disable", "enable", "disconnect"]
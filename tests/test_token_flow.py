@@ -1,17 +1,22 @@
 # test_token_flow.py
+#
+# Runs the token flow against the local Zoho stand-in. Run this file directly
+# to check the credentials in .env against the real Zoho accounts server.
+
+from zoho_emulator import ZohoEmulator
+from zoho_token import TokenManager, get_access_token
 
-from get_access_token import get_access_token
 
 def test_get_token():
-    print("🧪 Testing token flow...")
-    token = get_access_token()
-    if token:
-        print("✅ Got valid access token!")
-        print("🔑 Token:", token[:10] + "..." + token[-5:])
-        return token
-    else:
-        print("❌ Failed to get access token")
-        return None
+    with ZohoEmulator(token_ttl=3600) as zoho:
+        tm = TokenManager("zoho.com", "id", "secret", "refresh", accounts_url=zoho.url)
+        token = tm.get_token()
+        tm._timer.cancel()
+    assert token.startswith("1000.")
+    assert zoho.tokens_issued == 1
 
 if __name__ == "__main__":
-    test_get_token()
+    print("🧪 Testing token flow...")
+    token = get_access_token()
+    print("✅ Got valid access token!")
+    print("🔑 Token:", token[:10] + "..." + token[-5:])
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from zoho_token import TokenManager
+
+
+class CountingManager(TokenManager):
+    def __init__(self, expires_in=3600, delay=0.0, **kw):
+        super().__init__("zoho.com", "id", "secret", "refresh", **kw)
+        self.expires_in = expires_in
+        self.delay = delay
+        self.calls = 0
+
+    def _fetch(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"token-{self.calls}", self.expires_in
+
+    def _schedule(self, expires_in):
+        pass
+
+
+def test_cached_token_is_reused():
+    tm = CountingManager()
+    assert tm.get_token() == "token-1"
+    assert tm.get_token() == "token-1"
+    assert tm.calls == 1
+    assert tm.stats()["hits"] == 1
+    assert tm.stats()["refreshes"] == 1
+
+
+def test_expired_token_is_refreshed():
+    tm = CountingManager(expires_in=30, min_ttl=60)
+    tm.get_token()
+    tm.get_token()
+    assert tm.calls == 2
+
+
+def test_invalidate_forces_refresh():
+    tm = CountingManager()
+    tm.get_token()
+    tm.invalidate()
+    assert tm.get_token() == "token-2"
+
+
+def test_concurrent_callers_share_one_refresh():
+    tm = CountingManager(delay=0.1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tm.get_token())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert tm.calls == 1
+    assert results == ["token-1"] * 8
@@ -0,0 +1,253 @@
+import threading
+import time
+import pytest
+from zk import ZK
+from zk.exception import ZKErrorResponse, ZKNetworkError
+from zk_emulator import CMD_READ_BUFFER, DeviceState, ZKEmulator
+
+from checkpoint import advance, empty_checkpoint
+from final import fetch_new_logs
+
+
+def client(emulator, udp=True, **kw):
+    return ZK("127.0.0.1", port=emulator.port, force_udp=udp, ommit_ping=True, timeout=5, **kw).connect()
+
+
+@pytest.mark.parametrize("udp", [True, False])
+@pytest.mark.parametrize("record_size", [8, 16, 40])
+def test_reads_users_and_attendance(udp, record_size):
+    state = DeviceState(users=20, records=3000, record_size=record_size)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator, udp)
+        dev.read_sizes()
+        assert (dev.users, dev.records) == (20, 3000)
+        users = dev.get_users()
+        assert sorted(u.user_id for u in users) == [str(uid + 1000) for uid in range(1, 21)]
+        logs = dev.get_attendance()
+        dev.disconnect()
+    assert [(a.user_id, a.timestamp, a.status) for a in logs] == [p[:3] for p in state.punches]
+
+
+@pytest.mark.parametrize("udp", [True, False])
+def test_tail_read_matches_full_read(udp):
+    state = DeviceState(users=10, records=2500)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator, udp)
+        tail = dev.get_attendance_since(2000)
+        dev.disconnect()
+    assert [(a.user_id, a.timestamp) for a in tail] == [p[:2] for p in state.punches[2000:]]
+
+
+@pytest.mark.parametrize("udp", [True, False])
+@pytest.mark.parametrize("record_size", [8, 16, 40])
+def test_streamed_attendance_matches_full_read(udp, record_size):
+    state = DeviceState(users=20, records=10000, record_size=record_size)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator, udp)
+        stream = dev.iter_attendance()
+        first = next(stream)
+        read_before_first = dev.bytes_read
+        logs = [first, *stream]
+        dev.disconnect()
+    assert read_before_first < record_size * 10000
+    assert [(a.user_id, a.timestamp, a.status) for a in logs] == [p[:3] for p in state.punches]
+
+
+def test_abandoned_stream_frees_the_buffer():
+    state = DeviceState(users=5, records=3000, record_size=40)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator)
+        stream = dev.iter_attendance()
+        next(stream)
+        stream.close()
+        assert len(dev.get_attendance()) == 3000
+        assert len(list(dev.iter_attendance())) == 3000
+        dev.disconnect()
+
+
+def count_user_downloads(state):
+    downloads = []
+    user_buffer = state.user_buffer
+    state.user_buffer = lambda: downloads.append(1) or user_buffer()
+    return downloads
+
+
+def test_user_table_is_downloaded_again_only_when_counters_change():
+    state = DeviceState(users=20, records=100)
+    downloads = count_user_downloads(state)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator)
+        dev.get_attendance()
+        assert len(dev.get_attendance_since(50)) == 50
+        assert len(downloads) == 1
+        state.users.append((21, "1021"))
+        dev.get_attendance()
+        dev.disconnect()
+    assert len(downloads) == 2
+
+
+def test_user_cache_survives_a_new_instance(tmp_path):
+    state = DeviceState(users=20, records=100)
+    downloads = count_user_downloads(state)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator, user_cache=tmp_path)
+        expected = [(a.user_id, a.uid) for a in dev.get_attendance()]
+        dev.disconnect()
+        dev = client(emulator, user_cache=tmp_path)
+        logs = dev.get_attendance()
+        dev.disconnect()
+    assert len(downloads) == 1
+    assert [(a.user_id, a.uid) for a in logs] == expected
+    assert (dev.next_uid, dev.next_user_id) == (21, "21")
+    assert (tmp_path / "users_EMU0000001.json").exists()
+
+
+@pytest.mark.parametrize("change", ["set_user", "delete_user"])
+def test_user_changes_drop_the_cache(tmp_path, change):
+    state = DeviceState(users=5, records=10)
+    downloads = count_user_downloads(state)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator, user_cache=tmp_path)
+        dev.get_attendance()
+        if change == "set_user":
+            dev.set_user(uid=1, name="Renamed", user_id="1001")
+        else:
+            dev.delete_user(uid=5)
+        assert not (tmp_path / "users_EMU0000001.json").exists()
+        dev.get_attendance()
+        dev.disconnect()
+    assert len(downloads) == 2
+
+
+@pytest.mark.parametrize("change", ["set_user", "delete_user"])
+def test_user_changes_on_a_fresh_connection_drop_the_cache(tmp_path, change):
+    state = DeviceState(users=5, records=10)
+    downloads = count_user_downloads(state)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator, user_cache=tmp_path)
+        dev.get_attendance()
+        dev.disconnect()
+        dev = client(emulator, user_cache=tmp_path)  # serial not known yet
+        if change == "set_user":
+            dev.set_user(uid=1, name="Renamed", user_id="1001")
+        else:
+            dev.delete_user(uid=5)
+        assert not (tmp_path / "users_EMU0000001.json").exists()
+        dev.get_attendance()
+        dev.disconnect()
+    assert len(downloads) == 2
+
+
+def read_attendance(emulator, **kw):
+    dev = client(emulator, **kw)
+    started = time.perf_counter()
+    logs = [(a.user_id, a.timestamp) for a in dev.get_attendance()]
+    elapsed = time.perf_counter() - started
+    dev.disconnect()
+    return dev, logs, elapsed
+
+
+def test_windowed_reads_keep_requests_in_flight():
+    state = DeviceState(users=20, records=12000, record_size=16)
+    with ZKEmulator(state, rtt=0.03) as emulator:
+        _, serial, serial_time = read_attendance(emulator)
+        assert emulator.peak_in_flight == 1
+        _, windowed, windowed_time = read_attendance(emulator, read_window=8)
+    assert windowed == serial == [p[:2] for p in state.punches]
+    assert emulator.peak_in_flight > 1
+    assert windowed_time < serial_time
+
+
+def test_windowed_reads_resend_lost_chunks():
+    state = DeviceState(users=20, records=12000, record_size=40)
+    with ZKEmulator(state) as emulator:
+        handle, reads = emulator.handle, []
+
+        def lossy(session, command, payload, reply_id, tcp):
+            responses = handle(session, command, payload, reply_id, tcp)
+            if command == CMD_READ_BUFFER:
+                reads.append(payload)
+                if len(reads) in (4, 9):
+                    return responses[:1] + responses[2:]  # one data packet lost
+                if len(reads) == 15:
+                    return []  # whole answer lost
+            return responses
+
+        emulator.handle = lossy
+        dev, logs, _ = read_attendance(emulator, read_window=4)
+    assert logs == [p[:2] for p in state.punches]
+    assert dev._ZK__pipelining is True
+    assert len(reads) > len(set(reads))
+
+
+def test_firmware_without_pipelining_falls_back_to_stop_and_wait():
+    state = DeviceState(users=20, records=6000, record_size=16)
+    with ZKEmulator(state, rtt=0.01, pipelining=False) as emulator:
+        dev, logs, _ = read_attendance(emulator, read_window=8)
+        ignored = emulator.ignored
+        dev.connect()
+        dev.get_attendance()
+        dev.disconnect()
+    assert logs == [p[:2] for p in state.punches]
+    assert ignored > 0 and dev._ZK__pipelining is False
+
+
+def test_inline_buffers_are_decoded():
+    state = DeviceState(users=5, records=40)
+    with ZKEmulator(state, inline_limit=4096) as emulator:
+        dev = client(emulator)
+        assert len(dev.get_attendance()) == 40
+        assert len(dev.get_attendance_since(30)) == 10
+        assert len(list(dev.iter_attendance())) == 40
+        dev.disconnect()
+
+
+def test_password_is_required():
+    with ZKEmulator(DeviceState(users=1), password=1234) as emulator:
+        with pytest.raises(ZKErrorResponse):
+            client(emulator, password=4321)
+        dev = client(emulator, password=1234)
+        assert dev.get_serialnumber() == "EMU0000001"
+        dev.disconnect()
+
+
+@pytest.mark.parametrize("udp", [True, False])
+def test_live_capture_receives_new_punches(udp):
+    state = DeviceState(users=5, record_size=40 if not udp else 16)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator, udp)
+        threading.Timer(0.3, state.burst, args=(3,)).start()
+        seen = []
+        for event in dev.live_capture(new_timeout=2):
+            if event is None:
+                break
+            seen.append(event.user_id)
+            if len(seen) == 3:
+                dev.end_live_capture = True
+        dev.disconnect()
+    assert seen == ["1001", "1002", "1003"]
+
+
+def test_fetch_new_logs_reads_only_the_tail():
+    state = DeviceState(users=10, records=500)
+    with ZKEmulator(state) as emulator:
+        dev = client(emulator)
+        logs, base, start = fetch_new_logs(dev, empty_checkpoint("EMU0000001"))
+        assert (len(logs), base, start) == (500, 0, 0)
+        cp = advance(empty_checkpoint("EMU0000001"), logs, len(logs))
+
+        state.burst(25)
+        dev.read_sizes()
+        before = dev.bytes_read
+        logs, base, start = fetch_new_logs(dev, cp)
+        tail_bytes = dev.bytes_read - before
+        dev.disconnect()
+    assert (base, start, len(logs[start:])) == (499, 1, 25)
+    assert state.punches[-1][:2] == (logs[-1].user_id, logs[-1].timestamp)
+    assert tail_bytes < 100 * 16  # the 26-record tail, plus the user table
+
+
+def test_lost_udp_responses_time_out():
+    with ZKEmulator(DeviceState(users=1), loss=1.0) as emulator:
+        with pytest.raises(ZKNetworkError):
+            ZK("127.0.0.1", port=emulator.port, force_udp=True, ommit_ping=True, timeout=1).connect()
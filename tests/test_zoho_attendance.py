@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+import zoho_attendance
+from zoho_attendance import deliver_batch, new_punch, parse_bulk_response
+
+
+def punches(n):
+    return [new_punch("SN1", str(i), f"E{i}", datetime(2025, 7, 1, 8, 0, i), "Check-in") for i in range(n)]
+
+
+def test_parse_bulk_response_maps_rows():
+    payload = {"response": {"status": 0, "result": [{"empId": "E1"}, {"empId": "E2", "error": "bad"}]}}
+    assert parse_bulk_response(payload, 2) == [True, False]
+
+
+def test_parse_bulk_response_without_rows_means_all_ok():
+    assert parse_bulk_response({"response": {"status": 0, "message": "Success"}}, 3) == [True] * 3
+
+
+def test_parse_bulk_response_with_partial_rows_is_unusable():
+    payload = {"response": {"status": 0, "result": [{"empId": "E2", "error": "bad"}]}}
+    assert parse_bulk_response(payload, 3) is None
+
+
+def test_parse_bulk_response_rejected_batch():
+    assert parse_bulk_response({"response": {"status": 1, "message": "Invalid data"}}, 3) is None
+
+
+def test_deliver_batch_uses_bulk_import(monkeypatch):
+    calls = []
+    monkeypatch.setattr(zoho_attendance, "send_bulk_attendance", lambda batch: calls.append(len(batch)) or [True] * len(batch))
+    results, fell_back = deliver_batch(punches(5))
+    assert calls == [5]
+    assert results == [True] * 5
+    assert not fell_back
+
+
+def test_failed_batch_falls_back_to_single_posts(monkeypatch):
+    monkeypatch.setattr(zoho_attendance, "send_bulk_attendance", lambda batch: None)
+    singles = []
+    monkeypatch.setattr(zoho_attendance, "send_attendance_to_zoho",
+                        lambda emp_id, ts, atype: singles.append(emp_id) or emp_id != "E1")
+    results, fell_back = deliver_batch(punches(3))
+    assert singles == ["E0", "E1", "E2"]
+    assert results == [True, False, True]
+    assert fell_back
+
+
+def test_single_punch_skips_bulk(monkeypatch):
+    monkeypatch.setattr(zoho_attendance, "send_bulk_attendance", lambda batch: pytest.fail("bulk used"))
+    monkeypatch.setattr(zoho_attendance, "send_attendance_to_zoho", lambda emp_id, ts, atype: True)
+    assert deliver_batch(punches(1)) == ([True], False)
+
+
+def day_of(emp_id, count):
+    return [new_punch("SN1", emp_id, emp_id, datetime(2025, 7, 1, 8 + i, 0), ("Check-in", "Check-out")[i % 2])
+            for i in range(count)]
+
+
+def test_single_posts_stop_at_an_employees_first_failure(monkeypatch):
+    monkeypatch.setattr(zoho_attendance, "send_bulk_attendance", lambda batch: None)
+    posted = []
+    monkeypatch.setattr(zoho_attendance, "send_attendance_to_zoho",
+                        lambda emp_id, ts, atype: posted.append((emp_id, atype)) or len(posted) != 1)
+    batch = [day_of("A", 2)[0], day_of("B", 1)[0], day_of("A", 2)[1]]
+    results, _ = deliver_batch(batch)
+    assert results == [False, True, False]
+    assert posted == [("A", "Check-in"), ("B", "Check-in")]  # A's check-out is held back
+
+
+def test_bulk_results_hold_back_later_punches_of_a_failed_employee(monkeypatch):
+    monkeypatch.setattr(zoho_attendance, "send_bulk_attendance", lambda batch: [False, True, True, True])
+    batch = day_of("A", 3) + day_of("B", 1)
+    assert deliver_batch(batch) == ([False, False, False, True], False)
@@ -0,0 +1,58 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import zoho_client
+
+
+class Handler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def do_GET(self):
+        n = Handler.hits[self.path] = Handler.hits.get(self.path, 0) + 1
+        # /flaky fails once, then succeeds
+        status = 503 if self.path == "/flaky" and n == 1 else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(zoho_client, "HTTP_BACKOFF", 0)
+    monkeypatch.setattr(zoho_client, "_session", None)
+    monkeypatch.setattr(zoho_client, "endpoint_stats", zoho_client.EndpointStats())
+    Handler.hits = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_records_latency_and_status_per_endpoint(server):
+    for _ in range(3):
+        assert zoho_client.get(server + "/people/api/x?page=1").status_code == 200
+    stats = zoho_client.stats()["/people/api/x"]
+    assert stats["count"] == 3
+    assert stats["statuses"] == {200: 3}
+
+
+def test_idempotent_requests_are_retried(server):
+    assert zoho_client.get(server + "/flaky").status_code == 200
+    assert Handler.hits["/flaky"] == 2
+
+
+def test_posts_are_not_retried(server):
+    assert zoho_client.post(server + "/flaky").status_code == 503
+    assert Handler.hits["/flaky"] == 1
+
+
+def test_session_is_shared(server):
+    assert zoho_client.get_session() is zoho_client.get_session()
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import pytest
+import requests
+
+import resolver
+import sync_db
+import zoho_attendance
+from zoho_attendance import deliver_batch, new_punch, send_bulk_attendance
+from zoho_emulator import BULK_PATH, EMPLOYEES_PATH, ZohoEmulator
+from zoho_token import TokenManager
+
+
+@pytest.fixture
+def zoho(monkeypatch):
+    with ZohoEmulator(employees=450) as emulator:
+        tm = TokenManager("zoho.com", "id", "secret", "refresh", accounts_url=emulator.url)
+        for module in (zoho_attendance, sync_db, resolver):
+            monkeypatch.setattr(module, "PEOPLE_URL", emulator.url)
+            monkeypatch.setattr(module, "get_access_token", tm.get_token)
+        emulator.tokens = tm
+        yield emulator
+        if tm._timer:
+            tm._timer.cancel()
+
+
+def punches(*emp_ids):
+    return [new_punch("SN1", str(i), emp_id, datetime(2025, 7, 1, 8, 0, i), "Check-in")
+            for i, emp_id in enumerate(emp_ids)]
+
+
+def test_token_is_issued_and_reused(zoho):
+    assert zoho.tokens.get_token() == zoho.tokens.get_token()
+    assert zoho.tokens_issued == 1
+
+
+def test_wrong_refresh_token_is_rejected(zoho):
+    tm = TokenManager("zoho.com", "id", "secret", "wrong", accounts_url=zoho.url)
+    with pytest.raises(RuntimeError):
+        tm.get_token()
+
+
+def test_employee_sync_reads_every_page(zoho):
+    employees = sync_db.fetch_zoho_employees()
+    assert len(employees) == 450
+    assert zoho.requests[EMPLOYEES_PATH] == 3
+    assert employees[49] == ("EMP00050", "Employee 50", 0)
+
+
+def test_bulk_import_reports_unknown_employees(zoho):
+    assert send_bulk_attendance(punches("EMP00001", "NOPE", "EMP00002")) == [True, False, True]
+    assert [a[0] for a in zoho.attendance] == ["EMP00001", "EMP00002"]
+
+
+def test_rejected_batch_falls_back_to_single_posts(zoho):
+    zoho.fail_next(BULK_PATH, status=503)
+    results, fell_back = deliver_batch(punches("EMP00001", "EMP00002"))
+    assert fell_back and results == [True, True]
+    assert len(zoho.attendance) == 2
+
+
+def test_expired_token_is_refreshed_after_401(zoho, monkeypatch):
+    monkeypatch.setattr(zoho_attendance, "get_token_manager", lambda: zoho.tokens)
+    assert zoho_attendance.send_attendance_to_zoho("EMP00001", "2025-07-01 08:00:00", "Check-in")
+    zoho.expire_tokens()
+    assert not zoho_attendance.send_attendance_to_zoho("EMP00001", "2025-07-01 17:00:00", "Check-out")
+    assert zoho_attendance.send_attendance_to_zoho("EMP00001", "2025-07-01 17:00:00", "Check-out")
+    assert zoho.tokens_issued == 2
+
+
+def test_biometric_lookup(zoho, monkeypatch):
+    monkeypatch.setattr(resolver, "ZOHO_BIOMETRIC_FIELD", "Biometric_ID")
+    assert resolver.lookup_zoho("1007") == "EMP00007"
+    assert resolver.lookup_zoho("999999") is None
+
+
+def test_rate_limit_throttles_per_endpoint():
+    with ZohoEmulator(rate_limit=2, window=60) as zoho:
+        token = requests.post(zoho.url + "/oauth/v2/token",
+                              data={"grant_type": "refresh_token", "refresh_token": "refresh"}).json()["access_token"]
+        headers = {"Authorization": f"Zoho-oauthtoken {token}"}
+        url = zoho.url + "/people/api/attendance"
+        statuses = [requests.post(url, headers=headers, data={"employeeId": "EMP00001", "checkIn": "x"}).status_code
+                    for _ in range(3)]
+        throttled = requests.post(url, headers=headers, data={"employeeId": "EMP00001", "checkIn": "x"})
+    assert statuses == [200, 200, 429]
+    assert int(throttled.headers["Retry-After"]) > 0
+    assert throttled.json()["response"]["status"] == 1
+    assert zoho.throttled == 2
+
+
+def test_dropped_connections_surface_as_errors():
+    with ZohoEmulator() as zoho:
+        zoho.fail_next("/oauth/v2/token", status=None)
+        with pytest.raises(requests.ConnectionError):
+            requests.post(zoho.url + "/oauth/v2/token", data={"grant_type": "refresh_token", "refresh_token": "refresh"})
@@ -0,0 +1,540 @@
+"""
+A ZKTeco terminal emulator speaking the UDP and TCP protocol of ``zk.base.ZK``.
+
+Supported: CMD_CONNECT/CMD_AUTH, CMD_EXIT, enable/disable, options and
+version reads, CMD_GET_FREE_SIZES (read_sizes), 1503/1504 buffered reads of
+CMD_USERTEMP_RRQ (28/72-byte users) and CMD_ATTLOG_RRQ (8/16/40-byte
+records), CMD_FREE_DATA, CMD_CLEAR_ATTLOG and CMD_REG_EVENT live events.
+Latency, network round trip, UDP packet loss, firmware without pipelined
+buffer reads, a punch generation rate and bursts are configurable.
+
+    python tests/zk_emulator.py --records 100000 --port 4370
+    python tests/zk_emulator.py --records 20000 --rate 2 --burst 3000 --burst-after 60
+"""
+import argparse
+import heapq
+import itertools
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))  # the vendored zk package
+
+from zk import const
+from zk.base import make_commkey
+
+CMD_PREPARE_BUFFER = 1503
+CMD_READ_BUFFER    = 1504
+
+TCP_TOP = struct.Struct("<HHI")
+HEADER  = struct.Struct("<4H")
+SIZES   = struct.Struct("<20i3i")
+
+USER_FORMATS = {
+    28: struct.Struct("<HB5s8sIxBhI"),
+    72: struct.Struct("<HB8s24sIx7sx24s"),
+}
+RECORD_FORMATS = {
+    8:  struct.Struct("<HB4sB"),
+    16: struct.Struct("<I4sBB2sI"),
+    40: struct.Struct("<H24sB4sB8s"),
+}
+EVENT_12 = struct.Struct("<IBB6s")
+EVENT_32 = struct.Struct("<24sBB6s")
+
+UDP_DATA_SIZE = 1024
+USER_ID_OFFSET = 1000  # user_id != uid, so mix-ups show up in tests
+
+
+def checksum(buf):
+    """Packet checksum as computed by zkemsdk (and zk.base)."""
+    total = 0
+    for (word,) in struct.iter_unpack("<H", buf[:len(buf) & ~1]):
+        total += word
+        if total > const.USHRT_MAX:
+            total -= const.USHRT_MAX
+    if len(buf) % 2:
+        total += buf[-1]
+    while total > const.USHRT_MAX:
+        total -= const.USHRT_MAX
+    total = ~total
+    while total < 0:
+        total += const.USHRT_MAX
+    return total
+
+def packet(code, session_id, reply_id, data=b""):
+    head = HEADER.pack(code, 0, session_id, reply_id)
+    return HEADER.pack(code, checksum(head + data), session_id, reply_id) + data
+
+def encode_time(t):
+    return (((t.year % 100) * 12 * 31 + (t.month - 1) * 31 + t.day - 1) * 86400
+            + (t.hour * 60 + t.minute) * 60 + t.second)
+
+def encode_timehex(t):
+    return bytes((t.year - 2000, t.month, t.day, t.hour, t.minute, t.second))
+
+
+class DeviceState:
+    """Users and the attendance log of one emulated terminal."""
+
+    def __init__(self, users=100, records=0, record_size=16, user_packet_size=None, rec_cap=None,
+                 serial="EMU0000001", days=30, seed=0):
+        if record_size not in RECORD_FORMATS:
+            raise ValueError(f"record_size must be one of {sorted(RECORD_FORMATS)}")
+        self.record_size = record_size
+        self.record_format = RECORD_FORMATS[record_size]
+        self.user_packet_size = user_packet_size or (72 if record_size == 40 else 28)
+        self.serial = serial
+        self.rec_cap = rec_cap or max(100000, 2 * records)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.users = [(uid, str(uid + USER_ID_OFFSET)) for uid in range(1, users + 1)]
+        self.punches = []  # (user_id, timestamp, status, punch)
+        self.log = bytearray()
+        self.listeners = []
+        self._next_status = {}
+        self._next_user = 0
+
+        start = datetime.now().replace(microsecond=0) - timedelta(days=days)
+        step = timedelta(days=days) / max(records, 1)
+        for i in range(records):
+            self.add_punch(when=(start + step * i).replace(microsecond=0))
+
+    def _encode(self, uid, user_id, ts, status, punch):
+        t = struct.pack("<I", encode_time(ts))
+        if self.record_size == 8:
+            return self.record_format.pack(uid, status, t, punch)
+        if self.record_size == 16:
+            return self.record_format.pack(int(user_id), t, status, punch, b"\x00\x00", 0)
+        return self.record_format.pack(uid, user_id.encode(), status, t, punch, b"\x00" * 8)
+
+    def add_punch(self, user=None, when=None, status=None, punch=1):
+        """Record one punch (the next user by default) and push it to live listeners."""
+        with self.lock:
+            if user is None:
+                user = self.rng.randrange(len(self.users))
+            uid, user_id = self.users[user]
+            when = when or datetime.now().replace(microsecond=0)
+            if status is None:
+                status = self._next_status.get(uid, 0)
+                self._next_status[uid] = 1 - status
+            if len(self.punches) >= self.rec_cap:
+                del self.punches[0]
+                del self.log[:self.record_size]
+            self.punches.append((user_id, when, status, punch))
+            self.log += self._encode(uid, user_id, when, status, punch)
+            event = self.event(uid, user_id, when, status, punch)
+            for listener in list(self.listeners):
+                listener(event)
+            return user_id, when, status, punch
+
+    def burst(self, count, when=None):
+        """
+        ``count`` punches at once, like a shift change: every user in turn,
+        one second apart per round, so no user punches twice in a second.
+        """
+        when = when or datetime.now().replace(microsecond=0)
+        for i in range(count):
+            self.add_punch(user=i % len(self.users), when=when + timedelta(seconds=i // len(self.users)))
+
+    def clear(self):
+        with self.lock:
+            self.punches = []
+            self.log = bytearray()
+
+    def event(self, uid, user_id, ts, status, punch):
+        if self.record_size == 40:
+            return EVENT_32.pack(user_id.encode(), status, punch, encode_timehex(ts))
+        return EVENT_12.pack(int(user_id), status, punch, encode_timehex(ts))
+
+    def sizes(self):
+        fields = [0] * 23
+        fields[4] = len(self.users)
+        fields[8] = len(self.punches)
+        fields[14] = 3000
+        fields[15] = 10000
+        fields[16] = self.rec_cap
+        fields[17] = fields[14]
+        fields[18] = fields[15] - len(self.users)
+        fields[19] = self.rec_cap - len(self.punches)
+        return SIZES.pack(*fields)
+
+    def user_buffer(self):
+        fmt = USER_FORMATS[self.user_packet_size]
+        if self.user_packet_size == 28:
+            rows = [fmt.pack(uid, 0, b"", f"U{uid}".encode(), 0, 1, 0, int(user_id)) for uid, user_id in self.users]
+        else:
+            rows = [fmt.pack(uid, 0, b"", f"User {uid}".encode(), 0, b"1", user_id.encode()) for uid, user_id in self.users]
+        data = b"".join(rows)
+        return struct.pack("<I", len(data)) + data
+
+    def attendance_buffer(self):
+        with self.lock:
+            data = bytes(self.log)
+        return struct.pack("<I", len(data)) + data
+
+
+class Session:
+    def __init__(self, session_id, send):
+        self.session_id = session_id
+        self.send = send
+        self.authenticated = False
+        self.buffer = None
+        self.live = False
+        self.events = []
+        self.awaiting_ack = False
+        self.in_flight = 0  # responses still travelling back (rtt)
+        self.lock = threading.Lock()
+
+    def push_event(self, event):
+        with self.lock:
+            self.events.append(event)
+
+
+class ZKEmulator:
+    """
+    Serves one DeviceState over UDP and TCP on the same port.
+
+    ``latency`` delays every response, holding up the requests behind it;
+    ``rtt`` delivers responses that much later without blocking, like a
+    slow WAN link. ``loss`` drops that fraction of UDP responses (the
+    client then times out). ``pipelining=False`` ignores a 1504 arriving
+    while the previous answer is still on its way, as older firmware does.
+    ``inline_limit`` makes 1503 answer buffers up to that many bytes inline
+    with CMD_DATA, as some firmwares do. ``punch_rate`` generates punches
+    per second.
+    """
+
+    def __init__(self, state=None, host="127.0.0.1", port=0, password=0, latency=0.0, loss=0.0,
+                 inline_limit=0, punch_rate=0.0, rtt=0.0, pipelining=True, **state_kw):
+        self.state = state or DeviceState(**state_kw)
+        self.host = host
+        self.port = port
+        self.password = password
+        self.latency = latency
+        self.loss = loss
+        self.inline_limit = inline_limit
+        self.punch_rate = punch_rate
+        self.rtt = rtt
+        self.pipelining = pipelining
+        self.rng = random.Random()
+        self._next_session = 1
+        self._udp_sessions = {}
+        self._stop = threading.Event()
+        self._threads = []
+        self._deliveries = []  # (due, seq, session, packets)
+        self._delivery = threading.Condition()
+        self._seq = itertools.count()
+        self.commands = {}
+        self.ignored = 0
+        self.peak_in_flight = 0  # most responses on their way to one session at once
+
+    # ─── Lifecycle ───
+    def start(self):
+        self._tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._tcp.bind((self.host, self.port))
+        self.port = self._tcp.getsockname()[1]
+        self._tcp.listen(16)
+        self._tcp.settimeout(0.2)
+        self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._udp.bind((self.host, self.port))
+        self._udp.settimeout(0.2)
+        for target in (self._serve_udp, self._serve_tcp, self._pump_events, self._generate, self._deliver):
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+        self._tcp.close()
+        self._udp.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def address(self):
+        return self.host, self.port
+
+    # ─── Protocol ───
+    def _new_session(self, send):
+        session = Session(self._next_session, send)
+        self._next_session = (self._next_session + 1) % 0xFFFF or 1
+        return session
+
+    def handle(self, session, command, payload, reply_id, tcp):
+        """Return the response packets (code, data) for one request."""
+        self.commands[command] = self.commands.get(command, 0) + 1
+        state = self.state
+        if command == const.CMD_ACK_OK:
+            session.awaiting_ack = False  # client acknowledged a live event
+            return []
+        if command == const.CMD_CONNECT:
+            session.authenticated = not self.password
+            return [(const.CMD_ACK_OK if session.authenticated else const.CMD_ACK_UNAUTH, b"")]
+        if command == const.CMD_AUTH:
+            session.authenticated = payload == make_commkey(self.password, session.session_id)
+            return [(const.CMD_ACK_OK if session.authenticated else const.CMD_ACK_UNAUTH, b"")]
+        if not session.authenticated:
+            return [(const.CMD_ACK_UNAUTH, b"")]
+        if command == const.CMD_GET_FREE_SIZES:
+            return [(const.CMD_ACK_OK, state.sizes())]
+        if command == const.CMD_OPTIONS_RRQ:
+            key = payload.split(b"\x00")[0]
+            value = {b"~SerialNumber": state.serial, b"~Platform": "ZEM560_TFT",
+                     b"~DeviceName": "Emulator", b"~ZKFPVersion": "10"}.get(key, "")
+            return [(const.CMD_ACK_OK, key + b"=" + value.encode() + b"\x00")]
+        if command == const.CMD_GET_VERSION:
+            return [(const.CMD_ACK_OK, b"Ver 6.60 Emulator\x00")]
+        if command == const.CMD_GET_TIME:
+            return [(const.CMD_ACK_OK, struct.pack("<I", encode_time(datetime.now())))]
+        if command == CMD_PREPARE_BUFFER:
+            _, inner, fct, _ = struct.unpack("<bhii", payload[:11])
+            if inner == const.CMD_ATTLOG_RRQ:
+                session.buffer = state.attendance_buffer()
+            elif inner == const.CMD_USERTEMP_RRQ and fct == const.FCT_USER:
+                session.buffer = state.user_buffer()
+            else:
+                return [(const.CMD_ACK_ERROR, b"")]
+            size = len(session.buffer)
+            if size <= self.inline_limit and (tcp or size <= UDP_DATA_SIZE - 8):
+                return [(const.CMD_DATA, session.buffer)]
+            return [(const.CMD_ACK_OK, b"\x00" + struct.pack("<I", size))]
+        if command == CMD_READ_BUFFER:
+            if not self.pipelining and session.in_flight:
+                self.ignored += 1
+                return []
+            start, size = struct.unpack("<ii", payload[:8])
+            if session.buffer is None or start < 0 or start + size > len(session.buffer):
+                return [(const.CMD_ACK_ERROR, b"")]
+            chunk = session.buffer[start:start + size]
+            if tcp:
+                return [(const.CMD_PREPARE_DATA, struct.pack("<II", size, 0)),
+                        (const.CMD_DATA, chunk), (const.CMD_ACK_OK, b"")]
+            return ([(const.CMD_PREPARE_DATA, struct.pack("<I", size))]
+                    + [(const.CMD_DATA, chunk[i:i + UDP_DATA_SIZE]) for i in range(0, size, UDP_DATA_SIZE)]
+                    + [(const.CMD_ACK_OK, b"")])
+        if command == const.CMD_FREE_DATA:
+            session.buffer = None
+        elif command == const.CMD_CLEAR_ATTLOG:
+            state.clear()
+        elif command == const.CMD_REG_EVENT:
+            flags = struct.unpack("<I", payload[:4])[0] if len(payload) >= 4 else 0
+            self._set_live(session, bool(flags & const.EF_ATTLOG))
+        elif command == const.CMD_EXIT:
+            self._set_live(session, False)
+        return [(const.CMD_ACK_OK, b"")]
+
+    def _set_live(self, session, live):
+        with self.state.lock:
+            if live and not session.live:
+                self.state.listeners.append(session.push_event)
+            elif not live and session.live:
+                self.state.listeners.remove(session.push_event)
+        session.live = live
+        if not live:
+            with session.lock:
+                session.events = []
+                session.awaiting_ack = False
+
+    def _respond(self, session, reply_id, responses):
+        if self.latency:
+            time.sleep(self.latency)
+        packets = [packet(code, session.session_id, reply_id, data) for code, data in responses]
+        if not packets:
+            return
+        if not self.rtt:
+            session.send(packets)
+            return
+        with self._delivery:
+            session.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, session.in_flight)
+            heapq.heappush(self._deliveries, (time.monotonic() + self.rtt, next(self._seq), session, packets))
+            self._delivery.notify()
+
+    def _deliver(self):
+        """Send the responses delayed by ``rtt`` once they are due."""
+        while not self._stop.is_set():
+            with self._delivery:
+                if not self._deliveries:
+                    self._delivery.wait(0.2)
+                    continue
+                due = self._deliveries[0][0]
+                if due > time.monotonic():
+                    self._delivery.wait(due - time.monotonic())
+                    continue
+                _, _, session, packets = heapq.heappop(self._deliveries)
+                session.in_flight -= 1  # the device is done once it transmits
+            try:
+                session.send(packets)
+            except OSError:
+                pass
+
+    # ─── UDP ───
+    def _serve_udp(self):
+        while not self._stop.is_set():
+            try:
+                buf, addr = self._udp.recvfrom(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if len(buf) < 8:
+                continue
+            command, _, session_id, reply_id = HEADER.unpack(buf[:8])
+            session = self._udp_sessions.get(addr)
+            if command == const.CMD_CONNECT or session is None:
+                session = self._udp_sessions[addr] = self._new_session(self._udp_sender(addr))
+            responses = self.handle(session, command, buf[8:], reply_id, tcp=False)
+            if responses and self.loss and self.rng.random() < self.loss:
+                continue
+            self._respond(session, reply_id, responses)
+            if command == const.CMD_EXIT:
+                self._udp_sessions.pop(addr, None)
+
+    def _udp_sender(self, addr):
+        def send(packets):
+            for p in packets:
+                self._udp.sendto(p, addr)
+        return send
+
+    # ─── TCP ───
+    def _serve_tcp(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._tcp.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            t = threading.Thread(target=self._serve_tcp_client, args=(conn,), daemon=True)
+            t.start()
+
+    def _serve_tcp_client(self, conn):
+        lock = threading.Lock()
+
+        def send(packets):
+            with lock:
+                conn.sendall(b"".join(TCP_TOP.pack(const.MACHINE_PREPARE_DATA_1, const.MACHINE_PREPARE_DATA_2, len(p)) + p
+                                      for p in packets))
+
+        session = self._new_session(send)
+        conn.settimeout(0.2)
+        try:
+            while not self._stop.is_set():
+                try:
+                    top = self._recv_exactly(conn, TCP_TOP.size)
+                except socket.timeout:
+                    continue
+                if top is None:
+                    break
+                magic1, magic2, length = TCP_TOP.unpack(top)
+                if (magic1, magic2) != (const.MACHINE_PREPARE_DATA_1, const.MACHINE_PREPARE_DATA_2):
+                    break
+                buf = self._recv_exactly(conn, length)
+                if buf is None or len(buf) < 8:
+                    break
+                command, _, _, reply_id = HEADER.unpack(buf[:8])
+                self._respond(session, reply_id, self.handle(session, command, buf[8:], reply_id, tcp=True))
+                if command == const.CMD_EXIT:
+                    break
+        except OSError:
+            pass
+        finally:
+            self._set_live(session, False)
+            conn.close()
+
+    def _recv_exactly(self, conn, size):
+        data = b""
+        while len(data) < size:
+            try:
+                more = conn.recv(size - len(data))
+            except socket.timeout:
+                if not data:
+                    raise
+                continue
+            if not more:
+                return None
+            data += more
+        return data
+
+    # ─── Live events and punch generation ───
+    def _sessions(self):
+        return list(self._udp_sessions.values())
+
+    def _pump_events(self):
+        """Send queued live events, one unacknowledged event per session at a time."""
+        while not self._stop.wait(0.005):
+            with self.state.lock:
+                listeners = list(self.state.listeners)
+            for push in listeners:
+                session = push.__self__
+                with session.lock:
+                    if session.awaiting_ack or not session.events:
+                        continue
+                    event = session.events.pop(0)
+                    session.awaiting_ack = True
+                try:
+                    session.send([packet(const.CMD_REG_EVENT, session.session_id, const.USHRT_MAX - 1, event)])
+                except OSError:
+                    pass
+
+    def _generate(self):
+        while self.punch_rate and not self._stop.wait(1 / self.punch_rate):
+            self.state.add_punch()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulate a ZKTeco terminal for offline load tests.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=4370)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--record-size", type=int, choices=sorted(RECORD_FORMATS), default=16)
+    parser.add_argument("--rec-cap", type=int, default=None)
+    parser.add_argument("--serial", default="EMU0000001")
+    parser.add_argument("--password", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of UDP responses dropped")
+    parser.add_argument("--rtt", type=float, default=0.0, help="seconds every response spends on the way back")
+    parser.add_argument("--no-pipelining", action="store_true", help="ignore 1504 reads sent before the last answer")
+    parser.add_argument("--rate", type=float, default=0.0, help="generated punches per second")
+    parser.add_argument("--burst", type=int, default=0, help="punches in one shift-change burst")
+    parser.add_argument("--burst-after", type=float, default=30.0, help="seconds until the burst")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    state = DeviceState(users=args.users, records=args.records, record_size=args.record_size,
+                        rec_cap=args.rec_cap, serial=args.serial)
+    emulator = ZKEmulator(state, host=args.host, port=args.port, password=args.password,
+                          latency=args.latency, loss=args.loss, punch_rate=args.rate, rtt=args.rtt,
+                          pipelining=not args.no_pipelining).start()
+    print(f"📟 Emulating {args.serial} on {args.host}:{emulator.port} (UDP+TCP): {args.users} users, "
+          f"{len(state.punches)} {args.record_size}-byte records, built in {time.perf_counter() - started:.1f}s")
+    try:
+        if args.burst:
+            time.sleep(args.burst_after)
+            state.burst(args.burst)
+            print(f"💥 Burst of {args.burst} punches, device now holds {len(state.punches)} records")
+        while True:
+            time.sleep(60)
+            print(f"📟 {len(state.punches)} records, commands served: {sum(emulator.commands.values())}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+
+if __name__ == "__main__":
+    main()
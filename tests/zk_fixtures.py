@@ -0,0 +1,233 @@
+"""
+Raw device buffers for decoder tests and benchmarks.
+
+Buffers look like what ``ZK.read_with_buffer`` returns: a 4-byte total size
+followed by the records. They are generated from a fixed seed and include
+the awkward cases real terminals produce: punches of deleted users, empty
+and non-ASCII names, workcodes, and dates on month ends and leap days.
+The 1k buffers are stored under ``fixtures/zk`` together with golden
+decodes; larger sizes are regenerated and checked against golden digests.
+
+    python tests/zk_fixtures.py --write   # re-record fixtures and goldens
+"""
+import argparse
+import hashlib
+import json
+import random
+import struct
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))  # the vendored zk package
+
+from zk import ZK, const
+from zk_emulator import RECORD_FORMATS, USER_FORMATS, encode_time
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "zk"
+DIGESTS = FIXTURE_DIR / "golden_digests.json"
+
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000}
+# uid is 16 bits on the wire, so user tables stop short of 100k.
+USER_SIZES = {"1k": 1000, "10k": 10000, "60k": 60000}
+TEMPLATE_SIZES = {"100": 100, "1k": 1000, "5k": 5000}
+ATTENDANCE_USERS = 500
+STORED = "1k"
+
+# attendance record size -> user table layout of the same firmware generation
+USER_SIZE_FOR = {8: 28, 16: 28, 40: 72}
+
+NAMES = ["Ana Kowalska", "Łukasz Żółw", "José", "", "  Padded  ", "Zhang Wei", "O'Brien", "Müller-Lüdenscheidt"]
+
+
+def _buffer(rows):
+    data = b"".join(rows)
+    return struct.pack("<I", len(data)) + data
+
+def _timestamp(rng):
+    if rng.random() < 0.05:
+        return rng.choice([datetime(2024, 2, 29, 23, 59, 59), datetime(2023, 12, 31, 0, 0, 0),
+                           datetime(2025, 1, 31, 12, 30, 0)])
+    return datetime(2019, 1, 1) + timedelta(seconds=rng.randrange(11 * 365 * 86400))
+
+
+def make_users(count, size, seed=1):
+    """User table buffer of ``count`` users in the 28- or 72-byte layout."""
+    rng = random.Random(seed)
+    fmt = USER_FORMATS[size]
+    rows = []
+    for uid in range(1, count + 1):
+        name = rng.choice(NAMES) if rng.random() < 0.1 else f"Employee {uid}"
+        privilege = 14 if uid % 97 == 0 else 0
+        password = str(rng.randrange(10000)) if rng.random() < 0.2 else ""
+        card = rng.randrange(1 << 24) if rng.random() < 0.3 else 0
+        user_id = uid + 1000
+        if size == 28:
+            rows.append(fmt.pack(uid, privilege, password.encode(), name.encode()[:8], card, uid % 4, 0, user_id))
+        else:
+            rows.append(fmt.pack(uid, privilege, password.encode(), name.encode()[:24], card,
+                                 str(uid % 4).encode(), str(user_id).encode()))
+    return _buffer(rows)
+
+def make_attendance(count, record_size, users=ATTENDANCE_USERS, seed=2):
+    """Attendance buffer of ``count`` records; about 2% belong to users missing from the table."""
+    rng = random.Random(seed)
+    fmt = RECORD_FORMATS[record_size]
+    rows = []
+    for _ in range(count):
+        uid = rng.randrange(users + 1, users + 50) if rng.random() < 0.02 else rng.randrange(1, users + 1)
+        user_id = uid + 1000
+        t = struct.pack("<I", encode_time(_timestamp(rng)))
+        status = rng.choice((0, 1, 1, 4, 5, 15))
+        punch = rng.choice((0, 1, 2, 3, 4, 5))
+        if record_size == 8:
+            rows.append(fmt.pack(uid, status, t, punch))
+        elif record_size == 16:
+            workcode = rng.randrange(100) if rng.random() < 0.1 else 0
+            rows.append(fmt.pack(user_id, t, status, punch, b"\x00\x00", workcode))
+        else:
+            rows.append(fmt.pack(uid, str(user_id).encode(), status, t, punch, b"\x00" * 8))
+    return _buffer(rows)
+
+def make_templates(count, seed=3):
+    """Fingerprint template buffer (CMD_DB_RRQ / FCT_FINGERTMP)."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        template = rng.randbytes(rng.randrange(400, 800))
+        rows.append(struct.pack("<HHbb", len(template) + 6, i // 2 + 1, i % 10, 1) + template)
+    return _buffer(rows)
+
+
+# ─── Offline decoding ───
+class FixtureZK(ZK):
+    """A ZK whose buffered reads are answered from fixture buffers instead of a device."""
+
+    def __init__(self, users=b"", attendance=b"", templates=b"", user_count=0, record_count=0, finger_count=0):
+        super().__init__("127.0.0.1", ommit_ping=True)
+        self.buffers = {
+            const.CMD_USERTEMP_RRQ: users,
+            const.CMD_ATTLOG_RRQ: attendance,
+            const.CMD_DB_RRQ: templates,
+        }
+        self.counts = (user_count, record_count, finger_count)
+
+    def read_sizes(self):
+        self.users, self.records, self.fingers = self.counts
+        return True
+
+    def read_with_buffer(self, command, fct=0, ext=0):
+        data = self.buffers[command]
+        return data, len(data)
+
+    def get_serialnumber(self):
+        return "FIXTURE"
+
+def users_zk(size, n):
+    return FixtureZK(users=load("users", size, n), user_count=n)
+
+def attendance_zk(size, n):
+    users_size = USER_SIZE_FOR[size]
+    users = load("users", users_size, ATTENDANCE_USERS)
+    return FixtureZK(users=users, attendance=load("attendance", size, n),
+                     user_count=ATTENDANCE_USERS, record_count=n)
+
+def templates_zk(n):
+    return FixtureZK(templates=load("templates", 0, n), finger_count=n)
+
+
+# ─── Canonical decoded form ───
+def canonical_attendance(records):
+    return [[a.user_id, a.uid, a.timestamp.isoformat(), a.status, a.punch] for a in records]
+
+def canonical_attendance_array(array):
+    """Canonical rows of a ``get_attendance_array`` result; uids are ints
+    there, so compare against ``comparable_attendance`` of the objects."""
+    return [[row["user_id"], int(row["uid"]), (datetime(1970, 1, 1) + timedelta(seconds=int(row["timestamp"]))).isoformat(),
+             int(row["status"]), int(row["punch"])] for row in array]
+
+def comparable_attendance(rows):
+    """16-byte punches of unknown users carry the uid as a string in the object API."""
+    return [[user_id, int(uid), *rest] for user_id, uid, *rest in rows]
+
+def canonical_users(users):
+    return [[u.uid, u.name, u.privilege, u.password, u.group_id, u.user_id, u.card] for u in users]
+
+def canonical_templates(fingers):
+    return [[f.uid, f.fid, f.valid, f.size, hashlib.sha256(f.template).hexdigest()[:16]] for f in fingers]
+
+def digest(rows):
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode()).hexdigest()
+
+
+# ─── Fixture files ───
+def fixture_name(kind, size, label):
+    return f"{kind}_{size}_{label}" if size else f"{kind}_{label}"
+
+def label_of(n):
+    return {v: k for k, v in {**SIZES, **USER_SIZES, **TEMPLATE_SIZES}.items()}.get(n, str(n))
+
+_cache = {}
+
+def load(kind, size, n):
+    """Stored buffer if recorded, else a freshly generated one."""
+    key = (kind, size, n)
+    if key not in _cache:
+        path = FIXTURE_DIR / (fixture_name(kind, size, label_of(n)) + ".bin")
+        if path.exists():
+            _cache[key] = path.read_bytes()
+        elif kind == "users":
+            _cache[key] = make_users(n, size)
+        elif kind == "attendance":
+            _cache[key] = make_attendance(n, size)
+        else:
+            _cache[key] = make_templates(n)
+    return _cache[key]
+
+def cases():
+    """Every (name, kind, size, n, decode) combination covered by goldens."""
+    for label, n in SIZES.items():
+        for size in (8, 16, 40):
+            yield fixture_name("attendance", size, label), "attendance", size, n, \
+                lambda size=size, n=n: canonical_attendance(attendance_zk(size, n).get_attendance())
+    for label, n in USER_SIZES.items():
+        for size in (28, 72):
+            yield fixture_name("users", size, label), "users", size, n, \
+                lambda size=size, n=n: canonical_users(users_zk(size, n).get_users())
+    for label, n in TEMPLATE_SIZES.items():
+        yield fixture_name("templates", 0, label), "templates", 0, n, \
+            lambda n=n: canonical_templates(templates_zk(n).get_templates())
+
+def golden_path(name):
+    return FIXTURE_DIR / f"{name}.golden.json"
+
+def stored(kind, n):
+    return kind != "templates" and n == SIZES[STORED]
+
+def write_golden(name, rows):
+    lines = ",\n".join(json.dumps(row, ensure_ascii=False) for row in rows)
+    golden_path(name).write_text(f"[\n{lines}\n]\n")
+
+def write_fixtures():
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    for path in FIXTURE_DIR.glob("*.bin"):
+        path.unlink()
+    _cache.clear()
+    digests = {}
+    for name, kind, size, n, decode in cases():
+        if stored(kind, n):
+            (FIXTURE_DIR / f"{name}.bin").write_bytes(load(kind, size, n))
+        rows = decode()
+        digests[name] = digest(rows)
+        if stored(kind, n):
+            write_golden(name, rows)
+        print(f"💾 {name}: {len(rows)} row(s)")
+    DIGESTS.write_text(json.dumps(digests, indent=2, sort_keys=True) + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-record decoder fixtures and goldens.")
+    parser.add_argument("--write", action="store_true", help="overwrite fixtures/zk with freshly decoded goldens")
+    if parser.parse_args().write:
+        write_fixtures()
+    else:
+        parser.print_help()
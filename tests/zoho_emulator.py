@@ -0,0 +1,335 @@
+"""
+A local stand-in for the Zoho endpoints this project calls:
+
+    POST /oauth/v2/token                               refresh_token grant
+    GET  /people/api/forms/P_EmployeeView/records      sIndex/limit paging
+    GET  /people/api/forms/<form>/getRecords           searchParams lookup
+    POST /people/api/attendance                        single check-in/out
+    POST /people/api/attendance/bulkImport             bulk import
+
+Latency, per-minute rate limits per endpoint (answered with a Zoho style
+error envelope and ``Retry-After``), random 5xx errors, dropped connections
+and scripted faults are configurable, with a seeded RNG so runs repeat.
+
+    python tests/zoho_emulator.py --employees 2000 --port 8089 --rate-limit 30
+    ZOHO_ACCOUNTS_URL=http://127.0.0.1:8089 ZOHO_PEOPLE_URL=http://127.0.0.1:8089 python src/final.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+TOKEN_PATH     = "/oauth/v2/token"
+EMPLOYEES_PATH = "/people/api/forms/P_EmployeeView/records"
+ATTENDANCE_PATH = "/people/api/attendance"
+BULK_PATH      = "/people/api/attendance/bulkImport"
+GET_RECORDS    = re.compile(r"^/people/api/forms/(\w+)/getRecords$")
+
+MAX_PAGE = 200
+SEARCH_PARAM = re.compile(r"(\w+)\s*:\s*'([^']*)'")
+
+
+def zoho_error(message):
+    return {"response": {"status": 1, "message": "Error occurred", "errors": {"message": message}}}
+
+def make_employees(count, biometric_field="Biometric_ID"):
+    """Employee rows as P_EmployeeView returns them. Biometric IDs match zk_emulator users."""
+    return [{
+        "Employee ID": f"EMP{i:05d}",
+        "EmployeeID": f"EMP{i:05d}",
+        "First Name": "Employee",
+        "Last Name": str(i),
+        "ownerName": f"Employee {i}",
+        "Employee Status": "Active" if i % 50 else "Resigned",
+        biometric_field: str(1000 + i),
+    } for i in range(1, count + 1)]
+
+
+class RateLimiter:
+    """Sliding-window request limit per endpoint, with an optional lockout once exceeded."""
+
+    def __init__(self, per_minute, window=60.0, lockout=0.0):
+        self.per_minute = per_minute
+        self.window = window
+        self.lockout = lockout
+        self._hits = {}
+        self._locked_until = {}
+        self._lock = threading.Lock()
+
+    def check(self, endpoint, now=None):
+        """Return 0 if the request may pass, else the seconds until it would."""
+        limit = self.per_minute.get(endpoint, self.per_minute.get("*")) if isinstance(self.per_minute, dict) else self.per_minute
+        if not limit:
+            return 0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            locked = self._locked_until.get(endpoint, 0) - now
+            if locked > 0:
+                return locked
+            hits = self._hits.setdefault(endpoint, deque())
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) < limit:
+                hits.append(now)
+                return 0
+            if self.lockout:
+                self._locked_until[endpoint] = now + self.lockout
+                return self.lockout
+            return hits[0] + self.window - now
+
+
+class ZohoEmulator:
+    """
+    Serves Zoho responses from memory on a daemon thread.
+
+    ``latency`` is added to every response and ``row_latency`` per bulk row.
+    ``rate_limit`` is requests per ``window`` seconds, either one number for
+    every endpoint or ``{path: limit}`` with ``"*"`` as the default.
+    ``error_rate`` answers that fraction of requests with a 500 and
+    ``drop_rate`` closes the connection without answering; ``fail_next``
+    scripts faults for the next requests of one endpoint.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, employees=200, token_ttl=3600, refresh_token="refresh",
+                 latency=0.0, row_latency=0.0, rate_limit=0, window=60.0, lockout=0.0,
+                 error_rate=0.0, drop_rate=0.0, biometric_field="Biometric_ID", seed=0):
+        self.host = host
+        self.port = port
+        self.employees = make_employees(employees, biometric_field) if isinstance(employees, int) else employees
+        self._emp_ids = {e["Employee ID"] for e in self.employees}
+        self.token_ttl = token_ttl
+        self.refresh_token = refresh_token
+        self.latency = latency
+        self.row_latency = row_latency
+        self.limiter = RateLimiter(rate_limit, window, lockout)
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._faults = {}
+        self._server = None
+
+        self.requests = {}
+        self.throttled = 0
+        self.tokens_issued = 0
+        self.attendance = []  # (emp_id, "checkIn"/"checkOut", timestamp, monotonic time) accepted, in order
+
+    # ─── Lifecycle ───
+    def start(self):
+        Handler = type("Handler", (_Handler,), {"emulator": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="zoho-emulator", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def fail_next(self, path, count=1, status=500, body=None):
+        """Answer the next ``count`` requests to ``path`` with ``status`` (None drops the connection)."""
+        with self._lock:
+            self._faults.setdefault(path, deque()).extend([(status, body)] * count)
+
+    def expire_tokens(self):
+        with self._lock:
+            self._tokens.clear()
+
+    # ─── Dispatch ───
+    def handle(self, method, path, query, form, headers):
+        """Return ``(status, body, extra headers)``, or None to drop the connection."""
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            faults = self._faults.get(path)
+            fault = faults.popleft() if faults else None
+            roll = self.rng.random()
+        if fault:
+            status, body = fault
+            return None if status is None else (status, body or zoho_error("Injected fault"), {})
+        if roll < self.drop_rate:
+            return None
+        if roll < self.drop_rate + self.error_rate:
+            return 500, zoho_error("Internal Server Error"), {}
+        wait = self.limiter.check(path)
+        if wait:
+            with self._lock:
+                self.throttled += 1
+            return 429, zoho_error(f"API call limit exceeded. Try again after {wait:.0f} second(s)."), \
+                {"Retry-After": str(max(int(wait + 0.999), 1))}
+
+        if path == TOKEN_PATH and method == "POST":
+            return self.token(form)
+        if not self.authorized(headers.get("Authorization", "")):
+            return 401, zoho_error("Invalid OAuth token"), {}
+        if path == EMPLOYEES_PATH and method == "GET":
+            return self.employee_records(query)
+        if GET_RECORDS.match(path) and method == "GET":
+            return self.get_records(query)
+        if path == ATTENDANCE_PATH and method == "POST":
+            return self.punch(form)
+        if path == BULK_PATH and method == "POST":
+            return self.bulk_import(form)
+        return 404, zoho_error("Invalid URL"), {}
+
+    def authorized(self, header):
+        token = header.replace("Zoho-oauthtoken", "", 1).strip()
+        with self._lock:
+            expires = self._tokens.get(token)
+        return expires is not None and expires > time.monotonic()
+
+    def token(self, form):
+        if form.get("grant_type") != "refresh_token" or form.get("refresh_token") != self.refresh_token:
+            return 200, {"error": "invalid_code"}, {}
+        with self._lock:
+            self.tokens_issued += 1
+            token = f"1000.emulated.{self.tokens_issued}"
+            self._tokens[token] = time.monotonic() + self.token_ttl
+        return 200, {"access_token": token, "expires_in": self.token_ttl, "api_domain": self.url,
+                     "token_type": "Bearer"}, {}
+
+    def employee_records(self, query):
+        start = max(int(query.get("sIndex", 1)), 1)
+        limit = min(int(query.get("limit", query.get("per_page", MAX_PAGE))), MAX_PAGE)
+        return 200, self.employees[start - 1:start - 1 + limit], {}
+
+    def get_records(self, query):
+        search = dict(SEARCH_PARAM.findall(query.get("searchParams", "")))
+        field, text = search.get("searchField"), search.get("searchText")
+        matches = [e for e in self.employees if field and str(e.get(field)) == text]
+        if not matches:
+            return 200, zoho_error("No records found"), {}
+        result = [{str(i): [e]} for i, e in enumerate(matches, 1)]
+        return 200, {"response": {"status": 0, "message": "Data fetched successfully", "result": result}}, {}
+
+    def known(self, emp_id):
+        return emp_id in self._emp_ids
+
+    def record(self, emp_id, key, timestamp):
+        with self._lock:
+            self.attendance.append((emp_id, key, timestamp, time.monotonic()))
+
+    def punch(self, form):
+        emp_id = form.get("employeeId") or form.get("empId")
+        key = "checkIn" if form.get("checkIn") else "checkOut" if form.get("checkOut") else None
+        if not emp_id or not key:
+            return 400, zoho_error("Missing employeeId or check-in/out time"), {}
+        if not self.known(emp_id):
+            return 400, zoho_error(f"Employee {emp_id} not found"), {}
+        self.record(emp_id, key, form[key])
+        return 200, {"response": {"status": 0, "message": "Success", "result": {"empId": emp_id, key: form[key]}}}, {}
+
+    def bulk_import(self, form):
+        try:
+            rows = json.loads(form.get("data", ""))
+        except ValueError:
+            return 200, zoho_error("Invalid data"), {}
+        if not isinstance(rows, list):
+            return 200, zoho_error("Invalid data"), {}
+        if self.row_latency:
+            time.sleep(self.row_latency * len(rows))
+        result = []
+        for row in rows:
+            emp_id = row.get("empId")
+            key = "checkIn" if row.get("checkIn") else "checkOut" if row.get("checkOut") else None
+            if not key or not self.known(emp_id):
+                result.append({"empId": emp_id, "error": "Employee not found" if key else "Missing time"})
+                continue
+            self.record(emp_id, key, row[key])
+            result.append({"empId": emp_id, key: row[key]})
+        return 200, {"response": {"status": 0, "message": "Success", "result": result}}, {}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "throttled": self.throttled,
+                "tokens_issued": self.tokens_issued,
+                "attendance": len(self.attendance),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    emulator = None
+    protocol_version = "HTTP/1.1"  # keep-alive, like Zoho
+
+    def do_GET(self):
+        self._serve("GET")
+
+    def do_POST(self):
+        self._serve("POST")
+
+    def _serve(self, method):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        form = {k: v[0] for k, v in parse_qs(body).items()}
+        if self.emulator.latency:
+            time.sleep(self.emulator.latency)
+        response = self.emulator.handle(method, url.path, query, form, self.headers)
+        if response is None:
+            self.close_connection = True
+            return
+        status, payload, headers = response
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local Zoho People stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--refresh-token", default="refresh")
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--row-latency", type=float, default=0.0, help="seconds added per bulk import row")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per minute per endpoint")
+    parser.add_argument("--lockout", type=float, default=0.0, help="seconds an endpoint stays blocked once throttled")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    emulator = ZohoEmulator(host=args.host, port=args.port, employees=args.employees,
+                            refresh_token=args.refresh_token, token_ttl=args.token_ttl,
+                            latency=args.latency, row_latency=args.row_latency, rate_limit=args.rate_limit,
+                            lockout=args.lockout, error_rate=args.error_rate, drop_rate=args.drop_rate).start()
+    print(f"🧪 Zoho stand-in on {emulator.url} with {len(emulator.employees)} employees "
+          f"(refresh token {args.refresh_token!r})")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"🧪 {emulator.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+
+if __name__ == "__main__":
+    main()